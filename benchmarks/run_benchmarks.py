@@ -0,0 +1,314 @@
+"""
+Benchmark the phases of building, solving and evaluating MTRESS models.
+
+For every system (see systems.py), time horizon and number of locations
+wall time and peak memory are reported separately for
+
+- energy_system: creating the SolphModel (MTRESS and oemof.solph nodes),
+- pyomo_model: building the Pyomo model (also reporting its number of
+  variables and constraints),
+- solve: solving the model (including writing and reading solver files),
+- results: processing.results,
+- flow_results: FlowResults.from_model.
+
+Wall times are the minimum of several runs. Peak memory is measured in a
+separate run using tracemalloc, which covers memory allocated by Python
+(but not by the solver process).
+
+Usage::
+
+    python benchmarks/run_benchmarks.py --save-baseline baseline.json
+    python benchmarks/run_benchmarks.py --compare baseline.json
+
+By default, one location is modelled for one day. Use e.g.
+`--horizons day week month year --locations 1 10 50` to scale the
+models. The hydrogen plant is a mixed-integer problem, which is hard to
+solve for CBC, so it only runs if selected explicitly, e.g. with
+`--systems hydrogen_plant --solver-option sec=60`. The systems heat_pump
+and heat_pump_compact compare the formulations of the heat pump,
+layered_heat_demand and layered_heat_demand_compact those of the layered
+heat storage. gas_storage_flexible shows building the constraints of a
+flexible storage multiplexer (also a mixed-integer problem),
+gas_storage_sos2 and gas_storage_logarithmic its formulations with fewer
+binary variables.
+
+Comparing to a baseline lists regressions and exits with status 1 if
+there are any.
+
+SPDX-License-Identifier: MIT
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+from oemof.solph import processing
+
+from mtress import Location, MetaModel, SolphModel
+from mtress._helpers import FlowResults
+
+sys.path.insert(0, str(Path(__file__).parent))
+from systems import SYSTEMS  # noqa: E402
+
+#: Number of hourly time steps of the benchmarked horizons
+HORIZONS = {"day": 24, "week": 168, "month": 720, "year": 8760}
+LOCATIONS = [1, 10, 50]
+PHASES = ("energy_system", "pyomo_model", "solve", "results", "flow_results")
+
+# Differences below these thresholds are not reported as regressions
+MIN_TIME_DIFFERENCE = 0.05  # s
+MIN_MEMORY_DIFFERENCE = 1e6  # B
+
+
+def _build_meta_model(system: str, n_locations: int, n_steps: int):
+    """Create a meta model with n_locations copies of a system."""
+    meta_model = MetaModel()
+    for number in range(n_locations):
+        location = Location(name=f"location_{number}")
+        meta_model.add_location(location)
+        SYSTEMS[system](location, n_steps)
+    return meta_model
+
+
+def _run_phases(
+    system: str,
+    n_locations: int,
+    n_steps: int,
+    solver: str,
+    cmdline_options: dict,
+    measure: str,
+) -> dict:
+    """Run all phases once, measuring either time or memory."""
+    meta_model = _build_meta_model(system, n_locations, n_steps)
+    timeindex = {
+        "start": "2021-01-01 00:00:00",
+        "periods": n_steps + 1,
+        "freq": "60min",
+    }
+    solph_model = None
+    model = None
+
+    def energy_system():
+        nonlocal solph_model
+        solph_model = SolphModel(meta_model, timeindex=timeindex)
+
+    def pyomo_model():
+        nonlocal model
+        solph_model.build_solph_model()
+        model = solph_model.model
+
+    def solve():
+        solph_model.solve(solver=solver, cmdline_options=cmdline_options)
+
+    def results():
+        processing.results(model)
+
+    def flow_results():
+        FlowResults.from_model(model)
+
+    phases = {
+        "energy_system": energy_system,
+        "pyomo_model": pyomo_model,
+        "solve": solve,
+        "results": results,
+        "flow_results": flow_results,
+    }
+
+    measurements = {}
+    for phase in PHASES:
+        gc.collect()
+        if measure == "memory":
+            tracemalloc.start()
+            start_memory = tracemalloc.get_traced_memory()[0]
+            phases[phase]()
+            measurements[phase] = (
+                tracemalloc.get_traced_memory()[1] - start_memory
+            )
+            tracemalloc.stop()
+        else:
+            start = time.perf_counter()
+            phases[phase]()
+            measurements[phase] = time.perf_counter() - start
+
+    size = {
+        "variables": model.nvariables(),
+        "constraints": model.nconstraints(),
+    }
+    return measurements, size
+
+
+def run_case(
+    system: str,
+    horizon: str,
+    n_locations: int,
+    solver: str = "cbc",
+    cmdline_options: dict = None,
+    repeat: int = 3,
+) -> dict:
+    """
+    Benchmark a single case.
+
+    :return: Mapping of phases to wall time (s) and peak memory (B),
+        the Pyomo model phase also giving the size of the model
+    """
+    n_steps = HORIZONS[horizon]
+    arguments = (system, n_locations, n_steps, solver, cmdline_options)
+    times = [_run_phases(*arguments, "time")[0] for _ in range(repeat)]
+    memory, size = _run_phases(*arguments, "memory")
+
+    results = {
+        phase: {
+            "time": min(run[phase] for run in times),
+            "peak_memory": memory[phase],
+        }
+        for phase in PHASES
+    }
+    results["pyomo_model"].update(size)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """List measurements exceeding the baseline by more than tolerance."""
+    regressions = []
+    for case, phases in results.items():
+        for phase, values in phases.items():
+            reference = baseline.get(case, {}).get(phase)
+            if reference is None:
+                continue
+            for quantity, threshold in (
+                ("time", MIN_TIME_DIFFERENCE),
+                ("peak_memory", MIN_MEMORY_DIFFERENCE),
+            ):
+                difference = values[quantity] - reference[quantity]
+                if (
+                    difference > threshold
+                    and values[quantity]
+                    > (1 + tolerance) * reference[quantity]
+                ):
+                    regressions.append(
+                        (
+                            case,
+                            phase,
+                            quantity,
+                            reference[quantity],
+                            values[quantity],
+                        )
+                    )
+    return regressions
+
+
+def _environment() -> dict:
+    """Describe the environment the benchmarks ran in."""
+    from importlib.metadata import version
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "oemof.solph": version("oemof.solph"),
+        "pyomo": version("pyomo"),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--systems",
+        nargs="+",
+        choices=list(SYSTEMS),
+        default=[
+            "electricity_only",
+            "chp",
+            "layered_heat_demand",
+            "layered_heat_demand_compact",
+            "heat_pump",
+            "heat_pump_compact",
+        ],
+    )
+    parser.add_argument(
+        "--horizons", nargs="+", choices=list(HORIZONS), default=["day"]
+    )
+    parser.add_argument(
+        "--locations", nargs="+", type=int, default=LOCATIONS[:1]
+    )
+    parser.add_argument("--solver", default="cbc")
+    parser.add_argument(
+        "--solver-option",
+        nargs="*",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Command line option passed to the solver.",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Relative increase reported as regression.",
+    )
+    args = parser.parse_args(argv)
+    cmdline_options = dict(
+        option.split("=", maxsplit=1) for option in args.solver_option
+    )
+
+    results = {}
+    for system in args.systems:
+        for horizon in args.horizons:
+            for n_locations in args.locations:
+                case = f"{system}/{horizon}/{n_locations}"
+                print(f"Running {case}", file=sys.stderr)
+                results[case] = run_case(
+                    system,
+                    horizon,
+                    n_locations,
+                    args.solver,
+                    cmdline_options,
+                    args.repeat,
+                )
+
+    table = pd.DataFrame(
+        {
+            (case, phase): values
+            for case, phases in results.items()
+            for phase, values in phases.items()
+        }
+    ).T
+    table["peak_memory"] /= 1e6
+    print(
+        table.rename(
+            columns={"time": "time (s)", "peak_memory": "MB"}
+        ).to_string()
+    )
+
+    if args.save_baseline is not None:
+        with open(args.save_baseline, "w", encoding="utf-8") as fp:
+            json.dump(
+                {"environment": _environment(), "results": results},
+                fp,
+                indent=1,
+            )
+
+    if args.compare is not None:
+        with open(args.compare, encoding="utf-8") as fp:
+            baseline = json.load(fp)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for case, phase, quantity, reference, value in regressions:
+            print(
+                f"Regression {case} {phase} {quantity}: "
+                + f"{reference:.4g} -> {value:.4g}"
+            )
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
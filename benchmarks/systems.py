@@ -0,0 +1,305 @@
+"""
+Energy systems used for benchmarking.
+
+The systems follow the examples (electricity only, hydrogen plant, CHP)
+and the layered heat demand integration test. Every function adds the
+components of one system to a location, using synthetic hourly time
+series of the requested length instead of input files.
+
+SPDX-License-Identifier: MIT
+"""
+
+import numpy as np
+
+from mtress import Location, carriers, demands, technologies
+from mtress.physics import HYDROGEN, NATURAL_GAS
+from mtress.technologies import AFC, NATURALGAS_CHP, PEM_ELECTROLYSER
+
+
+def _profile(n_steps: int, mean: float, seed: int = 0) -> np.ndarray:
+    """Daily profile with some noise."""
+    hours = np.arange(n_steps)
+    noise = np.random.default_rng(seed).uniform(0.9, 1.1, n_steps)
+    return mean * (1 + 0.5 * np.sin(2 * np.pi * hours / 24)) * noise
+
+
+def electricity_only(location: Location, n_steps: int) -> None:
+    """Electricity demand supplied by the grid."""
+    location.add(carriers.ElectricityCarrier())
+    location.add(technologies.ElectricityGridConnection(working_rate=35))
+    location.add(
+        demands.Electricity(
+            name="electricity demand",
+            time_series=_profile(n_steps, 0.5),
+        )
+    )
+
+
+def hydrogen_plant(location: Location, n_steps: int) -> None:
+    """Hydrogen production and storage (PV omitted, no weather data)."""
+    location.add(carriers.ElectricityCarrier())
+    location.add(
+        technologies.ElectricityGridConnection(working_rate=70e-3, revenue=0)
+    )
+    location.add(carriers.GasCarrier(gases={HYDROGEN: [5, 30, 40, 70]}))
+    location.add(
+        demands.Electricity(
+            name="electricity_demand",
+            time_series=_profile(n_steps, 100e3),
+        )
+    )
+    location.add(
+        demands.GasDemand(
+            name="H2_demand",
+            gas_type=HYDROGEN,
+            time_series=_profile(n_steps, 1, seed=1),
+            pressure=40,
+        )
+    )
+    location.add(
+        technologies.H2Storage(name="H2_Storage", volume=5, power_limit=10)
+    )
+    location.add(
+        carriers.HeatCarrier(
+            temperature_levels=[20, 40],
+            reference_temperature=0,
+        )
+    )
+    location.add(
+        technologies.Electrolyser(
+            name="PEM_Ely",
+            nominal_power=1500e3,
+            template=PEM_ELECTROLYSER,
+        )
+    )
+    location.add(
+        technologies.FuelCell(
+            name="AFC", nominal_power=10e3, gas_input_pressure=5, template=AFC
+        )
+    )
+    location.add(
+        technologies.HeatSink(
+            name="Heat_Sink",
+            reservoir_temperature=20,
+            minimum_working_temperature=20,
+            maximum_working_temperature=40,
+            nominal_power=200e5,
+        )
+    )
+    location.add(
+        technologies.GasCompressor(
+            name="H2Compr", nominal_power=50e3, gas_type=HYDROGEN
+        )
+    )
+
+
+def chp(location: Location, n_steps: int) -> None:
+    """Natural gas CHP supplying heat and electricity."""
+    location.add(carriers.ElectricityCarrier())
+    location.add(technologies.ElectricityGridConnection(working_rate=50e-6))
+    location.add(carriers.GasCarrier(gases={NATURAL_GAS: [10]}))
+    location.add(
+        carriers.HeatCarrier(
+            temperature_levels=[20, 80],
+            reference_temperature=10,
+        )
+    )
+    location.add(
+        technologies.CHP(
+            name="Gas_CHP",
+            gas_type={NATURAL_GAS: 1},
+            nominal_power=1e5,
+            template=NATURALGAS_CHP,
+            input_pressure=1,
+        )
+    )
+    location.add(
+        technologies.GasGridConnection(
+            gas_type=NATURAL_GAS,
+            grid_pressure=10,
+            working_rate=5,
+        )
+    )
+    location.add(
+        demands.FixedTemperatureHeating(
+            name="heat_demand",
+            min_flow_temperature=80,
+            return_temperature=20,
+            time_series=_profile(n_steps, 1000),
+        )
+    )
+    location.add(
+        demands.Electricity(
+            name="electricity_demand",
+            time_series=_profile(n_steps, 1000, seed=1),
+        )
+    )
+
+
+def layered_heat_demand(
+    location: Location, n_steps: int, formulation: str = "nodes"
+) -> None:
+    """Heat source, demands and a layered heat storage."""
+    location.add(
+        carriers.HeatCarrier(
+            temperature_levels=[10, 20, 30],
+            reference_temperature=0,
+        )
+    )
+    location.add(
+        technologies.HeatSource(
+            name="source",
+            reservoir_temperature=20,
+            nominal_power=1e6,
+            maximum_working_temperature=40,
+            minimum_working_temperature=10,
+        )
+    )
+    location.add(
+        demands.FixedTemperatureCooling(
+            name="CD",
+            max_flow_temperature=20,
+            return_temperature=30,
+            time_series=_profile(n_steps, 1e3),
+        )
+    )
+    location.add(
+        demands.FixedTemperatureHeating(
+            name="HD",
+            min_flow_temperature=30,
+            return_temperature=20,
+            time_series=_profile(n_steps, 1e3, seed=1),
+        )
+    )
+    location.add(
+        technologies.LayeredHeatStorage(
+            name="HS",
+            diameter=1,
+            volume=10,
+            ambient_temperature=0,
+            u_value=0.1,
+            power_limit=None,
+            max_temperature=30,
+            min_temperature=10,
+            initial_storage_levels={30: 0.9},
+            balanced=False,
+            formulation=formulation,
+        )
+    )
+
+
+def layered_heat_demand_compact(location: Location, n_steps: int) -> None:
+    """Layered heat storage system using the compact formulation."""
+    layered_heat_demand(location, n_steps, formulation="compact")
+
+
+def heat_pump(
+    location: Location, n_steps: int, formulation: str = "nodes"
+) -> None:
+    """Heat pump between eight temperature levels, see HeatPumpFormulation."""
+    location.add(carriers.ElectricityCarrier())
+    location.add(technologies.ElectricityGridConnection(working_rate=35))
+    location.add(
+        carriers.HeatCarrier(
+            temperature_levels=[0, 5, 10, 20, 30, 40, 55, 70],
+            reference_temperature=-10,
+        )
+    )
+    location.add(
+        technologies.HeatSource(
+            name="air",
+            reservoir_temperature=10,
+            nominal_power=1e6,
+            maximum_working_temperature=10,
+            minimum_working_temperature=0,
+        )
+    )
+    location.add(
+        technologies.HeatPump(
+            name="heat_pump",
+            thermal_power_limit=5e3,
+            max_temp_primary=20,
+            min_temp_primary=0,
+            max_temp_secondary=70,
+            min_temp_secondary=20,
+            formulation=formulation,
+        )
+    )
+    location.add(
+        demands.FixedTemperatureHeating(
+            name="space_heating",
+            min_flow_temperature=40,
+            return_temperature=30,
+            time_series=_profile(n_steps, 1e3),
+        )
+    )
+    location.add(
+        demands.FixedTemperatureHeating(
+            name="hot_water",
+            min_flow_temperature=70,
+            return_temperature=20,
+            time_series=_profile(n_steps, 5e2, seed=1),
+        )
+    )
+
+
+def heat_pump_compact(location: Location, n_steps: int) -> None:
+    """Heat pump system using the compact formulation."""
+    heat_pump(location, n_steps, formulation="compact")
+
+
+def gas_storage_flexible(
+    location: Location, n_steps: int, implementation: str = "flexible"
+) -> None:
+    """Hydrogen storage with many pressure levels and flexible access."""
+    pressures = [10 * level for level in range(1, 21)]
+    location.add(carriers.GasCarrier(gases={HYDROGEN: pressures}))
+    location.add(
+        technologies.GasGridConnection(
+            gas_type=HYDROGEN,
+            grid_pressure=max(pressures),
+            working_rate=_profile(n_steps, 5),
+        )
+    )
+    location.add(
+        demands.GasDemand(
+            name="H2_demand",
+            gas_type=HYDROGEN,
+            time_series=_profile(n_steps, 1, seed=1),
+            pressure=min(pressures),
+        )
+    )
+    location.add(
+        technologies.H2Storage(
+            name="H2_Storage",
+            volume=1,
+            power_limit=10,
+            multiplexer_implementation=implementation,
+        )
+    )
+
+
+def gas_storage_sos2(location: Location, n_steps: int) -> None:
+    """Flexible hydrogen storage selecting pressure levels by SOS2 sets."""
+    gas_storage_flexible(location, n_steps, implementation="flexible_sos2")
+
+
+def gas_storage_logarithmic(location: Location, n_steps: int) -> None:
+    """Flexible hydrogen storage with a binary encoding of the levels."""
+    gas_storage_flexible(
+        location, n_steps, implementation="flexible_logarithmic"
+    )
+
+
+SYSTEMS = {
+    "electricity_only": electricity_only,
+    "hydrogen_plant": hydrogen_plant,
+    "chp": chp,
+    "layered_heat_demand": layered_heat_demand,
+    "layered_heat_demand_compact": layered_heat_demand_compact,
+    "heat_pump": heat_pump,
+    "heat_pump_compact": heat_pump_compact,
+    "gas_storage_flexible": gas_storage_flexible,
+    "gas_storage_sos2": gas_storage_sos2,
+    "gas_storage_logarithmic": gas_storage_logarithmic,
+}
@@ -8,10 +8,26 @@ SPDX-License-Identifier: MIT
 """
 
 from ._abstract_component import SolphLabel
+from ._instrumentation import InstrumentationReport, logging_hook
 from ._location import Location
 from ._meta_model import Connection, MetaModel
-from ._solph_model import SolphModel
+from ._scenarios import iterate_scenarios, run_scenarios
+from ._solph_model import SolphModel, SolverBackend
+from ._temporal_aggregation import ClusterMethod, TypicalPeriods
 
 __version__ = "3.0.0a2"
 
-__all__ = ["Connection", "Location", "MetaModel", "SolphLabel", "SolphModel"]
+__all__ = [
+    "ClusterMethod",
+    "Connection",
+    "InstrumentationReport",
+    "Location",
+    "MetaModel",
+    "SolphLabel",
+    "SolphModel",
+    "SolverBackend",
+    "TypicalPeriods",
+    "iterate_scenarios",
+    "logging_hook",
+    "run_scenarios",
+]
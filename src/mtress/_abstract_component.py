@@ -30,7 +30,43 @@ SOLPH_SHAPES = {
     GenericStorage: "cylinder",
 }
 
-test_dict = {}
+# Nodes which end the spreading of carrier colours
+COLOR_BARRIERS = (Source, Sink, Converter, OffsetConverter)
+
+
+def _edges(node):
+    """Iterate over the edges of a node and the nodes at their other end."""
+    node_id = tuple(node.label)
+    for origin in node.inputs:
+        yield (tuple(origin.label), node_id), origin
+    for target in node.outputs:
+        yield (node_id, tuple(target.label)), target
+
+
+def _spread_color(flow_color: dict, node, color: str) -> None:
+    """
+    Colour the edges of a node and the uncoloured edges reachable from it.
+
+    Edges are traversed depth first, using an explicit stack instead of
+    recursion. Colours spread over buses and storages but not over the
+    nodes in COLOR_BARRIERS. Edges already coloured keep their colour.
+    """
+    for (origin_id, target_id), neighbour in _edges(node):
+        flow_color.setdefault(origin_id, {}).setdefault(target_id, color)
+
+        stack = []
+        if type(neighbour) not in COLOR_BARRIERS:
+            stack.append(_edges(neighbour))
+        while stack:
+            for (origin_id, target_id), other in stack[-1]:
+                colors = flow_color.setdefault(origin_id, {})
+                if target_id not in colors:
+                    colors[target_id] = color
+                    if type(other) not in COLOR_BARRIERS:
+                        stack.append(_edges(other))
+                        break
+            else:
+                stack.pop()
 
 
 class AbstractComponent(NamedElement):
@@ -94,7 +130,7 @@ class AbstractSolphRepresentation(AbstractComponent):
         """Create a solph node and add it to the solph model."""
         _full_label = SolphLabel(*self.create_label(label))
 
-        if label in self._solph_nodes:
+        if _full_label in self._solph_model.node_registry:
             raise KeyError(
                 f"Solph component named {_full_label} already exists"
             )
@@ -106,10 +142,15 @@ class AbstractSolphRepresentation(AbstractComponent):
         setattr(_node, "short_label", label)
 
         self._solph_nodes.append(_node)
+        self._solph_model.node_registry.add(_node)
         self._solph_model.energy_system.add(_node)
 
         return _node
 
+    def reset_solph_nodes(self) -> None:
+        """Forget solph nodes, e.g. before the energy system is rebuilt."""
+        self._solph_nodes = []
+
     @property
     def solph_nodes(self) -> list:
         """Iterate over solph nodes."""
@@ -121,80 +162,74 @@ class AbstractSolphRepresentation(AbstractComponent):
     def establish_interconnections(self) -> None:
         """Build interconnections with other nodes."""
 
+    def complete_structure(self) -> None:
+        """Complete the structure after all interconnections are built."""
+
     def add_constraints(self) -> None:
         """Add constraints to the model."""
 
     def get_flow_color(
-        self, flow_color: dict, colorscheme: dict = None
+        self,
+        flow_color: dict,
+        colorscheme: dict = None,
+        component_identifiers: list[set] = None,
     ) -> None:
-        def rec(node, color):
-            # recursively iterate nodes until all edges covered
-            # or node type in [Source, Sink, Converter]
-            if type(node) in [Source, Sink, Converter, OffsetConverter]:
-                return
-            node_id = tuple(node.label)
-            for origin in node.inputs:
-                origin_id = tuple(origin.label)
-                flow_color.setdefault(origin_id, {})
-                if node_id not in flow_color[origin_id]:
-                    flow_color[origin_id][node_id] = color
-                    rec(origin, color)
-            for target in node.outputs:
-                target_id = tuple(target.label)
-                flow_color.setdefault(node_id, {})
-                if target_id not in flow_color[node_id]:
-                    flow_color[node_id][target_id] = color
-                    rec(target, color)
-            return
+        """
+        Colour flows by the carrier of this component.
+
+        Carriers colour their own flows, other components those of the only
+        carrier they are connected to. Colours spread over buses and
+        storages, flows already coloured in flow_color keep their colour.
+
+        :param flow_color: Colours by origin and target label, updated
+        :param colorscheme: Colours by carrier name
+        :param component_identifiers: Identifiers (as sets) of all
+            components of the model, computed if not given
+        """
+        if colorscheme is None:
+            colorscheme = {}
 
         color = colorscheme.get(self.identifier[-1], None)
         if color is None:  # component not a carrier
             # determine if only connected to ONE carrier
-            own_nodes = [tuple(x.label) for x in self.solph_nodes]
-            connected_nodes = [
-                tuple(y.label) for x in self.solph_nodes for y in x.outputs
-            ] + [tuple(y.label) for x in self.solph_nodes for y in x.inputs]
-            external_nodes = set(connected_nodes) - set(own_nodes)
+            own_nodes = {tuple(x.label) for x in self.solph_nodes}
+            external_nodes = {
+                tuple(y.label)
+                for x in self.solph_nodes
+                for y in [*x.outputs, *x.inputs]
+            } - own_nodes
+            if not external_nodes:
+                return
+
             external_nodes = set.intersection(*map(set, external_nodes))
-            if external_nodes in [
-                set(x.identifier)
-                for x in self._solph_model._meta_model.components
-            ]:
-                color = colorscheme[
-                    set.intersection(
-                        set(colorscheme.keys()), external_nodes
-                    ).pop()
+            if component_identifiers is None:
+                component_identifiers = [
+                    set(x.identifier)
+                    for x in self._solph_model._meta_model.components
                 ]
+            if external_nodes in component_identifiers:
+                carrier = next(iter(set(colorscheme) & external_nodes), None)
+                color = colorscheme.get(carrier)
 
         if color is not None:  # color nodes
             for solph_node in self.solph_nodes:
-                solph_node_id = tuple(solph_node.label)
-                for origin in solph_node.inputs:
-                    origin_id = tuple(origin.label)
-                    flow_color.setdefault(origin_id, {})
-                    if solph_node_id not in flow_color[origin_id]:
-                        flow_color[origin_id][solph_node_id] = color
-                    rec(origin, color)
-                for target in solph_node.outputs:
-                    target_id = tuple(target.label)
-                    flow_color.setdefault(solph_node_id, {})
-                    if target_id not in flow_color[solph_node_id]:
-                        flow_color[solph_node_id][target_id] = color
-                    rec(target, color)
+                _spread_color(flow_color, solph_node, color)
 
     def graph(
         self,
         detail: bool = False,
         flow_results=None,
         flow_color: dict = None,
-        colorscheme: dict = None,
     ) -> Tuple[Digraph, set]:
-        self.get_flow_color(flow_color, colorscheme)
         """
         Generate graphviz visualization of the MTRESS component.
 
         :param detail: Include solph nodes.
+        :param flow_color: Colours of the flows, see `get_flow_color`
         """
+        if flow_color is None:
+            flow_color = {}
+
         external_edges = set()
 
         graph = Digraph(name=f"cluster_{self.identifier}")
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+Declarative configuration of MTRESS meta models.
+
+A configuration (a dict or a YAML file) has the following structure::
+
+    timeseries:                 # named time series, optional
+      temp_air: FILE:meteo.csv:temp_air
+    locations:
+      house_1:
+        carriers:               # carrier class: parameters
+          ElectricityCarrier:
+          HeatCarrier:
+            temperature_levels: [35, 60]
+            reference_temperature: 10
+        demands:                # demand class: parameters
+          Electricity:
+            time_series: FILE:demand.csv:electricity
+        components:             # name: technology and parameters
+          air_source:
+            technology: HeatSource
+            parameters:
+              reservoir_temperature: TIMESERIES:temp_air
+              ...
+    connections:                # optional
+      - source: house_1
+        destination: house_2
+        carrier: ElectricityGridConnection
+
+Classes are looked up in `mtress.carriers`, `mtress.demands` and
+`mtress.technologies` or given as "module.Class". Demands and
+components are named by their key. Both sections accept either form
+(class: parameters or name: technology and parameters). Constants such
+as gases and technology templates are referenced as "CONSTANT:NAME",
+e.g. "CONSTANT:HYDROGEN" or "CONSTANT:PEM_ELECTROLYSER". Other sections
+(e.g. "general" with solver settings) are ignored.
+
+Time series read from files ("FILE:file:column") are taken out of the
+topology and referenced by name, so that configurations only differing
+in their time series share the compiled meta model.
+
+SPDX-FileCopyrightText: Deutsches Zentrum für Luft- und Raumfahrt e.V. (DLR)
+
+SPDX-License-Identifier: MIT
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import importlib
+import inspect
+import json
+import logging
+import os
+from pathlib import Path
+
+import yaml
+
+LOGGER = logging.getLogger(__file__)
+
+#: Sections of a location in a configuration
+LOCATION_SECTIONS = ("carriers", "demands", "components")
+
+# Compiled meta models keyed by the hash of their topology
+_COMPILED_MODELS: dict = {}
+
+
+def load_config(config: dict | str | Path) -> tuple[dict, str | None]:
+    """
+    Load a configuration.
+
+    :param config: Configuration dict or name of a YAML file
+    :return: Configuration and directory relative file names refer to
+        (None for dicts, i.e. the working directory)
+    """
+    if isinstance(config, dict):
+        return config, None
+
+    with open(config, encoding="utf-8") as file:
+        return yaml.safe_load(file), os.path.dirname(os.path.abspath(config))
+
+
+def _resolve_file(specifier, base_dir: str | None):
+    """Make the file name of a file specifier relative to base_dir."""
+    if (
+        base_dir is None
+        or not isinstance(specifier, str)
+        or not specifier.startswith("FILE:")
+    ):
+        return specifier
+
+    _, file, column = specifier.split(":", maxsplit=2)
+    return f"FILE:{os.path.join(base_dir, file)}:{column}"
+
+
+def split_timeseries(config: dict, base_dir: str = None) -> tuple[dict, dict]:
+    """
+    Separate the topology of a configuration from its time series.
+
+    :return: Topology (locations and connections) with file specifiers
+        replaced by references to named time series, and the named time
+        series
+    """
+    timeseries = {
+        name: _resolve_file(specifier, base_dir)
+        for name, specifier in (config.get("timeseries") or {}).items()
+    }
+
+    def extract(item, path):
+        match item:
+            case str() if item.startswith("FILE:"):
+                name = "/".join(path)
+                timeseries[name] = _resolve_file(item, base_dir)
+                return f"TIMESERIES:{name}"
+            case dict():
+                return {
+                    key: extract(value, path + [str(key)])
+                    for key, value in item.items()
+                }
+            case list():
+                return [
+                    extract(value, path + [str(number)])
+                    for number, value in enumerate(item)
+                ]
+            case _:
+                return item
+
+    topology = {
+        "locations": extract(config.get("locations") or {}, []),
+        "connections": config.get("connections") or [],
+    }
+    return topology, timeseries
+
+
+def topology_hash(topology: dict) -> str:
+    """Hash identifying a topology."""
+    return hashlib.sha256(
+        json.dumps(topology, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def _find(name: str, modules: list, suffix: str = ""):
+    """Find a class or constant by name."""
+    if "." in name:
+        module_name, _, attribute = name.rpartition(".")
+        return getattr(importlib.import_module(module_name), attribute)
+
+    for module in modules:
+        for candidate in (name, name + suffix):
+            if hasattr(module, candidate):
+                return getattr(module, candidate)
+
+    raise ValueError(f"Unknown class or constant {name}")
+
+
+def _resolve_constants(item):
+    """Replace constant references by the constants."""
+    # pylint: disable=import-outside-toplevel
+    from . import physics, technologies
+
+    match item:
+        case str() if item.startswith("CONSTANT:"):
+            return _find(item.split(":", 1)[1], [physics, technologies])
+        case dict():
+            return {
+                _resolve_constants(key): _resolve_constants(value)
+                for key, value in item.items()
+            }
+        case list():
+            return [_resolve_constants(value) for value in item]
+        case _:
+            return item
+
+
+def _create(cls: type, name: str | None, parameters: dict, context: str):
+    """Create a component, checking its parameters."""
+    signature = inspect.signature(cls)
+    parameters = _resolve_constants(parameters or {})
+    if name is not None and "name" in signature.parameters:
+        parameters = {"name": name, **parameters}
+
+    # Templates provide further parameters
+    bind = signature.bind
+    if parameters.get("template") is not None:
+        bind = signature.bind_partial
+
+    try:
+        bind(**parameters)
+    except TypeError as error:
+        raise ValueError(f"Invalid parameters of {context}: {error}") from None
+
+    return cls(**parameters)
+
+
+def _component_entries(section: dict, modules: list, suffix: str = ""):
+    """Iterate over (class, name, parameters) of a location section."""
+    for key, spec in (section or {}).items():
+        if isinstance(spec, dict) and "technology" in spec:
+            yield (
+                _find(spec["technology"], modules, suffix),
+                key,
+                spec.get("parameters"),
+            )
+        else:
+            yield _find(key, modules, suffix), key, spec
+
+
+def build_meta_model(cls: type, topology: dict):
+    """Create a meta model from a topology, see `split_timeseries`."""
+    # pylint: disable=import-outside-toplevel
+    from . import carriers, demands, technologies
+    from ._location import Location
+    from ._meta_model import Connection
+
+    meta_model = cls()
+    locations = {}
+    for location_name, sections in topology["locations"].items():
+        sections = sections or {}
+        unknown = set(sections) - set(LOCATION_SECTIONS)
+        if unknown:
+            raise ValueError(
+                f"Unknown sections {sorted(unknown)} of location "
+                + f"{location_name}"
+            )
+
+        location = Location(name=location_name)
+        for section, modules, suffix in (
+            ("carriers", [carriers], "Carrier"),
+            ("demands", [demands], ""),
+            ("components", [technologies], ""),
+        ):
+            for component_class, name, parameters in _component_entries(
+                sections.get(section), modules, suffix
+            ):
+                location.add(
+                    _create(
+                        component_class,
+                        name,
+                        parameters,
+                        f"{location_name}/{name}",
+                    )
+                )
+
+        meta_model.add_location(location)
+        locations[location_name] = location
+
+    for connection in topology["connections"]:
+        for end in ("source", "destination"):
+            if connection[end] not in locations:
+                raise ValueError(f"Unknown location {connection[end]}")
+        meta_model.add_connection(
+            Connection(
+                source=locations[connection["source"]],
+                destination=locations[connection["destination"]],
+                carrier=_find(
+                    connection["carrier"], [technologies, carriers], "Carrier"
+                ),
+            )
+        )
+
+    return meta_model
+
+
+def compiled_meta_model(cls: type, topology: dict):
+    """
+    Create a meta model for a topology, using a cached compiled model.
+
+    The first call for a topology validates it and creates the meta
+    model. Later calls return copies of it.
+    """
+    key = (cls, topology_hash(topology))
+    if key not in _COMPILED_MODELS:
+        _COMPILED_MODELS[key] = build_meta_model(cls, topology)
+    else:
+        LOGGER.debug("Using compiled meta model %s.", key[1])
+
+    return copy.deepcopy(_COMPILED_MODELS[key])
+
+
+def clear_compiled_models() -> None:
+    """Forget all compiled meta models."""
+    _COMPILED_MODELS.clear()
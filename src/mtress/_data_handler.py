@@ -1,12 +1,175 @@
 """Handle data."""
 
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections import OrderedDict
 from enum import IntEnum
+from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
+LOGGER = logging.getLogger(__file__)
+
 TimeseriesSpecifier = str | pd.Series | list | float
 
+#: Environment variable to set the directory of the columnar file cache
+CACHE_DIR_VARIABLE = "MTRESS_CACHE_DIR"
+
+#: Maximum number of entries of each in-memory cache
+CACHE_SIZE = 256
+
+
+class _LRUCache(OrderedDict):
+    """Mapping dropping the least recently used entries beyond maxsize."""
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+# Process-wide caches shared by all data handlers
+_FILE_HASHES: _LRUCache = _LRUCache(CACHE_SIZE)
+_COLUMNS: _LRUCache = _LRUCache(CACHE_SIZE)
+_ALIGNED: _LRUCache = _LRUCache(CACHE_SIZE)
+
+
+def _cache_dir() -> Path:
+    """Directory of the columnar file cache."""
+    return Path(
+        os.environ.get(
+            CACHE_DIR_VARIABLE,
+            os.path.join(tempfile.gettempdir(), "mtress_cache"),
+        )
+    )
+
+
+def _file_hash(file: str) -> str:
+    """Content hash of a file, re-computed only if the file changed."""
+    stat = os.stat(file)
+    key = (os.path.abspath(file), stat.st_mtime_ns, stat.st_size)
+
+    if key not in _FILE_HASHES:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file, "rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(chunk)
+        _FILE_HASHES[key] = digest.hexdigest()
+
+    return _FILE_HASHES[key]
+
+
+def _index_key(index: pd.DatetimeIndex) -> tuple:
+    """Hashable key identifying a time index."""
+    if len(index) > 0 and index.freq is not None:
+        return (index[0], len(index), index.freqstr)
+
+    return (hashlib.blake2b(index.asi8.tobytes()).hexdigest(), len(index))
+
+
+def _write_column_store(data: pd.DataFrame, directory: Path) -> None:
+    """
+    Store the numeric columns of a data frame as NumPy files.
+
+    Other columns are only listed, so that they are read from the
+    original file.
+    """
+    tmp_directory = Path(
+        tempfile.mkdtemp(prefix=directory.name, dir=directory.parent)
+    )
+    columns = [
+        column
+        for column in data.columns
+        if pd.api.types.is_numeric_dtype(data[column])
+    ]
+    np.save(tmp_directory / "index.npy", data.index.asi8)
+    for number, column in enumerate(columns):
+        np.save(tmp_directory / f"{number}.npy", data[column].to_numpy())
+    with open(tmp_directory / "columns.json", "w", encoding="utf-8") as fp:
+        json.dump(
+            {
+                "columns": [str(column) for column in columns],
+                "other_columns": [
+                    str(column)
+                    for column in data.columns
+                    if column not in columns
+                ],
+                "tz": None if data.index.tz is None else str(data.index.tz),
+            },
+            fp,
+        )
+
+    try:
+        tmp_directory.rename(directory)
+    except OSError:
+        # Another process stored the same file in the meantime
+        for item in tmp_directory.iterdir():
+            item.unlink()
+        tmp_directory.rmdir()
+
+
+def _read_column_store(directory: Path, column: str) -> pd.Series | None:
+    """
+    Read a single column of a stored file as memory mapped array.
+
+    Returns None for columns of the file which are not stored, as they are
+    not numeric.
+    """
+    with open(directory / "columns.json", encoding="utf-8") as fp:
+        meta = json.load(fp)
+
+    if column in meta.get("other_columns", []):
+        return None
+
+    if column not in meta["columns"]:
+        raise KeyError(f"Column {column} not found")
+
+    index = pd.DatetimeIndex(
+        np.load(directory / "index.npy", mmap_mode="r").view("M8[ns]")
+    )
+    if meta["tz"] is not None:
+        index = index.tz_localize("UTC").tz_convert(meta["tz"])
+
+    values = np.load(
+        directory / f"{meta['columns'].index(column)}.npy", mmap_mode="r"
+    )
+    return pd.Series(values, index=index, name=column, copy=False)
+
+
+def _cache_csv(file: str, store: Path) -> pd.DataFrame | None:
+    """
+    Parse a CSV file and write it to the columnar store.
+
+    Returns the parsed data if it cannot be stored, e.g. if it has no
+    datetime index.
+    """
+    data = pd.read_csv(file, index_col=0, parse_dates=True)
+    if not isinstance(data.index, pd.DatetimeIndex):
+        return data
+
+    try:
+        store.parent.mkdir(parents=True, exist_ok=True)
+        _write_column_store(data, store)
+    except OSError as error:
+        LOGGER.warning("Cannot cache %s: %s", file, error)
+        return data
+
+    return None
+
 
 class TimeseriesType(IntEnum):
     POINT = 0
@@ -16,10 +179,52 @@ class TimeseriesType(IntEnum):
 class DataHandler:
     """Handle data provided in auxiliary files."""
 
-    def __init__(self, timeindex: pd.DatetimeIndex):
-        """Initialize data handler."""
+    def __init__(
+        self,
+        timeindex: pd.DatetimeIndex,
+        reference_index: pd.DatetimeIndex = None,
+        timeseries: dict = None,
+    ):
+        """
+        Initialize data handler.
+
+        :param timeindex: Time index the time series are prepared for.
+        :param reference_index: Time index positional data (lists, arrays
+            and series without a datetime index) refers to. Defaults to
+            timeindex and has to cover it, e.g. when only a window of the
+            full optimisation horizon is modelled.
+        :param timeseries: Named time series specifiers, which can be
+            referenced as "TIMESERIES:name".
+        """
         self.timeindex = timeindex
-        self._cache: dict[pd.DataFrame] = {}
+        if reference_index is None:
+            reference_index = timeindex
+        self.reference_index = reference_index
+        if timeseries is None:
+            timeseries = {}
+        self.timeseries = timeseries
+
+    @property
+    def physical_timeindex(self) -> pd.DatetimeIndex:
+        """
+        Time index of the physical time series.
+
+        This differs from timeindex if the modelled time steps do not form
+        the original horizon, e.g. when using typical periods.
+        """
+        return self.timeindex
+
+    def get_physical_timeseries(
+        self, specifier: TimeseriesSpecifier, kind: TimeseriesType
+    ):
+        """
+        Prepare a time series for the physical time index.
+
+        Use this for inputs of calculations depending on the actual point
+        in time, e.g. solar positions, and pass their results through
+        `get_timeseries`.
+        """
+        return self.get_timeseries(specifier, kind)
 
     def get_timeseries(
         self, specifier: TimeseriesSpecifier, kind: TimeseriesType
@@ -32,37 +237,63 @@ class DataHandler:
         """
         if kind == TimeseriesType.INTERVAL:
             target_index = self.timeindex[:-1]
+            reference_index = self.reference_index[:-1]
         else:
             target_index = self.timeindex
+            reference_index = self.reference_index
 
         match specifier:
+            case str() if specifier.startswith("TIMESERIES:"):
+                _, name = specifier.split(":", maxsplit=1)
+                if name not in self.timeseries:
+                    raise KeyError(f"Time series {name} not defined")
+                return self.get_timeseries(self.timeseries[name], kind=kind)
+
             case str() if specifier.startswith("FILE:"):
                 _, file, column = specifier.split(":", maxsplit=2)
-                series = self._read_from_file(file, column)
 
-                # Call function again to check series for consistency
-                return self.get_timeseries(series, kind=kind)
+                # Aligned series are cached for all handlers in the process.
+                # Files without datetime index are positional data, which
+                # refers to the reference index.
+                key = (
+                    _file_hash(file),
+                    column,
+                    _index_key(target_index),
+                    _index_key(reference_index),
+                    kind,
+                )
+                if key not in _ALIGNED:
+                    series = self._read_from_file(file, column, target_index)
+
+                    # Call function again to check series for consistency
+                    _ALIGNED[key] = self.get_timeseries(series, kind=kind)
+
+                # Copy, so that changes by callers do not alter the cache
+                return _ALIGNED[key].copy()
 
             case pd.Series() as series:
                 if isinstance(series.index, pd.DatetimeIndex):
-                    matching_index = target_index.isin(series.index)
-                    if not matching_index.all():
-                        np.array(matching_index)
-                        flipped_array = np.logical_not(matching_index)
-                        flipped_list = flipped_array.tolist()
+                    positions = series.index.get_indexer(target_index)
+                    missing = positions < 0
+                    if missing.any():
                         raise KeyError(
                             "Provided series doesn't cover time index: "
-                            + f"{list(self.timeindex[flipped_list])}"
+                            + f"{list(target_index[missing])}"
                         )
-                    return series.reindex(target_index)
-                else:
                     return pd.Series(
-                        data=series.values,
+                        data=series.to_numpy()[positions],
                         index=target_index,
+                        name=series.name,
+                    )
+                else:
+                    return self._positional_series(
+                        series.values, target_index, reference_index
                     )
 
             case list() | np.ndarray() as values:
-                return pd.Series(data=values, index=target_index)
+                return self._positional_series(
+                    values, target_index, reference_index
+                )
 
             case float() | int() as value:
                 return pd.Series(data=value, index=target_index)
@@ -72,19 +303,181 @@ class DataHandler:
                     f"Time series specifier {specifier} not supported"
                 )
 
-    def _read_from_file(self, file: str, column: str):
-        """Read a column from a file."""
-        if file in self._cache and column in self._cache[file]:
-            # This column was already read from the file
-            return self._cache[file][column]
+    @staticmethod
+    def _positional_series(values, target_index, reference_index):
+        """Place positional values on the reference and cut the target."""
+        if len(target_index) == len(reference_index):
+            return pd.Series(data=values, index=target_index)
 
-        if file.lower().endswith(".csv"):
-            self._cache[file] = data = pd.read_csv(
-                file, index_col=0, parse_dates=True
-            )
-            return data[column]
+        return pd.Series(data=values, index=reference_index).reindex(
+            target_index
+        )
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Clear the in-memory caches shared by all data handlers."""
+        _FILE_HASHES.clear()
+        _COLUMNS.clear()
+        _ALIGNED.clear()
+
+    @staticmethod
+    def cache_files(files) -> None:
+        """
+        Convert CSV files to the columnar file cache ahead of reading.
+
+        Every file is parsed once, processes reading it afterwards, e.g.
+        workers running many models, only memory map the needed columns.
+        """
+        for file in set(files):
+            if Path(file).suffix.lower() != ".csv":
+                continue
+            store = _cache_dir() / _file_hash(file)
+            if not store.exists():
+                _cache_csv(file, store)
+
+    def _read_from_file(
+        self, file: str, column: str, index: pd.DatetimeIndex = None
+    ):
+        """
+        Read a column from a file.
+
+        CSV files are parsed once and converted to a binary columnar store
+        (one NumPy file per column) in the cache directory, which can be set
+        using the environment variable MTRESS_CACHE_DIR. Later reads, also
+        by other processes, memory map the requested column only.
+
+        HDF5 files are addressed by "key/column". Like Parquet and Feather
+        files, they are read selectively: Only the requested column and,
+        if an index is given, only the rows between its first and last
+        time step are loaded.
+        """
+        suffix = Path(file).suffix.lower()
 
-        if file.lower().endswith(".h5"):
-            raise NotImplementedError("HDF5 file support not implemented yet")
+        if suffix == ".csv":
+            file_hash = _file_hash(file)
+            if (file_hash, column) not in _COLUMNS:
+                _COLUMNS[(file_hash, column)] = self._read_csv_column(
+                    file, file_hash, column
+                )
+            return _COLUMNS[(file_hash, column)]
+
+        if index is None or len(index) == 0:
+            start = end = None
+        else:
+            start, end = index[0], index[-1]
+
+        if suffix in (".h5", ".hdf5", ".hdf"):
+            return self._read_hdf_column(file, column, start, end)
+
+        if suffix in (".parquet", ".feather"):
+            return self._read_arrow_column(
+                file, column, start, end, file_format=suffix[1:]
+            )
 
         raise NotImplementedError(f"Unsupported file format for file {file}")
+
+    @staticmethod
+    def _read_csv_column(file: str, file_hash: str, column: str):
+        """
+        Read a column of a CSV file using the columnar store.
+
+        Non-numeric columns are not stored, they are parsed from the file.
+        """
+        store = _cache_dir() / file_hash
+        if not store.exists():
+            data = _cache_csv(file, store)
+            if data is not None:
+                return data[column]
+
+        series = _read_column_store(store, column)
+        if series is None:
+            series = pd.read_csv(file, index_col=0, parse_dates=True)[column]
+
+        return series
+
+    @staticmethod
+    def _read_hdf_column(file: str, column: str, start, end):
+        """
+        Read the rows between start and end of a column of a HDF5 file.
+
+        Rows are filtered when reading from stores in table format. Stores
+        in fixed format can only be read completely.
+        """
+        key, _, column = column.rpartition("/")
+
+        with pd.HDFStore(file, mode="r") as store:
+            if not key:
+                keys = store.keys()
+                if len(keys) != 1:
+                    raise ValueError(
+                        f"Key needed to read from {file}, use key/column."
+                    )
+                key = keys[0]
+
+            if store.get_storer(key).is_table:
+                where = None
+                if start is not None:
+                    where = "index >= start & index <= end"
+                data = store.select(key, where=where, columns=[column])
+            else:
+                data = store.select(key)
+
+        if isinstance(data, pd.DataFrame):
+            if column not in data.columns:
+                raise KeyError(f"Column {column} not found")
+            data = data[column]
+
+        if start is not None:
+            data = data.loc[start:end]
+
+        return data
+
+    @staticmethod
+    def _read_arrow_column(
+        file: str, column: str, start, end, file_format: str
+    ):
+        """
+        Read the rows between start and end of a column of a Parquet or
+        Feather file.
+
+        The time column is the (first) index stored by pandas or the first
+        column of the file. Filters are pushed down to the reader, so row
+        groups of Parquet files outside of the time range are skipped.
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(file, format=file_format)
+
+        metadata = dataset.schema.pandas_metadata or {}
+        index_columns = [
+            name
+            for name in metadata.get("index_columns", [])
+            if isinstance(name, str)
+        ]
+        if index_columns:
+            time_column = index_columns[0]
+        else:
+            time_column = dataset.schema.names[0]
+
+        if column not in dataset.schema.names or column == time_column:
+            raise KeyError(f"Column {column} not found")
+
+        row_filter = None
+        if start is not None:
+            time_type = dataset.schema.field(time_column).type
+            time = ds.field(time_column)
+            row_filter = (time >= pa.scalar(start, type=time_type)) & (
+                time <= pa.scalar(end, type=time_type)
+            )
+
+        table = dataset.to_table(
+            columns=[time_column, column], filter=row_filter
+        )
+
+        data = table.to_pandas(ignore_metadata=True)
+        return pd.Series(
+            data[column].to_numpy(),
+            index=pd.DatetimeIndex(data[time_column]),
+            name=column,
+        )
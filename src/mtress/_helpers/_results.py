@@ -1,5 +1,347 @@
 """Utility functions for the analysis of solph results."""
 
+from __future__ import annotations
+
+import json
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+#: Column levels of flow results, source and target node of each flow
+FLOW_LEVELS = (
+    "source_location",
+    "source_component",
+    "source_node",
+    "target_location",
+    "target_component",
+    "target_node",
+)
+
+
+#: Column levels of node results, e.g. storage contents
+NODE_LEVELS = ("location", "component", "node")
+
+#: Attribute of solph models mapping labels of storage contents which are
+#: variables of components (instead of GenericStorages) to pairs of
+#: (variable, index), the variable being indexed by (*index, TIMEPOINTS)
+STORAGE_CONTENTS = "mtress_storage_contents"
+
+
+def _variable_values(variable, n_rows: int) -> np.ndarray:
+    """Read values of a variable indexed by (element, time) as array."""
+    return np.array(
+        [data.value for data in variable.values()], dtype=float
+    ).reshape(n_rows, -1)
+
+
+def _label_index(labels: list, names: tuple) -> pd.MultiIndex:
+    """Create a MultiIndex of labels, which might be empty."""
+    if not labels:
+        return pd.MultiIndex.from_arrays([[]] * len(names), names=names)
+    return pd.MultiIndex.from_tuples(
+        [tuple(label) for label in labels], names=names
+    )
+
+
+class FlowResults(Mapping):
+    """
+    Flows of a solved model stored in a single array.
+
+    Values are stored as a two-dimensional array (time steps x flows).
+    Columns are sorted by the labels of the source and the target node,
+    so that flows leaving a location or component are neighbours and can
+    be selected as views without copying data.
+
+    Like the dictionary returned by `get_flows`, flow results map pairs
+    of (source label, target label) to time series.
+    """
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        index: pd.DatetimeIndex,
+        columns: pd.MultiIndex,
+    ):
+        """
+        Initialize flow results.
+
+        :param data: Flow values (time steps x flows)
+        :param index: Time index of the rows
+        :param columns: Sorted MultiIndex (see FLOW_LEVELS) of the columns
+        """
+        if data.shape != (len(index), len(columns)):
+            raise ValueError(
+                f"Shape {data.shape} of data does not match index and "
+                + "columns."
+            )
+
+        self.data = data
+        self.index = index
+        self.columns = columns
+
+    @classmethod
+    def from_model(cls, model) -> FlowResults:
+        """
+        Read flows from the variables of a solved solph model.
+
+        :param model: Solved oemof.solph model
+        """
+        return cls.from_variable(model, model.flow, model.FLOWS)
+
+    @classmethod
+    def from_variable(cls, model, variable, flows) -> FlowResults:
+        """
+        Read a variable indexed by flows and time steps, e.g. statuses.
+
+        :param model: Solved oemof.solph model
+        :param variable: Variable indexed by flows x TIMESTEPS
+        :param flows: Pairs of (source node, target node) of the variable
+        """
+        flows = list(flows)
+        n_timesteps = len(model.TIMESTEPS)
+        values = _variable_values(variable, len(flows))
+
+        labels = [
+            tuple(source.label) + tuple(target.label)
+            for source, target in flows
+        ]
+        order = sorted(range(len(flows)), key=labels.__getitem__)
+
+        return cls(
+            data=np.ascontiguousarray(values[order].T),
+            index=model.es.timeindex[:n_timesteps],
+            columns=_label_index(
+                [labels[position] for position in order], FLOW_LEVELS
+            ),
+        )
+
+    def __getitem__(self, key) -> pd.Series:
+        """Return the flow between source and target label as a view."""
+        source, target = key
+        position = self.columns.get_loc(tuple(source) + tuple(target))
+        return pd.Series(self.data[:, position], index=self.index, copy=False)
+
+    def __iter__(self):
+        """Iterate over (source label, target label) of all flows."""
+        for label in self.columns:
+            yield label[:3], label[3:]
+
+    def __len__(self) -> int:
+        """Return number of flows."""
+        return len(self.columns)
+
+    def _select(self, rows=slice(None), columns=slice(None)) -> FlowResults:
+        """Create flow results sharing memory with these results."""
+        return FlowResults(
+            data=self.data[rows, columns],
+            index=self.index[rows],
+            columns=self.columns[columns],
+        )
+
+    def location(self, location: str) -> FlowResults:
+        """Return view of the flows leaving nodes of a location."""
+        return self._select(columns=self.columns.get_loc(location))
+
+    def component(self, location: str, component: str) -> FlowResults:
+        """
+        Return view of the flows leaving nodes of a component.
+
+        Carriers are components named after their class, e.g. use
+        `component("house", "ElectricityCarrier")` to get the flows
+        distributed by the electricity carrier of location "house".
+        """
+        return self._select(
+            columns=self.columns.get_loc((location, component))
+        )
+
+    def between(self, start=None, stop=None) -> FlowResults:
+        """Return view of the time steps from start to stop (inclusive)."""
+        return self._select(rows=self.index.slice_indexer(start, stop))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return flows as data frame sharing memory with these results."""
+        return pd.DataFrame(
+            self.data, index=self.index, columns=self.columns, copy=False
+        )
+
+
+@dataclass
+class StoredResults:
+    """
+    Results read from a result store.
+
+    All values are memory mapped, i.e. data is only read from disk when
+    it is accessed.
+
+    :param flows: Flows of the model
+    :param storage_content: Storage contents at the time points
+    :param status: Status of non-convex flows
+    :param metadata: Further information, e.g. nodes of the model
+    """
+
+    flows: FlowResults
+    storage_content: pd.DataFrame
+    status: FlowResults
+    metadata: dict
+
+
+def _write_index(index: pd.DatetimeIndex, file: Path) -> dict:
+    """Store a time index, return its description for the metadata."""
+    np.save(file, index.asi8)
+    return {
+        "file": file.name,
+        "tz": None if index.tz is None else str(index.tz),
+        "freq": index.freqstr,
+    }
+
+
+def _read_index(directory: Path, meta: dict) -> pd.DatetimeIndex:
+    """Read a time index stored by `_write_index`."""
+    index = pd.DatetimeIndex(np.load(directory / meta["file"]).view("M8[ns]"))
+    if meta["tz"] is not None:
+        index = index.tz_localize("UTC").tz_convert(meta["tz"])
+    if meta["freq"] is not None:
+        index.freq = meta["freq"]
+    return index
+
+
+def results_from_model(model) -> StoredResults:
+    """
+    Read flows, statuses of non-convex flows and storage contents of a
+    solved solph model.
+
+    :param model: Solved oemof.solph model
+    """
+    flows = FlowResults.from_model(model)
+
+    # Blocks exist without variables if they have no elements
+    nonconvex_block = getattr(model, "NonConvexFlowBlock", None)
+    if hasattr(nonconvex_block, "status"):
+        status = FlowResults.from_variable(
+            model, nonconvex_block.status, nonconvex_block.NONCONVEX_FLOWS
+        )
+    else:
+        status = FlowResults(
+            data=np.empty((len(flows.index), 0)),
+            index=flows.index,
+            columns=_label_index([], FLOW_LEVELS),
+        )
+
+    storage_labels = []
+    storage_content = np.empty((0, len(flows.index) + 1))
+    storage_block = getattr(model, "GenericStorageBlock", None)
+    if hasattr(storage_block, "storage_content"):
+        storage_labels = [storage.label for storage in storage_block.STORAGES]
+        storage_content = _variable_values(
+            storage_block.storage_content, len(storage_labels)
+        )
+
+    component_contents = getattr(model, STORAGE_CONTENTS, {})
+    if component_contents:
+        storage_labels += list(component_contents)
+        storage_content = np.vstack(
+            [storage_content]
+            + [
+                [variable[(*index, t)].value for t in model.TIMEPOINTS]
+                for variable, index in component_contents.values()
+            ]
+        ).astype(float)
+
+    return StoredResults(
+        flows=flows,
+        status=status,
+        storage_content=pd.DataFrame(
+            storage_content.T,
+            index=model.es.timeindex[: storage_content.shape[1]],
+            columns=_label_index(storage_labels, NODE_LEVELS),
+        ),
+        metadata={},
+    )
+
+
+def write_result_store(model, path: str | Path) -> None:
+    """
+    Write results of a solved solph model to a directory.
+
+    Flows, statuses of non-convex flows and storage contents are stored
+    as one NumPy file each, with the time series of every element (flow
+    or storage) stored consecutively. Labels, time indices and the nodes
+    of the model are stored as JSON metadata.
+
+    :param model: Solved oemof.solph model
+    :param path: Directory to write to, created if needed
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    results = results_from_model(model)
+    np.save(path / "flows.npy", np.ascontiguousarray(results.flows.data.T))
+    np.save(path / "status.npy", np.ascontiguousarray(results.status.data.T))
+    np.save(
+        path / "storage_content.npy",
+        np.ascontiguousarray(results.storage_content.to_numpy().T),
+    )
+
+    metadata = {
+        "timesteps": _write_index(
+            results.flows.index, path / "timesteps.npy"
+        ),
+        "timepoints": _write_index(
+            results.storage_content.index, path / "timepoints.npy"
+        ),
+        "flows": [list(label) for label in results.flows.columns],
+        "status": [list(label) for label in results.status.columns],
+        "storages": [
+            list(label) for label in results.storage_content.columns
+        ],
+        "nodes": [
+            {"label": list(node.label), "type": type(node).__name__}
+            for node in model.es.nodes
+        ],
+    }
+    with open(path / "metadata.json", "w", encoding="utf-8") as fp:
+        json.dump(metadata, fp, indent=1)
+
+
+def read_result_store(path: str | Path) -> StoredResults:
+    """
+    Read results written by `write_result_store`.
+
+    Data is memory mapped, so selecting e.g. the flows of one component
+    for one month only reads these values from disk:
+    `results.flows.component("house", "heat_pump").between(start, end)`
+
+    :param path: Directory to read from
+    """
+    path = Path(path)
+    with open(path / "metadata.json", encoding="utf-8") as fp:
+        metadata = json.load(fp)
+
+    timesteps = _read_index(path, metadata["timesteps"])
+    timepoints = _read_index(path, metadata["timepoints"])
+
+    def read_flows(name, labels):
+        return FlowResults(
+            data=np.load(path / f"{name}.npy", mmap_mode="r").T,
+            index=timesteps,
+            columns=_label_index(labels, FLOW_LEVELS),
+        )
+
+    return StoredResults(
+        flows=read_flows("flows", metadata["flows"]),
+        status=read_flows("status", metadata["status"]),
+        storage_content=pd.DataFrame(
+            np.load(path / "storage_content.npy", mmap_mode="r").T,
+            index=timepoints,
+            columns=_label_index(metadata["storages"], NODE_LEVELS),
+            copy=False,
+        ),
+        metadata=metadata,
+    )
+
 
 def get_flows(results):
     """
@@ -17,6 +359,7 @@ def get_flows(results):
 
     return flows
 
+
 def get_storage_content(results):
     """
     Extract storage content from results dictionary.
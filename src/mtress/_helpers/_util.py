@@ -1,6 +1,7 @@
 """Utility functions."""
 
 import dataclasses
+import functools
 import inspect
 from pathlib import Path
 from typing import Any
@@ -118,6 +119,7 @@ def enable_templating(template_class):
         func_signature = inspect.signature(func)
         func_params = func_signature.parameters
 
+        @functools.wraps(func)
         def _wrapper(*args, template=None, **kwargs):
             if template is not None:
                 if not isinstance(template, template_class):
@@ -133,6 +135,19 @@ def enable_templating(template_class):
 
             return func(*args, **kwargs)
 
+        # Expose the signature of func including the template
+        parameters = list(func_params.values())
+        position = len(parameters)
+        if parameters and parameters[-1].kind == inspect.Parameter.VAR_KEYWORD:
+            position -= 1
+        parameters.insert(
+            position,
+            inspect.Parameter(
+                "template", inspect.Parameter.KEYWORD_ONLY, default=None
+            ),
+        )
+        _wrapper.__signature__ = func_signature.replace(parameters=parameters)
+
         return _wrapper
 
     return _decorator
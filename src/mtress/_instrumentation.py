@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentation of building and solving MTRESS models.
+
+SPDX-FileCopyrightText: Deutsches Zentrum für Luft- und Raumfahrt e.V. (DLR)
+
+SPDX-License-Identifier: MIT
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable
+
+import pandas as pd
+import pyomo.environ as po
+from pyomo.core.expr.visitor import identify_variables
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+LOGGER = logging.getLogger(__file__)
+
+#: Name used for model parts not belonging to an MTRESS component
+UNATTRIBUTED = "unattributed"
+
+
+def _peak_rss(children: bool = False) -> int | None:
+    """Peak resident set size (B) of this process or of its children."""
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(
+        resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    ).ru_maxrss
+    # ru_maxrss is given in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class PhaseRecord:
+    """
+    Measurements of a phase of building or solving a model.
+
+    :param name: Name of the phase
+    :param wall_time: Wall time (s)
+    :param peak_rss: Peak resident set size (B) of the process reached
+        until the end of the phase (None if not available)
+    :param peak_rss_children: Same for child processes, e.g. the solver
+    :param component: Identifier of the MTRESS component, if the record
+        covers a single component only
+    """
+
+    name: str
+    wall_time: float
+    peak_rss: int | None
+    peak_rss_children: int | None
+    component: str | None = None
+
+
+def logging_hook(
+    logger: logging.Logger = LOGGER, level: int = logging.INFO
+) -> Callable[[PhaseRecord], None]:
+    """Create a hook logging the phases of a model."""
+
+    def log_phase(record: PhaseRecord) -> None:
+        if record.component is None:
+            logger.log(
+                level,
+                "Phase %s took %.3f s (peak RSS %s).",
+                record.name,
+                record.wall_time,
+                "n/a" if record.peak_rss is None else f"{record.peak_rss:,} B",
+            )
+        else:
+            logger.log(
+                level,
+                "Phase %s of %s took %.3f s.",
+                record.name,
+                record.component,
+                record.wall_time,
+            )
+
+    return log_phase
+
+
+class Instrumentation:
+    """Record phases of a model and pass them to hooks."""
+
+    def __init__(self):
+        """Initialize instrumentation without records."""
+        self.records: list[PhaseRecord] = []
+        self._hooks: list[Callable[[PhaseRecord], None]] = []
+
+    def add_hook(self, hook: Callable[[PhaseRecord], None]) -> None:
+        """Add a function called with every finished phase."""
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[PhaseRecord], None]) -> None:
+        """Remove a hook added before."""
+        self._hooks.remove(hook)
+
+    @contextmanager
+    def phase(self, name: str, component: str = None):
+        """Record wall time and peak memory of the enclosed code."""
+        start = time.perf_counter()
+        yield
+        record = PhaseRecord(
+            name=name,
+            wall_time=time.perf_counter() - start,
+            peak_rss=_peak_rss(),
+            peak_rss_children=_peak_rss(children=True),
+            component=component,
+        )
+        self.records.append(record)
+
+        for hook in self._hooks:
+            hook(record)
+
+    def clear(self) -> None:
+        """Forget all records."""
+        self.records.clear()
+
+
+def component_name(component) -> str:
+    """Identifier of a component as used in reports."""
+    if component is None:
+        return UNATTRIBUTED
+    return "/".join(component.identifier)
+
+
+def _owner(index, default):
+    """MTRESS component of the first node in an index, if any."""
+    if not isinstance(index, tuple):
+        index = (index,)
+
+    for element in index:
+        component = getattr(element, "mtress_component", None)
+        if component is not None:
+            return component
+
+    return default
+
+
+def _top_level_name(component, model) -> str:
+    """Name of the component of the model a (sub) component belongs to."""
+    block = component.parent_block()
+    while block is not model:
+        component = block
+        block = component.parent_block()
+
+    return component.parent_component().local_name
+
+
+def model_statistics(model, owners: dict = None) -> pd.DataFrame:
+    """
+    Count variables, binaries, constraints and nonzeros per component.
+
+    Variables and constraints indexed by nodes or flows are attributed to
+    the MTRESS component of the (first, i.e. source) node in their index.
+    Others are attributed using owners, e.g. constraints added by the
+    component in `add_constraints`.
+
+    :param model: Pyomo model
+    :param owners: Mapping of names of model components to the MTRESS
+        components which added them
+    :return: Table with one row per MTRESS component
+    """
+    if owners is None:
+        owners = {}
+
+    counts = {}
+
+    def count(component, quantity, value=1):
+        counts.setdefault(component_name(component), {})
+        row = counts[component_name(component)]
+        row[quantity] = row.get(quantity, 0) + value
+
+    for variable in model.component_objects(po.Var, descend_into=True):
+        default = owners.get(_top_level_name(variable, model))
+        for index, data in variable.items():
+            owner = _owner(index, default)
+            count(owner, "variables")
+            if data.is_binary():
+                count(owner, "binaries")
+
+    for constraint in model.component_objects(
+        po.Constraint, active=True, descend_into=True
+    ):
+        default = owners.get(_top_level_name(constraint, model))
+        for index, data in constraint.items():
+            if not data.active:
+                continue
+            owner = _owner(index, default)
+            count(owner, "constraints")
+            count(
+                owner,
+                "nonzeros",
+                sum(
+                    1
+                    for _ in identify_variables(data.body, include_fixed=False)
+                ),
+            )
+
+    statistics = pd.DataFrame.from_dict(counts, orient="index")
+    statistics = statistics.reindex(
+        columns=["variables", "binaries", "constraints", "nonzeros"]
+    )
+    statistics = statistics.fillna(0).astype(int).sort_index()
+    statistics.index.name = "component"
+    return statistics
+
+
+@dataclass
+class InstrumentationReport:
+    """
+    Report on building and solving a model.
+
+    :param phases: Wall time (s), number of runs and peak memory (B) per
+        phase, summed over repeated runs (e.g. rolling horizon windows)
+    :param component_times: Wall time (s) per MTRESS component (rows) and
+        phase (columns)
+    :param statistics: Number of variables, binaries, constraints and
+        nonzeros per MTRESS component, None if no model was built
+    """
+
+    phases: pd.DataFrame
+    component_times: pd.DataFrame
+    statistics: pd.DataFrame | None
+
+    @classmethod
+    def from_records(
+        cls, records: list[PhaseRecord], statistics: pd.DataFrame = None
+    ) -> InstrumentationReport:
+        """Summarize phase records."""
+        records = pd.DataFrame(
+            [vars(record) for record in records],
+            columns=[
+                "name",
+                "wall_time",
+                "peak_rss",
+                "peak_rss_children",
+                "component",
+            ],
+        )
+        model_records = records[records["component"].isna()]
+        component_records = records[records["component"].notna()]
+
+        phases = model_records.groupby("name", sort=False).agg(
+            wall_time=("wall_time", "sum"),
+            runs=("wall_time", "size"),
+            peak_rss=("peak_rss", "max"),
+            peak_rss_children=("peak_rss_children", "max"),
+        )
+        component_times = component_records.pivot_table(
+            index="component",
+            columns="name",
+            values="wall_time",
+            aggfunc="sum",
+            fill_value=0.0,
+        )
+
+        return cls(
+            phases=phases,
+            component_times=component_times,
+            statistics=statistics,
+        )
+
+    def shares(self) -> pd.DataFrame:
+        """Share of every MTRESS component in the model statistics."""
+        if self.statistics is None:
+            raise ValueError("No model statistics available.")
+        return self.statistics / self.statistics.sum().where(
+            self.statistics.sum() > 0
+        )
+
+    def __str__(self) -> str:
+        """Summarize report as text."""
+        parts = ["Phases:", self.phases.to_string()]
+        if self.statistics is not None:
+            parts += [
+                "Model statistics:",
+                self.statistics.to_string(),
+                "Total: "
+                + ", ".join(
+                    f"{quantity} {value}"
+                    for quantity, value in self.statistics.sum().items()
+                ),
+            ]
+        return "\n".join(parts)
@@ -112,12 +112,12 @@ class Location(NamedElement):
         detail: bool = True,
         flow_results=None,
         flow_color: dict = None,
-        colorscheme: dict = None,
     ) -> Tuple[Digraph, set]:
         """
         Generate graphviz visualization of the MTRESS location.
 
         :param detail: Include solph nodes.
+        :param flow_color: Colours of the flows, see `SolphModel.flow_colors`
         """
         graph = Digraph(name=f"cluster_{self.identifier}")
         graph.attr("graph", label=self.name)
@@ -125,9 +125,7 @@ class Location(NamedElement):
         external_edges = set()
 
         for component in self.components:
-            subgraph, edges = component.graph(
-                detail, flow_results, flow_color, colorscheme
-            )
+            subgraph, edges = component.graph(detail, flow_results, flow_color)
 
             external_edges.update(edges)
             graph.subgraph(subgraph)
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from pathlib import Path
 from typing import TYPE_CHECKING, Iterable, List
 
 if TYPE_CHECKING:
@@ -44,21 +45,60 @@ class MetaModel:
         self,
         locations: List[Location] = None,
         connections: List[(Location, Location, AbstractGridConnection)] = None,
+        timeseries: dict = None,
     ):
-        """Initialize the meta model."""
+        """
+        Initialize the meta model.
+
+        :param timeseries: Named time series specifiers, which components
+            can reference as "TIMESERIES:name".
+        """
         if connections is None:
             connections = []
         if locations is None:
             locations = []
+        if timeseries is None:
+            timeseries = {}
 
         self._connections = connections
         self._locations = locations
+        self.timeseries = timeseries
 
     @classmethod
-    def from_config(cls, config: dict):
-        """Generate the meta model from a configuration dict."""
-        # TODO: Implement me!
-        raise NotImplementedError("Not implemented yet")
+    def from_config(cls, config: dict | str | Path, base_dir: str = None):
+        """
+        Generate the meta model from a configuration.
+
+        The structure of the configuration is described in `mtress._config`.
+        Meta models are compiled once per topology, i.e. the configuration
+        without the time series read from files. Configurations differing
+        only in time series files reuse the compiled meta model without
+        validating and constructing it again.
+
+        :param config: Configuration dict or name of a YAML file
+        :param base_dir: Directory file names in the configuration are
+            relative to. Defaults to the directory of the YAML file or the
+            working directory for dicts.
+        """
+        # pylint: disable=import-outside-toplevel
+        from ._config import compiled_meta_model, load_config, split_timeseries
+
+        config, config_dir = load_config(config)
+        if base_dir is None:
+            base_dir = config_dir
+
+        topology, timeseries = split_timeseries(config, base_dir)
+        meta_model = compiled_meta_model(cls, topology)
+        meta_model.timeseries = timeseries
+        return meta_model
+
+    @staticmethod
+    def clear_config_cache() -> None:
+        """Forget meta models compiled by `from_config`."""
+        # pylint: disable=import-outside-toplevel
+        from ._config import clear_compiled_models
+
+        clear_compiled_models()
 
     def add_connection(self, connection: Connection):
         """Connect two locations in the meta model."""
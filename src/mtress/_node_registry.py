@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Registry of the solph nodes of a model.
+
+SPDX-FileCopyrightText: Deutsches Zentrum für Luft- und Raumfahrt e.V. (DLR)
+
+SPDX-License-Identifier: MIT
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+
+from oemof.network.network import Node
+
+
+class NodeRegistry:
+    """
+    Index of the solph nodes of a model.
+
+    Nodes are registered by their label (see `SolphLabel`), and indexed by
+    location and by the class of the MTRESS component which created them.
+    Labels can be given as `SolphLabel` or as plain tuples.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty registry."""
+        self._nodes: dict[tuple, Node] = {}
+        self._by_location: dict[str, list[Node]] = defaultdict(list)
+        self._by_component_class: dict[type, list[Node]] = defaultdict(list)
+
+    def add(self, node: Node) -> None:
+        """
+        Register a node created by an MTRESS component.
+
+        :raises KeyError: If a node with the same label exists
+        """
+        if node.label in self._nodes:
+            raise KeyError(
+                f"Solph component named {node.label} already exists"
+            )
+
+        self._nodes[node.label] = node
+        self._by_location[node.label.location].append(node)
+        self._by_component_class[type(node.mtress_component)].append(node)
+
+    def clear(self) -> None:
+        """Forget all nodes, e.g. before the energy system is rebuilt."""
+        self._nodes.clear()
+        self._by_location.clear()
+        self._by_component_class.clear()
+
+    def __getitem__(self, label: tuple) -> Node:
+        return self._nodes[label]
+
+    def __contains__(self, label: tuple) -> bool:
+        return label in self._nodes
+
+    def __iter__(self):
+        return iter(self._nodes.values())
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def get(self, label: tuple, default: Node = None) -> Node:
+        """Get the node of a label, default if there is none."""
+        return self._nodes.get(label, default)
+
+    def by_location(self, location: str) -> list[Node]:
+        """Nodes of the location with the given name."""
+        return list(self._by_location.get(location, []))
+
+    def by_component(self, component_class: type | tuple) -> list[Node]:
+        """Nodes of components of the given class(es) or subclasses."""
+        return [
+            node
+            for node_class, nodes in self._by_component_class.items()
+            if issubclass(node_class, component_class)
+            for node in nodes
+        ]
+
+    def by_carrier(self, carrier_class: type) -> list[Node]:
+        """Nodes of carriers of the given class, e.g. their level buses."""
+        # pylint: disable=import-outside-toplevel
+        from .carriers._abstract_carrier import AbstractCarrier
+
+        if not issubclass(carrier_class, AbstractCarrier):
+            raise ValueError(f"{carrier_class.__name__} is not a carrier")
+
+        return self.by_component(carrier_class)
@@ -9,11 +9,109 @@ SPDX-License-Identifier: MIT
 """
 
 
+import math
+
 from oemof.network.network import Node
 from oemof.solph import Bus, Model
 from oemof.solph.components import GenericStorage
 from pyomo import environ as po
 
+#: Ways to select the active interval of the flexible multiplexer
+INTERVAL_SELECTIONS = ("binary", "sos2", "logarithmic")
+
+
+def _binary_intervals(model, name, weight, n_levels, add_constraints):
+    """Select the active interval using one binary per interval."""
+    timesteps = list(model.TIMESTEPS)
+    interval_numbers = range(n_levels - 1)
+
+    # Binary variable indicating active interval
+    active_interval = po.Var(
+        interval_numbers, model.TIMESTEPS, domain=po.Binary, bounds=(0, 1)
+    )
+    setattr(model, f"{name}_active_interval", active_interval)
+    interval = dict(active_interval.items())
+
+    # Allow exactly one interval to be active
+    add_constraints(
+        "active_interval_constraint",
+        [model.TIMESTEPS],
+        {
+            t: po.quicksum((interval[i, t] for i in interval_numbers)) == 1
+            for t in timesteps
+        },
+    )
+
+    # Constrain weight variables to be non-zero only when the corresponding
+    # levels sourround the active interval
+    last = n_levels - 1
+    add_constraints(
+        "weight_constraints",
+        [range(n_levels), model.TIMESTEPS],
+        {
+            (number, t): weight[number, t]
+            <= (interval[number - 1, t] if number > 0 else 0)
+            + (interval[number, t] if number < last else 0)
+            for number in range(n_levels)
+            for t in timesteps
+        },
+    )
+
+
+def _logarithmic_intervals(model, name, weight, n_levels, add_constraints):
+    """
+    Select the active interval using a binary encoding of the intervals.
+
+    Intervals are numbered by a (reflected) Gray code, so that adjacent
+    intervals differ in one bit. Every bit of the code excludes the levels
+    only touching intervals of the other bit value, leaving the two levels
+    of the selected interval (Vielma and Nemhauser, 2011). Codes beyond
+    the last interval select the top level.
+    """
+    timesteps = list(model.TIMESTEPS)
+    n_bits = math.ceil(math.log2(n_levels - 1))
+    bit_numbers = range(n_bits)
+
+    def gray_code(interval):
+        return interval ^ (interval >> 1)
+
+    def adjacent_bits(number, bit):
+        """Values of a bit in the codes of the intervals next to a level."""
+        return {
+            (gray_code(interval) >> bit) & 1
+            for interval in (number - 1, number)
+            if 0 <= interval < 2**n_bits
+        }
+
+    code = po.Var(bit_numbers, model.TIMESTEPS, domain=po.Binary)
+    setattr(model, f"{name}_interval_code", code)
+    code_bit = dict(code.items())
+
+    for suffix, bit_value, limit in (
+        ("code_one_constraint", 1, lambda bit, t: code_bit[bit, t]),
+        ("code_zero_constraint", 0, lambda bit, t: 1 - code_bit[bit, t]),
+    ):
+        excluded = {
+            bit: [
+                number
+                for number in range(n_levels)
+                if adjacent_bits(number, bit) == {bit_value}
+            ]
+            for bit in bit_numbers
+        }
+        add_constraints(
+            suffix,
+            [bit_numbers, model.TIMESTEPS],
+            {
+                (bit, t): po.quicksum(
+                    (weight[number, t] for number in excluded[bit])
+                )
+                <= limit(bit, t)
+                for bit in bit_numbers
+                for t in timesteps
+            },
+        )
+
 
 def storage_multiplexer_constraint(
     model: Model,
@@ -22,6 +120,7 @@ def storage_multiplexer_constraint(
     multiplexer_bus: Bus,
     input_levels: dict[Node, float] = None,
     output_levels: dict[Node, float] = None,
+    interval_selection: str = "binary",
 ):
     r"""
     Add constraits to implement a storage content dependent multiplexer.
@@ -38,99 +137,84 @@ def storage_multiplexer_constraint(
     multiplexer_bus : oemof.solph.Bus
         Bus which connects the input and output levels to the storage.
     input_levels : dict[oemof.network.network.Node, float]
-        Mapping of storage content levels to the corresponding input node,
-        e.g. for a given value in this list, the corresponding input can be
-        active if the storage content is lower than this value.
+        Mapping of input nodes to storage content levels (relative to the
+        nominal storage capacity), e.g. the input can be active if the
+        storage content is lower than its level.
     output_levels : dict[oemof.network.network.Node, float]
-        Mapping of storage content levels to the corresponding output node,
-        e.g. for a given value in this list, the corresponding output can be
-        active if the storage content is higher than this value.
+        Mapping of output nodes to storage content levels (relative to the
+        nominal storage capacity), e.g. the output can be active if the
+        storage content is higher than its level.
+    interval_selection : string
+        How the active interval is selected: "binary" uses one binary
+        variable per interval, "sos2" declares the weights as SOS2 set
+        (no binary variables, needs a solver supporting SOS) and
+        "logarithmic" uses a Gray code of the intervals with
+        ceil(log2(number of intervals)) binary variables.
+
+    The storage content is expressed as convex combination of weights of
+    the levels, of which only the two surrounding the active interval
+    may be non-zero. Flows are limited by the energy of the intervals
+    below (inputs) or above (outputs) their level, using prefix sums of
+    the weights, so that building the constraints scales linearly with
+    the number of levels and time steps.
     """
     # TODO: Add example.
 
-    if not input_levels.values() == output_levels.values():
-        raise KeyError("Input and output levels must be identical")
-
     # http://yetanothermathprogrammingconsultant.blogspot.com/2015/10/piecewise-linear-functions-in-mip-models.html
-    # Helper variables
-    levels = list(sorted(input_levels.values()))
-
-    intervals = {
-        f"{name}_interval_{i:02d}": (left, right)
-        for i, (left, right) in enumerate(zip(levels[:-1], levels[1:]))
-    }
-
-    # Set for indexing the intervals
-    # (each interval is represented by its lower bound)
-    def init_interval_indices(model):
-        return [
-            (interval, timestep)
-            for timestep in model.TIMESTEPS
-            for interval in intervals
-        ]
-
-    interval_indices = po.Set(
-        dimen=2, ordered=True, initialize=init_interval_indices
+    levels = sorted(
+        {
+            0.0,
+            1.0,
+            *map(float, [*input_levels.values(), *output_levels.values()]),
+        }
     )
-    setattr(model, f"{name}_interval_indices", interval_indices)
+    level_index = {level: number for number, level in enumerate(levels)}
+    capacity = float(storage_component.nominal_storage_capacity)
+    timesteps = list(model.TIMESTEPS)
+    increments = {t: float(model.timeincrement[t]) for t in timesteps}
 
-    # Binary variable indicating active interval
-    active_interval = po.Var(interval_indices, domain=po.Binary, bounds=(0, 1))
-    setattr(model, f"{name}_active_interval", active_interval)
+    level_numbers = range(len(levels))
 
-    # Allow exactly one interval to be active
-    def init_active_interval_constraint(_, timestep):
-        expr = 0
-        for interval in intervals:
-            expr += active_interval[interval, timestep]
-
-        return expr == 1
-
-    setattr(
-        model,
-        f"{name}_active_interval_constraint",
-        po.Constraint(model.TIMESTEPS, rule=init_active_interval_constraint),
-    )
-
-    # Set for indexing the weight variables
-    def init_level_indices(model):
-        return [
-            (level, timestep)
-            for timestep in model.TIMESTEPS
-            for level in levels
-        ]
-
-    level_indices = po.Set(
-        dimen=2, ordered=True, initialize=init_level_indices
-    )
-    setattr(model, f"{name}_level_indices", level_indices)
+    if interval_selection not in INTERVAL_SELECTIONS:
+        raise ValueError(
+            f"Unknown interval selection {interval_selection}, "
+            + f"use one of {INTERVAL_SELECTIONS}"
+        )
 
     # Weight variable
-    weights = po.Var(level_indices, bounds=(0, 1))
+    weights = po.Var(level_numbers, model.TIMESTEPS, bounds=(0, 1))
     setattr(model, f"{name}_weights", weights)
 
-    # Constrain weight variables to be non-zero only when the corresponding
-    # levels sourround the active interval
-    def init_weight_constraint(_, level, timestep):
-        expr = 0
-        expr += weights[level, timestep]
-
-        adjacent_intervals = [
-            interval
-            for interval, boundaries in intervals.items()
-            if level in boundaries
-        ]
+    # Look variables up once, constraints are built from these mappings
+    weight = dict(weights.items())
+    content = model.GenericStorageBlock.storage_content
 
-        for interval in adjacent_intervals:
-            expr -= active_interval[interval, timestep]
-
-        return expr <= 0
+    def add_constraints(suffix, index, expressions):
+        setattr(
+            model,
+            f"{name}_{suffix}",
+            po.Constraint(*index, rule=expressions),
+        )
 
-    setattr(
-        model,
-        f"{name}_weight_constraints",
-        po.Constraint(level_indices, rule=init_weight_constraint),
-    )
+    if interval_selection == "binary":
+        _binary_intervals(model, name, weight, len(levels), add_constraints)
+    elif interval_selection == "sos2":
+        setattr(
+            model,
+            f"{name}_sos2",
+            po.SOSConstraint(
+                model.TIMESTEPS,
+                rule=lambda _, t: (
+                    [weight[number, t] for number in level_numbers],
+                    [number + 1 for number in level_numbers],
+                ),
+                sos=2,
+            ),
+        )
+    else:
+        _logarithmic_intervals(
+            model, name, weight, len(levels), add_constraints
+        )
 
     # Couple the weigths with the storage content, i.e.
     #   levels[n] * weights[n] + levels[n+1] * weights[n+1] == storage_content
@@ -138,96 +222,91 @@ def storage_multiplexer_constraint(
     #     weigths[n] > 0 and weigths[n+1] > 0
     # only if
     #     levels[n] <= storage_content <= levels[n+1]
-    def couple_levels_with_storage(model, timestep):
-        expr = 0
-        for level in levels:
-            expr += weights[level, timestep] * level
-
-        expr -= model.GenericStorageBlock.storage_content[
-            storage_component, timestep
-        ]
-        return expr == 0
-
-    setattr(
-        model,
-        f"{name}_weights_coupling",
-        po.Constraint(model.TIMESTEPS, rule=couple_levels_with_storage),
+    add_constraints(
+        "weights_coupling",
+        [model.TIMESTEPS],
+        {
+            t: po.quicksum(
+                (
+                    level * capacity * weight[number, t]
+                    for number, level in enumerate(levels)
+                ),
+            )
+            == content[storage_component, t]
+            for t in timesteps
+        },
     )
 
     # Constrain the weigth sum to one
-    def constrain_weight_sum(_, timestep):
-        expr = 0
-        for level in levels:
-            expr += weights[level, timestep]
-
-        expr -= 1
-        return expr == 0
-
-    setattr(
-        model,
-        f"{name}_weight_sum_constraint",
-        po.Constraint(model.TIMESTEPS, rule=constrain_weight_sum),
+    add_constraints(
+        "weight_sum_constraint",
+        [model.TIMESTEPS],
+        {
+            t: po.quicksum((weight[number, t] for number in level_numbers))
+            == 1
+            for t in timesteps
+        },
     )
 
-    # Now we can constrain the input and output flows
-    # Helper mapping the levels to the input components
-    input_energy = {
-        upp: upp - low for low, upp in zip(levels[:-1], levels[1:])
-    }
-
-    # Define constraints on the input flows
-    def constrain_input_flows(model, flow_level, timestep):
-        expr = 0
-
-        # Energy of the interval below the flow level
-        expr -= sum(
-            weights[level, timestep] for level in levels if level < flow_level
-        )
-        expr *= input_energy.get(flow_level, 0)
-
-        # Energy which is extracted in this timestep
-        expr += (
-            model.flow[input_levels[flow_level], multiplexer_bus, timestep]
-            * model.timeincrement[timestep]
-        )
-
-        return expr <= 0
-
-    # Create constraints
-    setattr(
-        model,
-        f"{name}_input_constraints",
-        po.Constraint(level_indices, rule=constrain_input_flows),
+    # Now we can constrain the input and output flows by the energy of the
+    # interval below (inputs) or above (outputs) their level, weighted by
+    # the sum of the weights below (above) the level. These sums are
+    # prefix sums shared by all flows of a time step.
+    weights_below = {}
+    weights_above = {}
+    for t in timesteps:
+        below = 0
+        for number in level_numbers:
+            weights_below[number, t] = below
+            below += weight[number, t]
+        above = 0
+        for number in reversed(level_numbers):
+            weights_above[number, t] = above
+            above += weight[number, t]
+
+    def limits(node_levels, neighbour):
+        """List level numbers and energies of the intervals of nodes."""
+        result = []
+        for level in node_levels.values():
+            number = level_index[float(level)]
+            if 0 <= number + neighbour < len(levels):
+                energy = abs(level - levels[number + neighbour]) * capacity
+            else:
+                energy = 0
+            result.append((number, energy))
+        return result
+
+    # Flows are indexed by the position of their node
+    input_flows = [
+        (model.flow[node, multiplexer_bus, t] for t in timesteps)
+        for node in input_levels
+    ]
+    add_constraints(
+        "input_constraints",
+        [range(len(input_levels)), model.TIMESTEPS],
+        {
+            (position, t): flow * increments[t]
+            <= energy * weights_below[number, t]
+            for position, ((number, energy), flows) in enumerate(
+                zip(limits(input_levels, -1), input_flows)
+            )
+            for t, flow in zip(timesteps, flows)
+        },
     )
 
-    # Helper mapping the levels to the output components
-    output_energy = {
-        low: upp - low for low, upp in zip(levels[:-1], levels[1:])
-    }
-
-    # Define constraints on the input flows
-    def constrain_output_flows(model, flow_level, timestep):
-        expr = 0
-
-        # Energy of the interval above the flow level
-        expr -= sum(
-            weights[level, timestep] for level in levels if level > flow_level
-        )
-        expr *= output_energy.get(flow_level, 0)
-
-        # Energy which is extracted in this timestep
-        expr += (
-            model.flow[multiplexer_bus, output_levels[flow_level], timestep]
-            * model.timeincrement[timestep]
-        )
-
-        return expr <= 0
-
-    # Create constraints
-    setattr(
-        model,
-        f"{name}_output_constraints",
-        po.Constraint(level_indices, rule=constrain_output_flows),
+    output_flows = [
+        (model.flow[multiplexer_bus, node, t] for t in timesteps)
+        for node in output_levels
+    ]
+    add_constraints(
+        "output_constraints",
+        [range(len(output_levels)), model.TIMESTEPS],
+        {
+            (position, t): flow * increments[t]
+            <= energy * weights_above[number, t]
+            for position, ((number, energy), flows) in enumerate(
+                zip(limits(output_levels, 1), output_flows)
+            )
+            for t, flow in zip(timesteps, flows)
+        },
     )
-
-    return
@@ -2,7 +2,14 @@
 # -*- coding: utf-8 -*-
 
 """
-Script for using MTRESS using (only) the JSON interface
+Script for using MTRESS using (only) the YAML interface
+
+Many configurations can be run at once, e.g. `mtress "buildings/*.yaml"`.
+They are solved in parallel by a pool of worker processes, which import
+MTRESS only once. CSV files are parsed once for all configurations, see
+`DataHandler.cache_files`. Results of every configuration are saved to a
+directory of the output directory (see `SolphModel.save_results`),
+together with a summary table of all runs.
 
 SPDX-FileCopyrightText: Deutsches Zentrum für Luft und Raumfahrt
 SPDX-FileCopyrightText: Patrik Schönfeldt
@@ -10,83 +17,296 @@ SPDX-FileCopyrightText: Patrik Schönfeldt
 SPDX-License-Identifier: MIT
 """
 
+import argparse
+import glob
+import logging
 import os
+import signal
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
 
 import pandas as pd
-import yaml
-
-from mtress import MetaModel
-
-
-def _read_csv_files(parameter_dict, dir_path, time_range):
-    for key in parameter_dict:
-        item = parameter_dict[key]
-        if isinstance(item, dict):
-            _read_csv_files(parameter_dict[key], dir_path, time_range)
-        elif isinstance(item, str) and ".csv:" in item:
-            file_name, column_name = item.split(":", 1)
-            csv_data = pd.read_csv(
-                os.path.join(dir_path, file_name),
-                comment="#",
-                index_col=0,
-                sep=",",
-                parse_dates=True,
-            )
-            csv_data = csv_data.iloc[time_range[0] : time_range[1]]
-            parameter_dict[key] = csv_data[column_name]
+from oemof.solph import processing
+
+from mtress import MetaModel, SolphModel
+from mtress._config import load_config, split_timeseries
+from mtress._data_handler import DataHandler
+from mtress._worker import initialise_worker, worker_settings
+
+LOGGER = logging.getLogger(__file__)
 
+#: Name of the summary table written to the output directory
+SUMMARY_FILE = "summary.csv"
 
-def prepare_mtress_config(parameters, time_range=(0, -1)):
+
+def prepare_mtress_config(parameters):
     """
     :param parameters: dict or file name of yaml file holding configuration
-    :param time_range: tuple (first time step, last time step)
+    :return: configuration and directory file names in it are relative to
     """
-    if isinstance(parameters, dict):
-        dir_path = parameters["dir_path"]
-        del parameters["dir_path"]
-    else:
-        if isinstance(parameters, str):
-            dir_path = os.path.dirname(os.path.realpath(parameters))
-            with open(parameters) as file:
-                parameters = yaml.safe_load(file)
-
-    _read_csv_files(parameters, dir_path, time_range=time_range)
+    if isinstance(parameters, dict) and "dir_path" in parameters:
+        parameters = dict(parameters)
+        dir_path = parameters.pop("dir_path")
+        return parameters, dir_path
 
-    if "time_index" not in parameters:
-        parameters["time_index"] = parameters["demand"]["heating"][
-            "values"
-        ].index
-    return parameters
+    return load_config(parameters)
 
 
-def run_mtress(parameters, solver="cbc"):
+def run_mtress(parameters, solver=None, solve_kwargs=None):
     """
-    :param parameters: dict holding configuration
-    :param solver: solver to use for oemof.solph
+    :param parameters: dict or file name of yaml file holding configuration,
+        see `MetaModel.from_config`. The section "general" gives the
+        time index and options per solver.
+    :param solver: solver to use for oemof.solph, defaults to the solver
+        given in the configuration or cbc
+    :param solve_kwargs: keyword arguments of the solve call, updating the
+        ones given in the configuration
     """
-    meta_model = MetaModel(**parameters)
-    meta_model.solve(
+    parameters, dir_path = prepare_mtress_config(parameters)
+    general = parameters.get("general", {})
+    if solver is None:
+        solver = general.get("solver", "cbc")
+    solver_options = general.get(solver, {})
+
+    meta_model = MetaModel.from_config(parameters, base_dir=dir_path)
+    solph_model = SolphModel(meta_model, timeindex=general["timeindex"])
+    solph_model.solve(
         solver=solver,
-        solve_kwargs={"tee": False},
-        cmdline_options={"ratio": 0.01},
+        solve_kwargs={
+            **solver_options.get("solve_kwargs", {"tee": False}),
+            **(solve_kwargs or {}),
+        },
+        cmdline_options=solver_options.get("cmdline_options", {"ratio": 0.01}),
     )
 
-    return meta_model
+    return solph_model
 
 
-if __name__ == "__main__":
-    script_path = os.path.realpath(__file__)
-    if len(sys.argv) < 2:
-        script_dir = os.path.dirname(script_path)
-        yaml_file_name = os.path.join(
-            script_dir, "../example/all_techs_example.yaml"
-        )
-    else:
-        path = sys.argv[1]
-        if os.path.exists(path):
-            yaml_file_name = path
+def _expand_configs(patterns: list[str]) -> list[str]:
+    """Expand glob patterns to configuration files, keeping their order."""
+    files = []
+    for pattern in patterns:
+        if any(character in pattern for character in "*?["):
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if not matches:
+                LOGGER.warning("No configuration matches %s.", pattern)
+            files.extend(matches)
         else:
-            print("Usage:", script_path, "config.yaml")
-            sys.exit()
-    run_mtress(parameters=yaml_file_name)
+            files.append(pattern)
+
+    return list(dict.fromkeys(os.path.abspath(file) for file in files))
+
+
+def _run_names(files: list[str]) -> list[str]:
+    """Unique names of the runs, based on the file names."""
+    names = []
+    for file in files:
+        name = Path(file).stem
+        number = 1
+        while name in names:
+            number += 1
+            name = f"{Path(file).stem}_{number}"
+        names.append(name)
+
+    return names
+
+
+def _data_files(files: list[str]) -> set[str]:
+    """Files of the time series of all configurations."""
+    data_files = set()
+    for file in files:
+        try:
+            config, base_dir = load_config(file)
+            _, timeseries = split_timeseries(config, base_dir)
+        except Exception:  # pylint: disable=broad-except
+            # Errors are reported by the run of the configuration
+            continue
+
+        for specifier in timeseries.values():
+            if isinstance(specifier, str) and specifier.startswith("FILE:"):
+                data_files.add(specifier.split(":", maxsplit=2)[1])
+
+    return data_files
+
+
+@contextmanager
+def _time_limit(seconds: float | None):
+    """
+    Raise TimeoutError if the enclosed code runs longer than seconds.
+
+    Only available where SIGALRM exists. Running solver processes are
+    killed by Pyomo when the exception interrupts waiting for them.
+    """
+    if seconds is None:
+        yield
+        return
+
+    expired = []
+
+    def expire(signum, frame):
+        expired.append(True)
+        raise TimeoutError(f"Run exceeded {seconds} s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+    # The error is lost if the alarm interrupts code ignoring exceptions,
+    # e.g. finalizers or callbacks of weak references
+    if expired:
+        raise TimeoutError(f"Run exceeded {seconds} s")
+
+
+def _run_config(name: str, file: str) -> dict:
+    """Run a single configuration in a worker process."""
+    settings = worker_settings()
+    output_dir = Path(settings["output_dir"])
+    timeout = settings["timeout"]
+
+    solve_kwargs = {}
+    if timeout is not None and not hasattr(signal, "SIGALRM"):
+        # Without alarms, only the solver can be limited
+        solve_kwargs["timelimit"] = timeout
+        timeout = None
+
+    result = {"config": name, "file": file}
+    start = time.perf_counter()
+    try:
+        with _time_limit(timeout):
+            solph_model = run_mtress(
+                file,
+                solver=settings["solver"],
+                solve_kwargs=solve_kwargs,
+            )
+            solph_model.save_results(output_dir / name)
+
+        model = solph_model.model
+        solver_info = model.solver_results["Solver"][0]
+        result.update(
+            status=str(solver_info["Status"]),
+            termination_condition=str(solver_info["Termination condition"]),
+            objective=processing.meta_results(model)["objective"],
+        )
+    except TimeoutError as error:
+        result.update(status="timeout", error=str(error))
+    except Exception as error:  # pylint: disable=broad-except
+        LOGGER.exception("Configuration %s failed.", file)
+        result.update(status="error", error=repr(error))
+
+    result["wall_time"] = time.perf_counter() - start
+    return result
+
+
+def run_batch(
+    configs: list[str],
+    output_dir: str,
+    workers: int = None,
+    timeout: float = None,
+    solver: str = None,
+) -> pd.DataFrame:
+    """
+    Run many configurations in parallel.
+
+    :param configs: Configuration files or glob patterns
+    :param output_dir: Directory receiving a result directory per
+        configuration and the summary table
+    :param workers: Number of worker processes, defaults to CPU count
+    :param timeout: Wall time limit (s) per configuration
+    :param solver: Solver overriding the ones of the configurations
+    :return: Summary with one row per configuration
+    """
+    files = _expand_configs(configs)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    DataHandler.cache_files(_data_files(files))
+
+    settings = {
+        "output_dir": str(output_dir),
+        "timeout": timeout,
+        "solver": solver,
+    }
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=initialise_worker,
+        initargs=(settings,),
+    ) as executor:
+        futures = [
+            executor.submit(_run_config, name, file)
+            for name, file in zip(_run_names(files), files)
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            LOGGER.info(
+                "Configuration %s finished: %s.",
+                result["config"],
+                result["status"],
+            )
+            results.append(result)
+
+    summary = pd.DataFrame(
+        results,
+        columns=[
+            "config",
+            "file",
+            "status",
+            "termination_condition",
+            "objective",
+            "wall_time",
+            "error",
+        ],
+    )
+    summary = summary.set_index("config").sort_index()
+    summary.to_csv(output_dir / SUMMARY_FILE)
+    return summary
+
+
+def main(argv=None) -> int:
+    """Run configurations given on the command line."""
+    parser = argparse.ArgumentParser(
+        description="Run MTRESS models defined in YAML files."
+    )
+    parser.add_argument(
+        "configs",
+        nargs="+",
+        help="Configuration files or glob patterns, e.g. 'configs/*.yaml'.",
+    )
+    parser.add_argument("-o", "--output-dir", default="results")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        help="Number of worker processes, defaults to the CPU count.",
+    )
+    parser.add_argument(
+        "--timeout", type=float, help="Wall time limit (s) per config."
+    )
+    parser.add_argument(
+        "--solver", help="Solver overriding the configured ones."
+    )
+    parser.add_argument("--loglevel", default="INFO")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.loglevel)
+    summary = run_batch(
+        args.configs,
+        args.output_dir,
+        workers=args.workers,
+        timeout=args.timeout,
+        solver=args.solver,
+    )
+    print(summary.drop(columns=["file", "error"]).to_string())
+
+    return 0 if (summary["status"] == "ok").all() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Parallel evaluation of MTRESS model variants.
+
+SPDX-FileCopyrightText: Deutsches Zentrum für Luft- und Raumfahrt e.V. (DLR)
+
+SPDX-License-Identifier: MIT
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Iterator
+
+import pandas as pd
+from oemof.solph import processing
+
+from ._helpers import get_flows
+from ._meta_model import MetaModel
+from ._solph_model import SolphModel
+from ._worker import initialise_worker, worker_settings
+
+LOGGER = logging.getLogger(__file__)
+
+
+def _expand_parameter_grid(parameter_grid: dict | list) -> list[dict]:
+    """Expand parameter grid to a list of parameter combinations."""
+    if isinstance(parameter_grid, dict):
+        names = list(parameter_grid)
+        return [
+            dict(zip(names, values))
+            for values in itertools.product(*parameter_grid.values())
+        ]
+
+    return [dict(parameters) for parameters in parameter_grid]
+
+
+def _solve_scenario(number: int, parameters: dict) -> dict:
+    """Solve a single scenario in a worker process, reporting failures."""
+    try:
+        return _build_and_solve_scenario(number, parameters)
+    except Exception as error:  # pylint: disable=broad-except
+        LOGGER.exception("Scenario %s failed.", number)
+        return _error_result(number, parameters, error)
+
+
+def _error_result(number: int, parameters: dict, error: Exception) -> dict:
+    """Result of a scenario which could not be solved."""
+    return {
+        "scenario": number,
+        **parameters,
+        "status": "error",
+        "error": repr(error),
+    }
+
+
+def _build_and_solve_scenario(number: int, parameters: dict) -> dict:
+    """Build and solve a single scenario in a worker process."""
+    settings = worker_settings()
+    meta_model: MetaModel = settings["factory"](**parameters)
+
+    solph_model = SolphModel(meta_model, timeindex=settings["timeindex"])
+    model = solph_model.solve(
+        solver=settings["solver"],
+        solve_kwargs=settings["solve_kwargs"],
+        cmdline_options=settings["cmdline_options"],
+    )
+
+    solver_info = model.solver_results["Solver"][0]
+    result = {
+        "scenario": number,
+        **parameters,
+        "status": str(solver_info["Status"]),
+        "termination_condition": str(solver_info["Termination condition"]),
+        "objective": processing.meta_results(model)["objective"],
+    }
+
+    if settings["key_flows"]:
+        flows = get_flows(processing.results(model))
+        for name, labels in settings["key_flows"].items():
+            result[name] = flows[labels].sum()
+
+    return result
+
+
+def iterate_scenarios(
+    factory: Callable[..., MetaModel],
+    parameter_grid: dict | list,
+    timeindex: dict | list | pd.DatetimeIndex,
+    workers: int = None,
+    solver: str = "cbc",
+    solve_kwargs: dict = None,
+    cmdline_options: dict = None,
+    key_flows: dict = None,
+) -> Iterator[dict]:
+    """
+    Solve model variants in parallel and yield results as they finish.
+
+    Every worker process writes solver files to its own temporary
+    directory, which is removed when the worker exits. Scenarios which
+    fail (e.g. as the factory raises an error or a worker dies) are
+    reported with status "error" and the error message. Scenarios not
+    started yet are cancelled when the iterator is closed.
+
+    :param factory: Function creating a MetaModel from the parameters of a
+        scenario. It has to be picklable, i.e. defined at module level.
+    :param parameter_grid: Either a mapping of parameter names to lists of
+        values, which are combined to a full grid, or a list of parameter
+        dicts.
+    :param timeindex: Time index definition for the solph models.
+    :param workers: Number of worker processes, defaults to CPU count.
+    :param key_flows: Mapping of result names to (source label, target
+        label) of flows, which sums are reported.
+    :return: Iterator over dicts holding scenario number, parameters,
+        solver status, objective and key flows, or the error of failed
+        scenarios.
+    """
+    settings = {
+        "factory": factory,
+        "timeindex": timeindex,
+        "solver": solver,
+        "solve_kwargs": solve_kwargs,
+        "cmdline_options": cmdline_options,
+        "key_flows": key_flows,
+    }
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=initialise_worker,
+        initargs=(settings,),
+    ) as executor:
+        futures = {
+            executor.submit(_solve_scenario, number, parameters): (
+                number,
+                parameters,
+            )
+            for number, parameters in enumerate(
+                _expand_parameter_grid(parameter_grid)
+            )
+        }
+
+        try:
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as error:  # pylint: disable=broad-except
+                    LOGGER.exception("Scenario %s failed.", futures[future][0])
+                    result = _error_result(*futures[future], error)
+
+                LOGGER.info(
+                    "Scenario %s finished: %s.",
+                    result["scenario"],
+                    result["status"],
+                )
+                yield result
+        finally:
+            # Do not wait for scenarios nobody asks for any more
+            for future in futures:
+                future.cancel()
+
+
+def run_scenarios(
+    factory: Callable[..., MetaModel],
+    parameter_grid: dict | list,
+    timeindex: dict | list | pd.DatetimeIndex,
+    workers: int = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Solve model variants in parallel and collect results in a table.
+
+    See `iterate_scenarios` for the arguments.
+
+    :return: Table with one row per scenario, indexed by scenario number.
+    """
+    results = list(
+        iterate_scenarios(
+            factory, parameter_grid, timeindex, workers=workers, **kwargs
+        )
+    )
+
+    if not results:
+        # Columns of results, as far as they are known without any
+        parameters = (
+            list(parameter_grid) if isinstance(parameter_grid, dict) else []
+        )
+        return pd.DataFrame(
+            columns=[
+                "scenario",
+                *parameters,
+                "status",
+                "termination_condition",
+                "objective",
+                *(kwargs.get("key_flows") or {}),
+            ]
+        ).set_index("scenario")
+
+    return pd.DataFrame(results).set_index("scenario").sort_index()
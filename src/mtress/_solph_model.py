@@ -9,13 +9,38 @@ SPDX-License-Identifier: MIT
 from __future__ import annotations
 
 import logging
+import warnings
+from enum import Enum
 from typing import TYPE_CHECKING, Dict, Tuple
 
 import pandas as pd
+import pyomo.environ as po
 from graphviz import Digraph
-from oemof.solph import EnergySystem, Model
+from oemof.solph import EnergySystem, Model, processing, sequence
+from oemof.solph.components import GenericStorage
 
-from ._data_handler import DataHandler
+from ._data_handler import DataHandler, TimeseriesType
+from ._helpers import FlowResults, StoredResults
+from ._helpers._results import (
+    STORAGE_CONTENTS,
+    read_result_store,
+    results_from_model,
+    write_result_store,
+)
+from ._instrumentation import (
+    Instrumentation,
+    InstrumentationReport,
+    component_name,
+    model_statistics,
+)
+from ._node_registry import NodeRegistry
+from ._temporal_aggregation import (
+    AggregatedDataHandler,
+    RecordingDataHandler,
+    TimeseriesAggregation,
+    TypicalPeriods,
+)
+from ._warm_start import apply_solution
 
 if TYPE_CHECKING:
     from ._abstract_component import AbstractSolphRepresentation
@@ -23,6 +48,32 @@ if TYPE_CHECKING:
 
 LOGGER = logging.getLogger(__file__)
 
+#: Colours of the flows of the carriers in graphs
+DEFAULT_COLORSCHEME = {
+    "ElectricityCarrier": "orange",
+    "GasCarrier": "steelblue",
+    "HeatCarrier": "maroon",
+}
+
+#: Pyomo solvers which receive the model in memory instead of files
+IN_MEMORY_SOLVERS = {"highs": "appsi_highs", "gurobi": "appsi_gurobi"}
+
+
+class SolverBackend(Enum):
+    """
+    Possible ways of passing the model to the solver.
+
+    FILE: Write the model to an LP file and read back the solution file,
+        using `oemof.solph.Model.solve`.
+    PERSISTENT: Pass the model in memory to a persistent Pyomo solver (see
+        IN_MEMORY_SOLVERS), which is kept for later solves, so that only
+        changes are passed when re-solving. Falls back to FILE if the
+        solver has no such interface or it is not available.
+    """
+
+    FILE = "file"
+    PERSISTENT = "persistent"
+
 
 class SolphModel:
     """Model adapter for MTRESS meta model."""
@@ -31,12 +82,18 @@ class SolphModel:
         self,
         meta_model: MetaModel,
         timeindex: dict | list | pd.DatetimeIndex,
+        aggregation: TypicalPeriods = None,
+        instrumentation_hooks: list = None,
     ):
         """
         Initialize model.
 
         :param timeindex:  time index definition for the soph model
         :param locations: configuration dictionary for locations
+        :param aggregation: If given, the model is built for typical periods
+            of the time series instead of the full time index.
+        :param instrumentation_hooks: Functions called with the record of
+            every finished phase, e.g. `logging_hook()`, see `report`.
         """
         self._meta_model = meta_model
         self._solph_representations: Dict[
@@ -55,40 +112,413 @@ class SolphModel:
                     "Don't know how to process timeindex specification"
                 )
 
-        self.data = DataHandler(self.timeindex)
+        self.data = DataHandler(
+            self.timeindex, timeseries=self._meta_model.timeseries
+        )
+
+        #: Records of the phases of building and solving the model
+        self.instrumentation = Instrumentation()
+        for hook in instrumentation_hooks or []:
+            self.instrumentation.add_hook(hook)
+        # MTRESS components which added parts of the model
+        self._model_component_owners: dict = {}
 
         # Registry of solph representations
         self._solph_representations = {}
         self.energy_system: EnergySystem = EnergySystem(
             timeindex=self.timeindex, infer_last_interval=False
         )
+        #: Solph nodes of the energy system by label, see `node`
+        self.node_registry = NodeRegistry()
+        # Flow colours per colour scheme, see `flow_colors`
+        self._flow_colors: dict = {}
         self.model: Model = None
+        self._base_variable_costs: dict = {}
+        self._base_objective = None
+        self.aggregation: TimeseriesAggregation = None
+        self._persistent_solvers: dict = {}
+        # Last solved model and its solution, see `last_solution`
+        self._solved_model: Model = None
+        self._last_solution: StoredResults = None
 
         # Store a reference to the solph model
         for component in self._meta_model.components:
             component.register_solph_model(self)
 
+        if aggregation is None:
+            self._build_solph_energy_system()
+        else:
+            self._build_aggregated_energy_system(aggregation)
+
+    def _build_aggregated_energy_system(self, config: TypicalPeriods):
+        """Build the energy system for typical periods of the time series."""
+        # Collect all time series used by the components
+        self.data = RecordingDataHandler(
+            self.timeindex, timeseries=self._meta_model.timeseries
+        )
         self._build_solph_energy_system()
 
+        self.aggregation = TimeseriesAggregation(
+            config, self.data.recorded, self.timeindex
+        )
+        LOGGER.info(
+            "Aggregated %s time steps to %s.",
+            len(self.timeindex) - 1,
+            len(self.aggregation.timeindex) - 1,
+        )
+
+        self._rebuild_solph_energy_system(
+            self.aggregation.timeindex,
+            data=AggregatedDataHandler(
+                self.aggregation, timeseries=self._meta_model.timeseries
+            ),
+        )
+
     def _build_solph_energy_system(self):
         """Build the `oemof.solph` representation of the energy system."""
-        for component in self._meta_model.components:
-            component.build_core()
+        phase = self.instrumentation.phase
 
-        for component in self._meta_model.components:
-            component.establish_interconnections()
+        with phase("build_core"):
+            for component in self._meta_model.components:
+                with phase("build_core", component_name(component)):
+                    component.build_core()
+
+        with phase("establish_interconnections"):
+            for component in self._meta_model.components:
+                with phase(
+                    "establish_interconnections", component_name(component)
+                ):
+                    component.establish_interconnections()
+
+        with phase("connections"):
+            for connection in self._meta_model.connections:
+                connection.source.connect(
+                    connection.carrier, connection.destination
+                )
 
-        for connection in self._meta_model.connections:
-            connection.source.connect(
-                connection.carrier, connection.destination
+        with phase("complete_structure"):
+            for component in self._meta_model.components:
+                with phase("complete_structure", component_name(component)):
+                    component.complete_structure()
+
+    def _rebuild_solph_energy_system(
+        self, timeindex: pd.DatetimeIndex, data: DataHandler = None
+    ):
+        """
+        Rebuild the `oemof.solph` energy system for a (partial) time index.
+
+        Unless another data handler is given, positional time series data
+        keeps referring to the full time index of the model, so that windows
+        of it can be modelled consistently.
+        """
+        if data is None:
+            data = DataHandler(
+                timeindex,
+                reference_index=self.timeindex,
+                timeseries=self._meta_model.timeseries,
             )
+        self.data = data
+        self.energy_system = EnergySystem(
+            timeindex=timeindex, infer_last_interval=False
+        )
+        self.node_registry.clear()
+        self._flow_colors = {}
+        self.model = None
+        self._model_component_owners = {}
+        self._base_variable_costs = {}
+
+        for component in self._meta_model.components:
+            component.reset_solph_nodes()
+
+        self._build_solph_energy_system()
+
+    def node(self, location: str, component: str, solph_node: str):
+        """
+        Get a solph node by the parts of its label (see `SolphLabel`).
+
+        E.g. `model.node("house_1", "heat_pump", "electricity")`.
+
+        :raises KeyError: If there is no such node
+        """
+        return self.node_registry[(location, component, solph_node)]
+
+    def nodes_by_location(self, location: str) -> list:
+        """Get the solph nodes of a location."""
+        return self.node_registry.by_location(location)
+
+    def nodes_by_component(self, component_class: type | tuple) -> list:
+        """Get the solph nodes of all components of the given class(es)."""
+        return self.node_registry.by_component(component_class)
+
+    def nodes_by_carrier(self, carrier_class: type) -> list:
+        """
+        Get the solph nodes of all carriers of the given class.
+
+        E.g. `model.nodes_by_carrier(HeatCarrier)` gives the temperature
+        level buses of all locations.
+        """
+        return self.node_registry.by_carrier(carrier_class)
 
     def build_solph_model(self):
         """Build the `oemof.solph` representation of the model."""
-        self.model = Model(self.energy_system)
+        phase = self.instrumentation.phase
 
-        for component in self._meta_model.components:
-            component.add_constraints()
+        with phase("solph_model"):
+            if self.aggregation is None:
+                self.model = Model(self.energy_system)
+            else:
+                self.model = Model(
+                    self.energy_system,
+                    objective_weighting=self.aggregation.objective_weighting(
+                        self.energy_system.timeincrement
+                    ),
+                )
+        self._base_variable_costs = {}
+        self._model_component_owners = {}
+
+        with phase("add_constraints"):
+            for component in self._meta_model.components:
+                names = set(self.model.component_map())
+                with phase("add_constraints", component_name(component)):
+                    component.add_constraints()
+
+                for name in set(self.model.component_map()) - names:
+                    self._model_component_owners[name] = component
+
+        if self.aggregation is not None:
+            with phase("link_storages"):
+                self.aggregation.link_storages(
+                    self.model, self._absolute_level_storages()
+                )
+
+    def _absolute_level_storages(self) -> set:
+        """Storages with constraints on their absolute content."""
+        # pylint: disable=import-outside-toplevel
+        from .technologies import LayeredHeatStorage
+        from .technologies._abstract_homogenous_storage import (
+            AbstractHomogenousStorage,
+        )
+
+        return {
+            node
+            for node in self.nodes_by_component(
+                (AbstractHomogenousStorage, LayeredHeatStorage)
+            )
+            if isinstance(node, GenericStorage)
+        }
+
+    def disaggregate_results(self, results: dict) -> dict:
+        """
+        Map results of a model built for typical periods to the time index.
+
+        :param results: Results in the format of
+            `oemof.solph.processing.results`
+        :return: Results for the full time index. Flows of every original
+            period are those of the typical period representing it, storage
+            contents include the content carried between periods.
+        """
+        if self.aggregation is None:
+            return results
+
+        return self.aggregation.disaggregate(results, self.model)
+
+    def update_timeseries(self, updates: dict) -> None:
+        """
+        Update time series of flows without rebuilding the model.
+
+        The topology of the energy system is kept, only flow bounds and
+        variable costs of the already built optimisation model are replaced.
+        Variable costs of updated flows become mutable parameters, so that
+        subsequent updates only swap their values. Calling `solve`
+        afterwards re-solves the existing model.
+
+        :param updates: Mapping of (source label, target label) to a mapping
+            of flow attribute ("fix", "min", "max" or "variable_costs") to
+            a time series specifier, e.g.
+            {(source.label, target.label): {"variable_costs": prices}}
+        """
+        flows = {
+            (source.label, target.label): (source, target, flow)
+            for (source, target), flow in self.energy_system.flows().items()
+        }
+
+        # Check all updates first, so that a failing one changes nothing
+        checked_updates = []
+        for labels, attributes in updates.items():
+            if labels not in flows:
+                raise KeyError(f"Flow {labels} not in energy system")
+
+            source, target, flow = flows[labels]
+            for attribute, specifier in attributes.items():
+                if attribute not in ["fix", "min", "max", "variable_costs"]:
+                    raise ValueError(
+                        f"Flow attribute {attribute} cannot be updated"
+                    )
+
+                values = self.data.get_timeseries(
+                    specifier, kind=TimeseriesType.INTERVAL
+                ).to_numpy()
+                if self.model is not None and attribute != "variable_costs":
+                    self._check_flow_bounds(
+                        source, target, attribute, "fix" in attributes
+                    )
+                checked_updates.append(
+                    (source, target, flow, attribute, values)
+                )
+
+        updated_costs = []
+        for source, target, flow, attribute, values in checked_updates:
+            if self.model is None:
+                # Model will be built using the updated flow
+                setattr(flow, attribute, sequence(values))
+                continue
+
+            if attribute == "variable_costs":
+                if (source, target) not in self._base_variable_costs:
+                    # Remember costs the objective was built with
+                    self._base_variable_costs[(source, target)] = [
+                        flow.variable_costs[t] for t in self.model.TIMESTEPS
+                    ]
+                setattr(flow, attribute, sequence(values))
+                updated_costs.append((source, target))
+            else:
+                setattr(flow, attribute, sequence(values))
+                self._update_flow_bounds(source, target, attribute)
+
+        if updated_costs:
+            self._update_variable_costs(updated_costs)
+
+    def _check_flow_bounds(
+        self, source, target, attribute: str, fixed: bool
+    ) -> None:
+        """
+        Check that fix, min or max values can be applied to a flow.
+
+        :param fixed: Whether the flow is fixed by the same update
+        """
+        flow = self.model.flows[source, target]
+
+        if flow.nominal_value is None:
+            raise ValueError(
+                f"Flow {source.label, target.label} needs a nominal value "
+                + f"to update {attribute}"
+            )
+
+        if flow.nonconvex is not None:
+            raise NotImplementedError(
+                "Updating bounds of nonconvex flows is not supported"
+            )
+
+        if attribute != "fix" and (
+            fixed
+            or any(
+                self.model.flow[source, target, t].fixed
+                for t in self.model.TIMESTEPS
+            )
+        ):
+            raise ValueError(
+                f"Flow {source.label, target.label} is fixed, "
+                + f"{attribute} cannot be applied"
+            )
+
+    def _update_flow_bounds(self, source, target, attribute: str) -> None:
+        """Apply updated fix, min or max values to the flow variable."""
+        flow = self.model.flows[source, target]
+        variables = self.model.flow
+
+        for t in self.model.TIMESTEPS:
+            variable = variables[source, target, t]
+            if attribute == "fix":
+                variable.fix(flow.fix[t] * flow.nominal_value)
+            elif attribute == "max":
+                variable.setub(flow.max[t] * flow.nominal_value)
+            else:
+                variable.setlb(flow.min[t] * flow.nominal_value)
+
+    def _update_variable_costs(self, updated_flows: list) -> None:
+        """Write updated variable costs to the objective."""
+        model = self.model
+        block = getattr(model, "variable_costs_parameters", None)
+
+        if block is not None and all(
+            flow in block.FLOWS for flow in updated_flows
+        ):
+            # Parameters exist, so swapping their values is sufficient
+            for i, o in updated_flows:
+                for t in model.TIMESTEPS:
+                    block.costs[i, o, t] = model.flows[i, o].variable_costs[t]
+            return
+
+        if block is None:
+            self._base_objective = model.objective.expr
+        else:
+            model.del_component(block)
+
+        # Costs of flows in base objective are corrected using parameters
+        cost_flows = [
+            flow for flow in model.FLOWS if flow in self._base_variable_costs
+        ]
+        model.variable_costs_parameters = block = po.Block()
+        block.FLOWS = po.Set(initialize=cost_flows, ordered=True, dimen=2)
+        block.costs = po.Param(
+            block.FLOWS,
+            model.TIMESTEPS,
+            mutable=True,
+            initialize=lambda _, i, o, t: model.flows[i, o].variable_costs[t],
+        )
+
+        correction = po.quicksum(
+            model.flow[i, o, t]
+            * model.objective_weighting[t]
+            * (block.costs[i, o, t] - self._base_variable_costs[(i, o)][t])
+            for i, o in cost_flows
+            for t in model.TIMESTEPS
+        )
+
+        sense = model.objective.sense
+        model.del_component("objective")
+        model.objective = po.Objective(
+            sense=sense, expr=self._base_objective + correction
+        )
+
+    def _color_flows(self, flow_color: dict, colorscheme: dict) -> dict:
+        """Colour flows by carrier, keeping colours given in flow_color."""
+        components = list(self._meta_model.components)
+        identifiers = [set(component.identifier) for component in components]
+        for component in components:
+            component.get_flow_color(flow_color, colorscheme, identifiers)
+
+        return flow_color
+
+    def flow_colors(self, colorscheme: dict = None) -> dict:
+        """
+        Get the colours of the flows by carrier.
+
+        Colours are computed in one pass over the energy system and cached
+        until it is rebuilt.
+
+        :param colorscheme: Colours by carrier name, defaults to
+            DEFAULT_COLORSCHEME
+        :return: Colours by origin and target label
+        """
+        if colorscheme is None:
+            colorscheme = DEFAULT_COLORSCHEME
+
+        key = tuple(sorted(colorscheme.items()))
+        if key not in self._flow_colors:
+            self._flow_colors[key] = self._color_flows({}, colorscheme)
+
+        return self._flow_colors[key]
+
+    def _resolve_flow_colors(self, flow_color: dict, colorscheme: dict):
+        """Complete given flow colours or use the cached ones."""
+        if flow_color is None:
+            return self.flow_colors(colorscheme)
+
+        return self._color_flows(
+            flow_color,
+            DEFAULT_COLORSCHEME if colorscheme is None else colorscheme,
+        )
 
     def graph(
         self,
@@ -97,24 +527,29 @@ class SolphModel:
         flow_color: dict = None,
         colorscheme: dict = None,
     ) -> Digraph:
-        """Generate a graph representation of the energy system."""
-        graph = Digraph(name="MTRESS model")
-        external_edges = set()
+        """
+        Generate a graph representation of the energy system.
 
-        if flow_color is None:
-            flow_color = {}
+        :param flow_color: Colours of flows by origin and target label,
+            completed by the colours of the carriers
+        :param colorscheme: Colours by carrier name, see `flow_colors`
+        """
+        return self._graph(
+            detail,
+            flow_results,
+            self._resolve_flow_colors(flow_color, colorscheme),
+        )
 
-        if colorscheme is None:
-            # set to default
-            colorscheme = {
-                "ElectricityCarrier": "orange",
-                "GasCarrier": "steelblue",
-                "HeatCarrier": "maroon",
-            }
+    def _graph(
+        self, detail: bool, flow_results: dict, flow_color: dict
+    ) -> Digraph:
+        """Generate a graph representation with given flow colours."""
+        graph = Digraph(name="MTRESS model")
+        external_edges = set()
 
         for location in self._meta_model.locations:
             subgraph, external_edges = location.graph(
-                detail, flow_results, flow_color, colorscheme
+                detail, flow_results, flow_color
             )
 
             external_edges.update(external_edges)
@@ -135,26 +570,36 @@ class SolphModel:
     ) -> list[Digraph]:
         """
         Wrapper for graph function to generate multiple graphs as a series.
+
+        :param flow_results: Flows as returned by `get_flows` or
+            `FlowResults`. The latter are sliced by time without copying.
         """
+        if isinstance(flow_results, FlowResults):
+            index = flow_results.index
+        else:
+            index = next(iter(flow_results.values())).index
+
         if start is None:
             # use first entry of time series
-            temp_flow = list(flow_results.items())[0][1]
-            start = temp_flow.index[0]
+            start = index[0]
         if stop is None:
             # use last entry of time series
-            temp_flow = list(flow_results.items())[0][1]
-            stop = temp_flow.index[-1]
+            stop = index[-1]
+        flow_color = self._resolve_flow_colors(flow_color, colorscheme)
         current = start
         graphs = []
         while current + step <= stop:
-            current_flow = {
-                k: v[current : current + step] for k, v in flow_results.items()
-            }
-            g = self.graph(
+            if isinstance(flow_results, FlowResults):
+                current_flow = flow_results.between(current, current + step)
+            else:
+                current_flow = {
+                    k: v[current : current + step]
+                    for k, v in flow_results.items()
+                }
+            g = self._graph(
                 detail=True,
                 flow_results=current_flow,
                 flow_color=flow_color,
-                colorscheme=colorscheme,
             )
             g.attr(
                 label=(
@@ -173,8 +618,23 @@ class SolphModel:
         solver: str = "cbc",
         solve_kwargs: dict = None,
         cmdline_options: dict = None,
+        backend: SolverBackend | str = SolverBackend.FILE,
+        warm_start: bool | StoredResults = False,
     ):
-        """Solve generated energy system model."""
+        """
+        Solve generated energy system model.
+
+        :param solver: Name of the solver, e.g. "cbc" or "highs"
+        :param solve_kwargs: Keyword arguments of the solve call of Pyomo
+            solvers, e.g. {"tee": True}
+        :param cmdline_options: Options passed to the solver
+        :param backend: Way of passing the model to the solver
+        :param warm_start: Start from a previous solution, either the last
+            solution of this model (True) or a given one, e.g. from
+            `load_results`. It is matched by labels and time, so it may
+            cover a shifted horizon. Passed to solvers supporting warm
+            starts (e.g. CBC, Gurobi and CPLEX via files) as incumbent.
+        """
 
         if self.model is None:
             LOGGER.info("Building solph model.")
@@ -182,6 +642,41 @@ class SolphModel:
         else:
             LOGGER.info("Using solph model built before.")
 
+        backend = SolverBackend(backend)
+        persistent_solver = None
+        if backend == SolverBackend.PERSISTENT:
+            persistent_solver = self._get_persistent_solver(solver)
+            if persistent_solver is None:
+                LOGGER.warning(
+                    "No in-memory interface available for solver %s, "
+                    + "using files instead.",
+                    solver,
+                )
+
+        if warm_start is not False:
+            solution = self.last_solution if warm_start is True else warm_start
+            if persistent_solver is not None:
+                LOGGER.info("Warm start not supported in memory, ignored.")
+            elif solution is None:
+                LOGGER.info("No previous solution to warm start from.")
+            elif self._warm_start_capable(solver):
+                with self.instrumentation.phase("warm_start"):
+                    apply_solution(self.model, solution)
+                solve_kwargs = {**(solve_kwargs or {}), "warmstart": True}
+            else:
+                LOGGER.info("Solver %s does not support warm starts.", solver)
+
+        if persistent_solver is not None:
+            LOGGER.info("Solving the optimisation model in memory.")
+            with self.instrumentation.phase("solve"):
+                self._solve_persistent(
+                    persistent_solver, solve_kwargs, cmdline_options
+                )
+            self._solved_model = self.model
+            self._last_solution = None
+
+            return self.model
+
         kwargs = {"solver": solver}
         if solve_kwargs is not None:
             kwargs["solve_kwargs"] = solve_kwargs
@@ -190,6 +685,369 @@ class SolphModel:
             kwargs["cmdline_options"] = cmdline_options
 
         LOGGER.info("Solving the optimisation model.")
-        self.model.solve(**kwargs)
+        with self.instrumentation.phase("solve"):
+            self.model.solve(**kwargs)
+        self._solved_model = self.model
+        self._last_solution = None
 
         return self.model
+
+    @property
+    def last_solution(self) -> StoredResults:
+        """
+        Solution of the last solve, used for warm starts.
+
+        It is read from the solved model when it is first needed, so that
+        solves without warm starts do not copy their results.
+        """
+        if self._last_solution is None and self._solved_model is not None:
+            self._last_solution = results_from_model(self._solved_model)
+            self._solved_model = None
+
+        return self._last_solution
+
+    @last_solution.setter
+    def last_solution(self, solution: StoredResults) -> None:
+        self._solved_model = None
+        self._last_solution = solution
+
+    @staticmethod
+    def _warm_start_capable(solver: str) -> bool:
+        """Check if a solver accepts initial values when using files."""
+        solver_factory = po.SolverFactory(solver)
+        return bool(
+            solver_factory.available(exception_flag=False)
+            and solver_factory.warm_start_capable()
+        )
+
+    def _get_persistent_solver(self, solver: str):
+        """Return (cached) persistent solver, None if not available."""
+        name = IN_MEMORY_SOLVERS.get(solver)
+        if name is None:
+            return None
+
+        if name not in self._persistent_solvers:
+            persistent_solver = po.SolverFactory(name)
+            if not persistent_solver.available(exception_flag=False):
+                return None
+            self._persistent_solvers[name] = persistent_solver
+
+        return self._persistent_solvers[name]
+
+    def _solve_persistent(
+        self, persistent_solver, solve_kwargs: dict, cmdline_options: dict
+    ) -> None:
+        """Solve model using a persistent solver, like `Model.solve`."""
+        # oemof.solph sets dual and rc to None if no duals are requested,
+        # while Pyomo solvers expect them to be suffixes if present
+        unset_suffixes = [
+            name
+            for name in ("dual", "rc")
+            if name in vars(self.model) and getattr(self.model, name) is None
+        ]
+        for name in unset_suffixes:
+            delattr(self.model, name)
+
+        try:
+            solver_results = persistent_solver.solve(
+                self.model,
+                options=cmdline_options if cmdline_options else None,
+                **(solve_kwargs or {}),
+            )
+        finally:
+            for name in unset_suffixes:
+                setattr(self.model, name, None)
+
+        status = solver_results["Solver"][0]["Status"]
+        termination_condition = solver_results["Solver"][0][
+            "Termination condition"
+        ]
+        if status != "ok" or termination_condition != "optimal":
+            warnings.warn(
+                f"Optimization ended with status {status} and termination "
+                + f"condition {termination_condition}",
+                UserWarning,
+            )
+
+        # Results are stored like by oemof.solph for result processing
+        self.model.es.results = solver_results
+        self.model.solver_results = solver_results
+
+    def report(self, statistics: bool = True) -> InstrumentationReport:
+        """
+        Report wall time and memory of the phases of the model.
+
+        Phases are building the energy system (build_core,
+        establish_interconnections, connections, complete_structure),
+        building the optimisation model (solph_model, add_constraints,
+        link_storages), solve and processing results. Further hooks, e.g.
+        `logging_hook()`, can be passed to the constructor or added to
+        `instrumentation` to follow the phases while they run.
+
+        :param statistics: Count variables, binaries, constraints and
+            nonzeros of the built model per MTRESS component. This iterates
+            over the full model, so it takes some time for large models.
+        """
+        model_counts = None
+        if statistics and self.model is not None:
+            model_counts = model_statistics(
+                self.model, self._model_component_owners
+            )
+
+        return InstrumentationReport.from_records(
+            self.instrumentation.records, model_counts
+        )
+
+    def save_results(self, path: str) -> None:
+        """
+        Save results of the solved model to a directory.
+
+        Flows, statuses and storage contents are stored in a binary
+        columnar format together with the time index and the nodes of the
+        model, see `load_results`.
+        """
+        if self.model is None:
+            raise ValueError("Model has to be solved before saving results.")
+
+        with self.instrumentation.phase("save_results"):
+            write_result_store(self.model, path)
+
+    @staticmethod
+    def load_results(path: str) -> StoredResults:
+        """
+        Load results saved by `save_results`.
+
+        Results are memory mapped, so data is read from disk only when it
+        is accessed.
+        """
+        return read_result_store(path)
+
+    def solve_rolling_horizon(
+        self,
+        window: int,
+        overlap: int = 0,
+        solver: str = "cbc",
+        solve_kwargs: dict = None,
+        cmdline_options: dict = None,
+        backend: SolverBackend | str = SolverBackend.FILE,
+        warm_start: bool = True,
+    ) -> dict:
+        """
+        Solve the model as a sequence of overlapping time windows.
+
+        Every window covers `window` time steps. The last `overlap` time
+        steps of a window are optimised again as part of the next window,
+        which starts with the storage levels reached at that point. Storages
+        which are balanced over the full horizon are balanced only over the
+        horizon as a whole, i.e. the last window ends at the level the
+        first one started with. Without overlap, windows are optimised with
+        one more time step, so that the levels are carried from a time step
+        constrained by all components.
+
+        :param window: Number of time steps per window.
+        :param overlap: Number of time steps shared by subsequent windows.
+        :param backend: Way of passing the models to the solver, see `solve`.
+        :param warm_start: Start every window from the solution of the
+            previous one (and the first from `last_solution`, if any),
+            shifted to the window, see `solve`.
+        :return: Results in the format of `oemof.solph.processing.results`,
+            keyed by the nodes of the energy system for the full time index.
+            Results of variables added by components keep their keys.
+        :raises RuntimeError: If a window is not solved to optimality
+        :raises NotImplementedError: For typical periods and storages
+            keeping their contents as variables of their own, e.g. the
+            compact layered heat storage
+        """
+        if self.aggregation is not None:
+            raise NotImplementedError(
+                "Rolling horizon is not supported for typical periods"
+            )
+
+        if window < 1 or not 0 <= overlap < window:
+            raise ValueError(
+                "Window has to be positive and larger than the overlap"
+            )
+
+        window_results = []
+        try:
+            self._solve_windows(
+                window,
+                overlap,
+                window_results,
+                solver=solver,
+                solve_kwargs=solve_kwargs,
+                cmdline_options=cmdline_options,
+                backend=backend,
+                warm_start=warm_start,
+            )
+        finally:
+            # Restore the energy system for the full time index
+            self._rebuild_solph_energy_system(self.timeindex)
+
+        return self._stitch_window_results(window_results)
+
+    def _solve_windows(
+        self, window: int, overlap: int, window_results: list, **kwargs
+    ) -> None:
+        """Solve the windows of `solve_rolling_horizon`."""
+        n_steps = len(self.timeindex) - 1
+        initial_levels = {}
+        balanced_levels = {}
+
+        # Levels are carried from a time step of the window, as the last
+        # time point is not constrained by every component (e.g. by the
+        # shared volume of a layered heat storage)
+        lookahead = max(overlap, 1)
+
+        start = 0
+        while start < n_steps:
+            stop = min(start + window + lookahead - overlap, n_steps)
+            is_last_window = stop == n_steps
+            commit = stop if is_last_window else stop - lookahead
+
+            self._rebuild_solph_energy_system(self.timeindex[start : stop + 1])
+            balanced_storages = self._prepare_window_storages(
+                initial_levels, start == 0, is_last_window
+            )
+            self.build_solph_model()
+            if getattr(self.model, STORAGE_CONTENTS, None):
+                raise NotImplementedError(
+                    "Rolling horizon is not supported for storages keeping "
+                    + "their contents as variables of their own, e.g. the "
+                    + "compact layered heat storage"
+                )
+
+            if balanced_storages:
+                block = self.model.GenericStorageBlock
+                for node in balanced_storages:
+                    if node.label in balanced_levels:
+                        block.storage_content[node, stop - start].fix(
+                            balanced_levels[node.label]
+                            * node.nominal_storage_capacity
+                        )
+
+            LOGGER.info(
+                "Solving window %s to %s.",
+                self.timeindex[start],
+                self.timeindex[stop],
+            )
+            self.solve(**kwargs)
+            termination_condition = str(
+                self.model.solver_results["Solver"][0]["Termination condition"]
+            )
+            if termination_condition != "optimal":
+                raise RuntimeError(
+                    f"Window {self.timeindex[start]} to "
+                    + f"{self.timeindex[stop]} ended with termination "
+                    + f"condition {termination_condition}"
+                )
+
+            with self.instrumentation.phase("results"):
+                results = processing.results(self.model)
+
+            if start == 0:
+                balanced_levels = self._storage_levels(
+                    results, self.timeindex[0]
+                )
+            initial_levels = self._storage_levels(
+                results, self.timeindex[commit]
+            )
+            window_results.append(
+                (results, None if is_last_window else self.timeindex[commit])
+            )
+
+            start = commit
+
+    def _prepare_window_storages(
+        self, initial_levels: dict, is_first_window: bool, is_last_window: bool
+    ) -> list[GenericStorage]:
+        """
+        Set initial storage levels of the current window.
+
+        Returns the storages which have to end at the level of the first
+        window's start, as they are balanced over the full horizon.
+        """
+        if is_first_window and is_last_window:
+            # A single window is balanced by solph itself
+            return []
+
+        balanced_storages = []
+        for node in self.energy_system.nodes:
+            if not isinstance(node, GenericStorage):
+                continue
+
+            if node.nominal_storage_capacity is None:
+                # Storage sizes have to be fixed to be carried forward
+                continue
+
+            if node.label in initial_levels:
+                node.initial_storage_level = min(
+                    max(initial_levels[node.label], node.min_storage_level[0]),
+                    node.max_storage_level[0],
+                )
+
+            if node.balanced:
+                balanced_storages.append(node)
+                node.balanced = False
+
+        if not is_last_window:
+            return []
+
+        return balanced_storages
+
+    @staticmethod
+    def _storage_levels(results: dict, timestamp: pd.Timestamp) -> dict:
+        """Get relative levels of sized storages at the given time."""
+        levels = {}
+        for (node, other), values in results.items():
+            if (
+                other is None
+                and isinstance(node, GenericStorage)
+                and node.nominal_storage_capacity is not None
+            ):
+                content = values["sequences"]["storage_content"][timestamp]
+                levels[node.label] = content / node.nominal_storage_capacity
+
+        return levels
+
+    def _stitch_window_results(self, window_results: list) -> dict:
+        """Combine results of subsequent windows to a full horizon."""
+        # Variables added by components are keyed by names or indices
+        # instead of nodes, these keys are kept as they are
+        node_labels = set()
+
+        def label(element):
+            if hasattr(element, "label"):
+                node_labels.add(element.label)
+                return element.label
+            return element
+
+        sequences = {}
+        scalars = {}
+        for results, cut in window_results:
+            for (first, second), values in results.items():
+                key = (label(first), label(second))
+                data = values["sequences"]
+                if cut is not None:
+                    data = data[data.index < cut]
+                sequences.setdefault(key, []).append(data)
+                scalars[key] = values["scalars"]
+
+        def element(key):
+            if key in node_labels:
+                return self.node_registry.get(key)
+            return key
+
+        stitched = {}
+        for (first, second), parts in sequences.items():
+            if element(first) is None or (
+                second is not None and element(second) is None
+            ):
+                continue
+
+            stitched[(element(first), element(second))] = {
+                "scalars": scalars[(first, second)],
+                "sequences": pd.concat(parts).reindex(self.timeindex),
+            }
+
+        return stitched
@@ -0,0 +1,524 @@
+# -*- coding: utf-8 -*-
+"""
+Temporal aggregation of the optimisation horizon using typical periods.
+
+The time series used by the model are clustered to a number of typical
+periods. The model is built on the (contiguous) sequence of representative
+periods, which are weighted by their number of occurrences in the
+objective. Storages are linked across the original sequence of periods
+following Kotzur et al. (2018), https://doi.org/10.1016/j.apenergy.2018.01.023
+
+SPDX-FileCopyrightText: Deutsches Zentrum für Luft- und Raumfahrt e.V. (DLR)
+
+SPDX-License-Identifier: MIT
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from enum import Enum
+
+import numpy as np
+import pandas as pd
+import pyomo.environ as po
+
+from ._data_handler import DataHandler, TimeseriesSpecifier, TimeseriesType
+
+LOGGER = logging.getLogger(__file__)
+
+
+class ClusterMethod(Enum):
+    """
+    Possible clustering methods.
+
+    KMEANS: Cluster periods around centroids, represent every cluster by the
+        period closest to its centroid.
+    KMEDOIDS: Cluster periods around medoids, represent every cluster by its
+        medoid.
+    """
+
+    KMEANS = "kmeans"
+    KMEDOIDS = "kmedoids"
+
+
+@dataclass(frozen=True)
+class TypicalPeriods:
+    """
+    Configuration of the temporal aggregation.
+
+    :param n_periods: Number of typical periods.
+    :param period_length: Number of time steps per period, e.g. 96 for
+        days at a resolution of 15 minutes.
+    :param method: Clustering method.
+    :param seed: Seed of the random initialisation of the clustering.
+    :param max_iterations: Maximum number of clustering iterations.
+    """
+
+    n_periods: int
+    period_length: int
+    method: ClusterMethod = ClusterMethod.KMEDOIDS
+    seed: int = 0
+    max_iterations: int = 100
+
+
+class RecordingDataHandler(DataHandler):
+    """Data handler keeping track of all time series it prepared."""
+
+    def __init__(self, timeindex: pd.DatetimeIndex, timeseries: dict = None):
+        """Initialize data handler."""
+        super().__init__(timeindex, timeseries=timeseries)
+        self.recorded: list[np.ndarray] = []
+        self._depth = 0
+
+    def get_timeseries(
+        self, specifier: TimeseriesSpecifier, kind: TimeseriesType
+    ):
+        """Prepare a time series and record its values per interval."""
+        self._depth += 1
+        try:
+            series = super().get_timeseries(specifier, kind)
+        finally:
+            self._depth -= 1
+
+        if self._depth == 0:
+            values = series.to_numpy(dtype=float)
+            if kind == TimeseriesType.POINT:
+                values = values[:-1]
+            self.recorded.append(values)
+
+        return series
+
+
+class AggregatedDataHandler(DataHandler):
+    """Data handler preparing time series for the typical periods."""
+
+    def __init__(
+        self, aggregation: TimeseriesAggregation, timeseries: dict = None
+    ):
+        """Initialize data handler."""
+        super().__init__(aggregation.timeindex, timeseries=timeseries)
+        self.aggregation = aggregation
+        self._physical_data = DataHandler(
+            aggregation.physical_timeindex, timeseries=timeseries
+        )
+
+    @property
+    def physical_timeindex(self) -> pd.DatetimeIndex:
+        """Time index of the original, not aggregated horizon."""
+        return self._physical_data.timeindex
+
+    def get_physical_timeseries(
+        self, specifier: TimeseriesSpecifier, kind: TimeseriesType
+    ):
+        """Prepare a time series for the original horizon."""
+        return self._physical_data.get_timeseries(specifier, kind)
+
+    def get_timeseries(
+        self, specifier: TimeseriesSpecifier, kind: TimeseriesType
+    ):
+        """Prepare a time series and select the typical periods."""
+        series = self.get_physical_timeseries(specifier, kind)
+
+        if kind == TimeseriesType.INTERVAL:
+            positions = self.aggregation.interval_positions
+            target_index = self.timeindex[:-1]
+        else:
+            positions = self.aggregation.point_positions
+            target_index = self.timeindex
+
+        return pd.Series(data=series.to_numpy()[positions], index=target_index)
+
+
+def _squared_distances(data: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """Squared euclidean distances between rows of data and centers."""
+    distances = (
+        (data**2).sum(axis=1)[:, None]
+        + (centers**2).sum(axis=1)[None, :]
+        - 2 * data @ centers.T
+    )
+    return np.maximum(distances, 0)
+
+
+def _initial_centers(data: np.ndarray, n_clusters: int, rng) -> list[int]:
+    """Choose initial cluster centers using k-means++."""
+    centers = [int(rng.integers(len(data)))]
+    distances = ((data - data[centers[0]]) ** 2).sum(axis=1)
+
+    while len(centers) < n_clusters:
+        if distances.sum() > 0:
+            candidate = int(
+                rng.choice(len(data), p=distances / distances.sum())
+            )
+        else:
+            # All remaining periods are identical to a center
+            candidate = next(i for i in range(len(data)) if i not in centers)
+        centers.append(candidate)
+        distances = np.minimum(
+            distances, ((data - data[candidate]) ** 2).sum(axis=1)
+        )
+
+    return centers
+
+
+def _cluster_kmeans(data, n_clusters, rng, max_iterations):
+    """Cluster rows of data, return representative rows and labels."""
+    centroids = data[_initial_centers(data, n_clusters, rng)]
+    labels = None
+
+    for _ in range(max_iterations):
+        distances = _squared_distances(data, centroids)
+        new_labels = distances.argmin(axis=1)
+        if labels is not None and (new_labels == labels).all():
+            break
+        labels = new_labels
+        for cluster in range(n_clusters):
+            if (labels == cluster).any():
+                centroids[cluster] = data[labels == cluster].mean(axis=0)
+
+    # Represent clusters by the member closest to their centroid
+    distances = _squared_distances(data, centroids)
+    representatives = np.full(n_clusters, -1)
+    for cluster in range(n_clusters):
+        members = np.flatnonzero(labels == cluster)
+        if len(members) > 0:
+            representatives[cluster] = members[
+                distances[members, cluster].argmin()
+            ]
+
+    return representatives, labels
+
+
+def _cluster_kmedoids(data, n_clusters, rng, max_iterations):
+    """Cluster rows of data, return medoid rows and labels."""
+    pairwise = np.sqrt(_squared_distances(data, data))
+    medoids = np.array(_initial_centers(data, n_clusters, rng))
+
+    for _ in range(max_iterations):
+        labels = pairwise[:, medoids].argmin(axis=1)
+        new_medoids = medoids.copy()
+        for cluster in range(n_clusters):
+            members = np.flatnonzero(labels == cluster)
+            if len(members) > 0:
+                costs = pairwise[np.ix_(members, members)].sum(axis=1)
+                new_medoids[cluster] = members[costs.argmin()]
+        if (new_medoids == medoids).all():
+            break
+        medoids = new_medoids
+
+    labels = pairwise[:, medoids].argmin(axis=1)
+    return medoids, labels
+
+
+_CLUSTER_FUNCTIONS = {
+    ClusterMethod.KMEANS: _cluster_kmeans,
+    ClusterMethod.KMEDOIDS: _cluster_kmedoids,
+}
+
+
+class TimeseriesAggregation:
+    """Typical periods of a time index and their mapping to the original."""
+
+    def __init__(
+        self,
+        config: TypicalPeriods,
+        timeseries: list[np.ndarray],
+        timeindex: pd.DatetimeIndex,
+    ):
+        """
+        Cluster periods of the given time series.
+
+        :param config: Configuration of the temporal aggregation.
+        :param timeseries: Time series (values per interval of timeindex)
+            to be considered by the clustering.
+        :param timeindex: Original time index.
+        """
+        frequency = timeindex.freq or pd.infer_freq(timeindex)
+        if frequency is None:
+            raise ValueError(
+                "Temporal aggregation requires an equidistant time index"
+            )
+
+        self.config = config
+        self.physical_timeindex = timeindex
+
+        n_steps = len(timeindex) - 1
+        length = config.period_length
+        n_full_periods = n_steps // length
+        if n_full_periods < 1:
+            raise ValueError("Time index is shorter than a single period")
+
+        # Normalised feature matrix, one row per period
+        features = []
+        for values in timeseries:
+            values = values[: n_full_periods * length]
+            spread = np.nanmax(values) - np.nanmin(values)
+            if spread > 0:
+                features.append(
+                    ((values - np.nanmin(values)) / spread).reshape(
+                        n_full_periods, length
+                    )
+                )
+        if features:
+            data = np.nan_to_num(np.hstack(features))
+        else:
+            data = np.zeros((n_full_periods, 1))
+
+        n_clusters = min(config.n_periods, n_full_periods)
+        representatives, labels = _CLUSTER_FUNCTIONS[config.method](
+            data,
+            n_clusters,
+            np.random.default_rng(config.seed),
+            config.max_iterations,
+        )
+
+        # Drop empty clusters, keep representatives in chronological order
+        used = np.unique(labels)
+        representatives = representatives[used]
+        labels = np.searchsorted(used, labels)
+        order = np.argsort(representatives)
+        representatives = representatives[order]
+        label_map = np.empty(len(order), dtype=int)
+        label_map[order] = np.arange(len(order))
+        labels = label_map[labels]
+
+        #: (first time step, length) of the reduced periods
+        self.periods = [(k * length, length) for k in range(len(order))]
+        #: Number of occurrences of the reduced periods
+        self.occurrences = np.bincount(labels, minlength=len(order))
+        #: Reduced period representing every original period
+        self.period_sequence = list(labels)
+        positions = [
+            np.arange(period * length, (period + 1) * length)
+            for period in representatives
+        ]
+
+        remainder = n_steps - n_full_periods * length
+        if remainder > 0:
+            # The incomplete last period is kept as it is
+            self.periods.append((len(order) * length, remainder))
+            self.occurrences = np.append(self.occurrences, 1)
+            self.period_sequence.append(len(self.periods) - 1)
+            positions.append(np.arange(n_full_periods * length, n_steps))
+
+        #: Original interval of every reduced interval
+        self.interval_positions = np.concatenate(positions)
+        #: Original point of every reduced point
+        self.point_positions = np.append(
+            self.interval_positions, self.interval_positions[-1] + 1
+        )
+        self.timeindex = pd.date_range(
+            start=timeindex[0],
+            periods=len(self.interval_positions) + 1,
+            freq=frequency,
+        )
+
+        self._linked_storages: dict = {}
+
+    def objective_weighting(self, timeincrement) -> list[float]:
+        """Weights of the reduced time steps in the objective."""
+        weighting = []
+        for period, (_, length) in enumerate(self.periods):
+            weighting += [self.occurrences[period]] * length
+
+        return [
+            weight * timeincrement[t] for t, weight in enumerate(weighting)
+        ]
+
+    def _original_periods(self):
+        """Iterate over (original period, reduced period) pairs."""
+        return enumerate(self.period_sequence)
+
+    def link_storages(self, model, absolute_level_storages: set) -> None:
+        """
+        Link storage contents across the original sequence of periods.
+
+        Storages in absolute_level_storages, e.g. such with constraints on
+        their absolute content, are cyclic within every typical period. All
+        other storages get an inter-period content per original period and
+        an intra-period content relative to the start of the typical period.
+        """
+        if hasattr(model, "GenericInvestmentStorageBlock"):
+            raise NotImplementedError(
+                "Temporal aggregation does not support storage investments"
+            )
+
+        if not hasattr(model, "GenericStorageBlock"):
+            return
+
+        storages = model.GenericStorageBlock
+        periods = range(len(self.periods))
+        original_periods = range(len(self.period_sequence) + 1)
+
+        model.inter_period_storage = block = po.Block()
+        block.period_end = po.Var(storages.STORAGES, periods)
+        block.intra_max = po.Var(storages.STORAGES, periods)
+        block.intra_min = po.Var(storages.STORAGES, periods)
+        block.content = po.Var(
+            storages.STORAGES, original_periods, within=po.NonNegativeReals
+        )
+        block.constraints = po.ConstraintList()
+
+        self._linked_storages = {}
+        for node in storages.STORAGES:
+            inflow = next(iter(node.inputs))
+            outflow = next(iter(node.outputs))
+
+            storages.storage_content[node, 0].unfix()
+            if node in storages.STORAGES_BALANCED:
+                storages.balanced_cstr[node].deactivate()
+
+            for period, (start, length) in enumerate(self.periods):
+                end = start + length - 1
+
+                # Decouple the end of the period from the next one
+                storages.balance[node, end].deactivate()
+                block.constraints.add(
+                    storages.storage_content[node, end]
+                    - storages.storage_losses[node, end]
+                    + model.flow[inflow, node, end]
+                    * node.inflow_conversion_factor[end]
+                    * model.timeincrement[end]
+                    - model.flow[node, outflow, end]
+                    / node.outflow_conversion_factor[end]
+                    * model.timeincrement[end]
+                    == block.period_end[node, period]
+                )
+
+            if node in absolute_level_storages:
+                self._link_cyclic(model, block, node)
+            else:
+                self._link_inter_period(model, block, node)
+
+    def _link_cyclic(self, model, block, node) -> None:
+        """Make the storage content cyclic within every period."""
+        storages = model.GenericStorageBlock
+        for period, (start, _) in enumerate(self.periods):
+            block.constraints.add(
+                block.period_end[node, period]
+                == storages.storage_content[node, start]
+            )
+
+        # Inter-period content is not used
+        for original in range(len(self.period_sequence) + 1):
+            block.content[node, original].fix(0)
+
+        self._linked_storages[node] = False
+
+    def _link_inter_period(self, model, block, node) -> None:
+        """Link storage contents following Kotzur et al."""
+        storages = model.GenericStorageBlock
+        capacity = node.nominal_storage_capacity
+
+        for period, (start, length) in enumerate(self.periods):
+            for t in range(start, start + length + 1):
+                storages.storage_content[node, t].setlb(None)
+                storages.storage_content[node, t].setub(None)
+
+            # Intra-period content is relative to the start of the period
+            storages.storage_content[node, start].fix(0)
+
+            for t in range(start + 1, start + length):
+                content = storages.storage_content[node, t]
+                block.constraints.add(block.intra_max[node, period] >= content)
+                block.constraints.add(block.intra_min[node, period] <= content)
+            for content in [0, block.period_end[node, period]]:
+                block.constraints.add(block.intra_max[node, period] >= content)
+                block.constraints.add(block.intra_min[node, period] <= content)
+
+        for original, period in self._original_periods():
+            start, length = self.periods[period]
+            decay = (1 - node.loss_rate[start]) ** (
+                length * model.timeincrement[start]
+            )
+            block.constraints.add(
+                block.content[node, original + 1]
+                == block.content[node, original] * decay
+                + block.period_end[node, period]
+            )
+            block.constraints.add(
+                block.content[node, original] + block.intra_max[node, period]
+                <= capacity * node.max_storage_level[start]
+            )
+            block.constraints.add(
+                block.content[node, original] + block.intra_min[node, period]
+                >= capacity * node.min_storage_level[start]
+            )
+
+        last = len(self.period_sequence)
+        if node.initial_storage_level is not None:
+            block.content[node, 0].fix(node.initial_storage_level * capacity)
+        if node.balanced:
+            block.constraints.add(
+                block.content[node, last] == block.content[node, 0]
+            )
+
+        self._linked_storages[node] = True
+
+    def disaggregate(self, results: dict, model) -> dict:
+        """
+        Map results of the reduced model back onto the original time index.
+
+        :param results: Results in the format of
+            `oemof.solph.processing.results` for the reduced model.
+        :param model: The solved reduced model.
+        """
+        n_steps = len(self.physical_timeindex) - 1
+        # Reduced interval representing every original interval
+        reduced_intervals = np.empty(n_steps, dtype=int)
+        for original, period in self._original_periods():
+            start, length = self.periods[period]
+            reduced_intervals[
+                original
+                * self.config.period_length : original
+                * self.config.period_length
+                + length
+            ] = np.arange(start, start + length)
+
+        disaggregated = {}
+        for (node, other), values in results.items():
+            reduced = values["sequences"]
+            sequences = pd.DataFrame(
+                reduced.to_numpy()[reduced_intervals],
+                index=self.physical_timeindex[:-1],
+                columns=reduced.columns,
+            ).reindex(self.physical_timeindex)
+
+            if other is None and "storage_content" in reduced:
+                sequences["storage_content"] = self._storage_content(
+                    node, reduced["storage_content"].to_numpy(), model
+                )
+
+            disaggregated[(node, other)] = {
+                "scalars": values["scalars"],
+                "sequences": sequences,
+            }
+
+        return disaggregated
+
+    def _storage_content(self, node, reduced_content, model) -> np.ndarray:
+        """Absolute storage content for the original time points."""
+        block = model.inter_period_storage
+        length = self.config.period_length
+        content = np.empty(len(self.physical_timeindex))
+
+        for original, period in self._original_periods():
+            start, period_length = self.periods[period]
+            intra = reduced_content[start : start + period_length]
+            offset = original * length
+            if self._linked_storages[node]:
+                decay = (1 - node.loss_rate[start]) ** (
+                    np.arange(period_length) * model.timeincrement[start]
+                )
+                intra = po.value(block.content[node, original]) * decay + intra
+            content[offset : offset + period_length] = intra
+
+        last_period = self.period_sequence[-1]
+        if self._linked_storages[node]:
+            content[-1] = po.value(
+                block.content[node, len(self.period_sequence)]
+            )
+        else:
+            content[-1] = po.value(block.period_end[node, last_period])
+
+        return content
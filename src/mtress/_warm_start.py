@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Warm starts of MTRESS models from previous solutions.
+
+SPDX-FileCopyrightText: Deutsches Zentrum für Luft- und Raumfahrt e.V. (DLR)
+
+SPDX-License-Identifier: MIT
+"""
+
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from ._helpers import StoredResults
+from ._helpers._results import STORAGE_CONTENTS
+
+LOGGER = logging.getLogger(__file__)
+
+
+def _positions(
+    stored_index: pd.DatetimeIndex, target_index: pd.DatetimeIndex
+) -> np.ndarray:
+    """
+    Rows of the stored solution used for every target time.
+
+    Times outside of the stored horizon take the nearest stored row, so
+    that solutions of shifted horizons fill the whole target.
+    """
+    positions = stored_index.get_indexer(target_index, method="ffill")
+    return np.clip(positions, 0, None)
+
+
+def _set_values(
+    variable,
+    elements: dict,
+    columns: pd.Index,
+    values: np.ndarray,
+    positions: np.ndarray,
+    integer: bool = False,
+) -> int:
+    """
+    Set values of a variable indexed by (*element, time).
+
+    :param elements: Mapping of labels to the index of the elements
+    :return: Number of variables set
+    """
+    column_of = {tuple(label): number for number, label in enumerate(columns)}
+    count = 0
+    for label, element in elements.items():
+        column = column_of.get(label)
+        if column is None:
+            continue
+
+        for t, row in enumerate(positions):
+            value = values[row, column]
+            data = variable[(*element, t)]
+            if np.isnan(value) or data.fixed:
+                continue
+            data.set_value(
+                round(value) if integer else value, skip_validation=True
+            )
+            count += 1
+
+    return count
+
+
+def _set_storage_contents(model, storage_content: pd.DataFrame) -> int:
+    """
+    Set storage contents of GenericStorages and of components keeping
+    them as variables of their own (see `STORAGE_CONTENTS`).
+
+    :return: Number of variables set
+    """
+    timepoints = model.es.timeindex[: len(model.TIMEPOINTS)]
+    positions = _positions(storage_content.index, timepoints)
+    values = storage_content.to_numpy()
+
+    count = 0
+    storage_block = getattr(model, "GenericStorageBlock", None)
+    if hasattr(storage_block, "storage_content"):
+        count += _set_values(
+            storage_block.storage_content,
+            {
+                tuple(storage.label): (storage,)
+                for storage in storage_block.STORAGES
+            },
+            storage_content.columns,
+            values,
+            positions,
+        )
+
+    for label, (variable, index) in getattr(
+        model, STORAGE_CONTENTS, {}
+    ).items():
+        count += _set_values(
+            variable,
+            {tuple(label): index},
+            storage_content.columns,
+            values,
+            positions,
+        )
+
+    return count
+
+
+def apply_solution(model, solution: StoredResults) -> int:
+    """
+    Use a solution as initial values of the variables of a model.
+
+    Flows, statuses of non-convex flows and storage contents are matched
+    by the labels of their nodes and by time, so the solution may stem
+    from a model with another (e.g. shifted) horizon. Time steps not
+    covered by it take the values of the nearest time step covered.
+    Elements missing in the solution and fixed variables are left as they
+    are.
+
+    :param model: Built oemof.solph model
+    :param solution: Solution, e.g. from `results_from_model` or
+        `SolphModel.load_results`
+    :return: Number of variables set
+    """
+    if len(solution.flows.index) == 0:
+        return 0
+
+    timesteps = model.es.timeindex[: len(model.TIMESTEPS)]
+
+    count = _set_values(
+        model.flow,
+        {
+            tuple(source.label) + tuple(target.label): (source, target)
+            for source, target in model.FLOWS
+        },
+        solution.flows.columns,
+        solution.flows.data,
+        _positions(solution.flows.index, timesteps),
+    )
+
+    nonconvex_block = getattr(model, "NonConvexFlowBlock", None)
+    if hasattr(nonconvex_block, "status"):
+        count += _set_values(
+            nonconvex_block.status,
+            {
+                tuple(source.label) + tuple(target.label): (source, target)
+                for source, target in nonconvex_block.NONCONVEX_FLOWS
+            },
+            solution.status.columns,
+            solution.status.data,
+            _positions(solution.status.index, timesteps),
+            integer=True,
+        )
+
+    if len(solution.storage_content.index):
+        count += _set_storage_contents(model, solution.storage_content)
+
+    LOGGER.debug("Set %s initial values from solution.", count)
+    return count
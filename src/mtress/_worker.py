@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Worker processes solving many models, e.g. scenarios or configurations.
+
+Settings shared by all tasks of a pool are passed once, when a worker is
+started, instead of with every task:
+
+    ProcessPoolExecutor(
+        initializer=initialise_worker, initargs=(settings,)
+    )
+
+Tasks read them using `worker_settings`.
+
+SPDX-FileCopyrightText: Deutsches Zentrum für Luft- und Raumfahrt e.V. (DLR)
+
+SPDX-License-Identifier: MIT
+"""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+from collections.abc import Mapping
+from multiprocessing.util import Finalize
+from types import MappingProxyType
+
+from pyomo.common.tempfiles import TempfileManager
+
+# Settings of the current worker process, None outside of workers
+_SETTINGS: dict | None = None
+
+
+def initialise_worker(settings: dict) -> None:
+    """
+    Store the settings of a worker and isolate its solver files.
+
+    Solver files are written to a temporary directory of the worker,
+    which is removed when the worker exits.
+    """
+    global _SETTINGS  # pylint: disable=global-statement
+    _SETTINGS = dict(settings)
+
+    tempdir = tempfile.mkdtemp(prefix="mtress_worker_")
+    TempfileManager.tempdir = tempdir
+    Finalize(
+        None,
+        shutil.rmtree,
+        args=(tempdir,),
+        kwargs={"ignore_errors": True},
+        exitpriority=0,
+    )
+
+
+def worker_settings() -> Mapping:
+    """
+    Settings the current worker was initialised with (read-only).
+
+    :raises RuntimeError: If the process is no initialised worker
+    """
+    if _SETTINGS is None:
+        raise RuntimeError("Process is no initialised worker")
+
+    return MappingProxyType(_SETTINGS)
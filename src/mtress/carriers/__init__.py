@@ -3,12 +3,13 @@
 from ._abstract_carrier import AbstractCarrier, AbstractLayeredCarrier
 from ._electricity import ElectricityCarrier
 from ._gas import GasCarrier
-from ._heat import HeatCarrier
+from ._heat import HeatCarrier, HeatSlack
 
 __all__ = [
     "AbstractCarrier",
     "AbstractLayeredCarrier",
     "ElectricityCarrier",
     "HeatCarrier",
+    "HeatSlack",
     "GasCarrier",
 ]
@@ -54,22 +54,26 @@ class AbstractLayeredCarrier(AbstractCarrier):
 
     def get_levels_between(self, minimum, maximum):
         """Returns the levels existing in a closed interval."""
+        return self._get_levels_between(minimum, maximum, self.levels)
 
+    @staticmethod
+    def _get_levels_between(minimum, maximum, levels):
+        """Get the levels existing in a closed interval."""
         if minimum > maximum:
             raise ValueError(
                 "Minimum level must be smaller or equal to the maximum level."
             )
-        if minimum in self.levels:
-            min_index = self.levels.index(minimum)
+        if minimum in levels:
+            min_index = levels.index(minimum)
         else:
-            min_index = np.searchsorted(self.levels, minimum)
+            min_index = np.searchsorted(levels, minimum)
 
-        if maximum in self.levels:
-            max_index = self.levels.index(maximum) + 1
+        if maximum in levels:
+            max_index = levels.index(maximum) + 1
         else:
-            max_index = np.searchsorted(self.levels, maximum)
+            max_index = np.searchsorted(levels, maximum)
 
-        return self.levels[min_index:max_index]
+        return levels[min_index:max_index]
 
     @property
     def reference(self):
@@ -10,12 +10,52 @@ SPDX-FileCopyrightText: Lucas Schmeling
 
 SPDX-License-Identifier: MIT
 """
+import logging
+from enum import Enum
+
 import numpy as np
 from oemof.solph import Bus, Flow, components
 
 from .._abstract_component import AbstractSolphRepresentation
 from ._abstract_carrier import AbstractLayeredCarrier
 
+LOGGER = logging.getLogger(__file__)
+
+#: Automatic penalties are this factor above the highest variable cost
+PENALTY_SCALE = 1e3
+
+
+class HeatSlack(Enum):
+    """
+    Possible placements of missing and excess heat (slack) flows.
+
+    ALL_LEVELS: Slack at every temperature level.
+    DEMAND_LEVELS: Slack only at levels connected to demands.
+    NONE: No slack, e.g. for configurations known to be feasible.
+    """
+
+    ALL_LEVELS = "all_levels"
+    DEMAND_LEVELS = "demand_levels"
+    NONE = "none"
+
+
+class _LevelNodes(dict):
+    """Buses of the temperature levels, created when first used."""
+
+    def __init__(self, carrier):
+        super().__init__()
+        self._carrier = carrier
+
+    def __missing__(self, temperature):
+        if temperature not in self._carrier.levels:
+            raise KeyError(temperature)
+
+        self[temperature] = self._carrier.create_solph_node(
+            label=f"T_{temperature:.0f}",
+            node_type=Bus,
+        )
+        return self[temperature]
+
 
 class HeatCarrier(AbstractLayeredCarrier, AbstractSolphRepresentation):
     """
@@ -49,6 +89,8 @@ class HeatCarrier(AbstractLayeredCarrier, AbstractSolphRepresentation):
         reference_temperature: float = 0,
         missing_heat_penalty: float = 1e9,
         excess_heat_penalty: float = 1e9,
+        prune_levels: bool = False,
+        slack: HeatSlack | str = HeatSlack.ALL_LEVELS,
     ):
         """
         Initialize heat energy carrier and add components.
@@ -56,9 +98,15 @@ class HeatCarrier(AbstractLayeredCarrier, AbstractSolphRepresentation):
         :param temperature_levels: list of temperatures (in °C)
         :param reference_temperature: Reference temperature (in °C)
         :param missing_heat_penalty: assigns a cost for each unit of missing
-            heat produced (in any currency)
+            heat produced (in any currency). If None, the penalty is
+            PENALTY_SCALE times the highest variable cost of the energy
+            system, which keeps the problem better scaled than 1e9.
         :param excess_heat_penalty: assigns a cost for each unit of excess
-            heat produced (in any currency)
+            heat produced (in any currency), None like for missing heat
+        :param prune_levels: Only create buses (and penalty flows) for
+            temperature levels used by components at the location. This
+            saves variables and constraints for every unused level.
+        :param slack: Levels with missing and excess heat, see HeatSlack
         """
         if reference_temperature in temperature_levels:
             raise ValueError(
@@ -70,13 +118,15 @@ class HeatCarrier(AbstractLayeredCarrier, AbstractSolphRepresentation):
         )
         self.missing_heat_penalty = missing_heat_penalty
         self.excess_heat_penalty = excess_heat_penalty
+        self.prune_levels = prune_levels
+        self.slack = HeatSlack(slack)
 
         self._reference_index = np.searchsorted(
             self.levels, reference_temperature
         )
 
         # Properties for solph interfaces
-        self.level_nodes = {}
+        self.level_nodes = _LevelNodes(self)
 
     @property
     def reference_level(self):
@@ -103,19 +153,49 @@ class HeatCarrier(AbstractLayeredCarrier, AbstractSolphRepresentation):
 
     def build_core(self):
         """Build core structure of oemof.solph representation."""
+        self.level_nodes = _LevelNodes(self)
+        if self.prune_levels:
+            # Components create the buses they use
+            return
 
+        # Accessing a level creates its bus
         for temperature in self._levels:
-            self.level_nodes[temperature] = self.create_solph_node(
-                label=f"T_{temperature:.0f}",
-                node_type=Bus,
-            )
+            _ = self.level_nodes[temperature]
+
+    def complete_structure(self):
+        """Add missing and excess heat once all levels are connected."""
+        if self.prune_levels:
+            unused = set(self._levels) - set(self.level_nodes)
+            if unused:
+                LOGGER.debug(
+                    "Pruned temperature levels %s of %s.",
+                    sorted(unused),
+                    self.identifier,
+                )
+
+        if self.slack == HeatSlack.NONE:
+            return
+
+        buses = list(self.level_nodes.values())
+        if self.slack == HeatSlack.DEMAND_LEVELS:
+            buses = [bus for bus in buses if self._connects_demand(bus)]
+        if not buses:
+            return
+
+        excess_heat_penalty = self.excess_heat_penalty
+        missing_heat_penalty = self.missing_heat_penalty
+        if excess_heat_penalty is None or missing_heat_penalty is None:
+            automatic_penalty = self._automatic_penalty()
+            if excess_heat_penalty is None:
+                excess_heat_penalty = automatic_penalty
+            if missing_heat_penalty is None:
+                missing_heat_penalty = automatic_penalty
 
         self.create_solph_node(
             label="excess_heat",
             node_type=components.Sink,
             inputs={
-                bus: Flow(variable_costs=self.excess_heat_penalty)
-                for bus in self.level_nodes.values()
+                bus: Flow(variable_costs=excess_heat_penalty) for bus in buses
             },
         )
 
@@ -123,11 +203,49 @@ class HeatCarrier(AbstractLayeredCarrier, AbstractSolphRepresentation):
             label="missing_heat",
             node_type=components.Source,
             outputs={
-                bus: Flow(variable_costs=self.missing_heat_penalty)
-                for bus in self.level_nodes.values()
+                bus: Flow(variable_costs=missing_heat_penalty)
+                for bus in buses
             },
         )
 
+    @staticmethod
+    def _connects_demand(bus) -> bool:
+        """Check if a demand draws heat from or returns heat to a bus."""
+        # pylint: disable=import-outside-toplevel
+        from ..demands._abstract_demand import AbstractDemand
+
+        return any(
+            isinstance(getattr(node, "mtress_component", None), AbstractDemand)
+            for node in [*bus.inputs, *bus.outputs]
+        )
+
+    @staticmethod
+    def _is_slack(node) -> bool:
+        """Check if a node holds missing or excess heat of a carrier."""
+        return isinstance(
+            getattr(node, "mtress_component", None), HeatCarrier
+        ) and node.label.solph_node in ("excess_heat", "missing_heat")
+
+    def _automatic_penalty(self) -> float:
+        """
+        Penalty well above the highest variable cost of the system.
+
+        Slack of other heat carriers is left out, so that the penalty
+        neither grows with every location nor depends on their order.
+        """
+        costs = [
+            flow.variable_costs
+            for (source, target), flow in (
+                self._solph_model.energy_system.flows().items()
+            )
+            if not (self._is_slack(source) or self._is_slack(target))
+        ]
+        highest_cost = max(
+            (max(abs(cost.max()), abs(cost.min())) for cost in costs),
+            default=0,
+        )
+        return PENALTY_SCALE * max(highest_cost, 1)
+
     def get_connection_heat_transfer(self, max_temp, min_temp):
         warm_level_heating, _ = self.get_surrounding_levels(max_temp)
         _, cold_level_heating = self.get_surrounding_levels(min_temp)
@@ -27,11 +27,15 @@ from ._gas_definition import (
     BIOGAS,
     HYDROGEN,
     NATURAL_GAS,
+    DensityTable,
     Gas,
     calc_biogas_heating_value,
     calc_biogas_molar_mass,
+    calc_gas_density,
     calc_hydrogen_density,
     calc_natural_gas_molar_mass,
+    gas_density_table,
+    redlich_kwong_density,
 )
 from ._helper_functions import (
     bar_to_pascal,
@@ -71,6 +75,10 @@ __all__ = [
     "SECONDS_PER_HOUR",
     "calc_isothermal_compression_energy",
     "calc_hydrogen_density",
+    "redlich_kwong_density",
+    "calc_gas_density",
+    "gas_density_table",
+    "DensityTable",
     "calc_biogas_heating_value",
     "Gas",
     "HYDROGEN",
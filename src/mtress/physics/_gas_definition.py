@@ -5,9 +5,12 @@ here.
 """
 
 from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
 
 from ._constants import IDEAL_GAS_CONSTANT
-from ._helper_functions import bar_to_pascal
+from ._helper_functions import bar_to_pascal, celsius_to_kelvin
 
 # Some parameters for different gases are given below
 
@@ -34,29 +37,60 @@ rk_a = 0.1428  # Redlich-Kwong parameter 'a' for H2 in (m³bar/mol²)
 rk_b = 1.8208 * 10**-5  # Redlich-Kwong parameter 'b' for H2 in (m³/mol)
 
 
+#: Relative tolerance of the specific volume solving Redlich-Kwong
+RK_TOLERANCE = 1e-12
+RK_MAX_ITERATIONS = 50
+
+
+def redlich_kwong_density(
+    pressure, temperature, molar_mass: float, a: float, b: float
+):
+    """
+    Calculate the density of a gas using the Redlich-Kwong equation.
+
+    The equation is solved for the specific volume by Newton's method,
+    starting at the ideal gas, on whole arrays of pressures and
+    temperatures at once. For a = b = 0, this is the ideal gas law.
+
+    :param pressure: Pressure of the gas (in bar), scalar or array
+    :param temperature: Temperature of the gas (in °C), scalar or array
+    :param molar_mass: Molar mass of the gas (in kg/mol)
+    :param a: Redlich-Kwong parameter 'a' (in Pa m⁶ K^0.5/mol²)
+    :param b: Redlich-Kwong parameter 'b' (in m³/mol)
+    :return: Density of the gas (in kg/m³)
+    """
+    pressure = bar_to_pascal(np.asarray(pressure, dtype=float))
+    gas_temperature = celsius_to_kelvin(np.asarray(temperature, dtype=float))
+    rt = IDEAL_GAS_CONSTANT * gas_temperature
+    attraction = a / np.sqrt(gas_temperature)
+
+    v_spec = rt / pressure + b
+    for _ in range(RK_MAX_ITERATIONS):
+        residual = (
+            rt / (v_spec - b) - attraction / (v_spec * (v_spec + b)) - pressure
+        )
+        slope = (
+            -rt / (v_spec - b) ** 2
+            + attraction * (2 * v_spec + b) / (v_spec * (v_spec + b)) ** 2
+        )
+        step = residual / slope
+        v_spec = v_spec - step
+        if np.all(np.abs(step) <= RK_TOLERANCE * v_spec):
+            break
+
+    return (molar_mass / v_spec)[()]
+
+
 def calc_hydrogen_density(pressure, temperature: float = 25) -> float:
     """
     Calculate the density of hydrogen gas.
     :param temperature: H2 gas temperature in the storage tank (in °C)
-    :param pressure: Pressure of hydrogen gas (in bar)
+    :param pressure: Pressure of hydrogen gas (in bar), scalar or array
     :return: Density of hydrogen gas (in kg/m³)
     """
-    pressure = bar_to_pascal(pressure)
-    gas_temperature = 273.15 + temperature
-    a = rk_a  # Redlich-Kwong parameter 'a' for H2
-    b = rk_b  # Redlich-Kwong parameter 'b' for H2
-    v_spec = 10  # predefined initial value for specific volume [m³/mol]
-
-    for i in range(10):
-        v_spec = (
-            IDEAL_GAS_CONSTANT
-            * gas_temperature
-            / (pressure + (a / (gas_temperature**0.5 * v_spec * (v_spec + b))))
-        ) + b
-
-    density = H2_MOLAR_MASS / v_spec
-
-    return density
+    return redlich_kwong_density(
+        pressure, temperature, molar_mass=H2_MOLAR_MASS, a=rk_a, b=rk_b
+    )
 
 
 def calc_biogas_heating_value(
@@ -125,6 +159,9 @@ class Gas:
     HHV: float
     # molar mass of gas, given in kg/mol
     molar_mass: float
+    # Redlich-Kwong parameters, ideal gas by default
+    rk_a: float = 0.0
+    rk_b: float = 0.0
 
 
 # Object of different predefined gases
@@ -134,6 +171,8 @@ HYDROGEN = Gas(
     LHV=H2_LHV,
     HHV=H2_HHV,
     molar_mass=H2_MOLAR_MASS,
+    rk_a=rk_a,
+    rk_b=rk_b,
 )
 
 NATURAL_GAS = Gas(
@@ -162,3 +201,90 @@ BIO_METHANE = Gas(
     HHV=CH4_HHV,
     molar_mass=CH4_MOLAR_MASS,
 )
+
+
+def calc_gas_density(gas: Gas, pressure, temperature: float = 25):
+    """
+    Calculate the density of a gas, see `redlich_kwong_density`.
+
+    :param gas: Gas, an ideal gas unless Redlich-Kwong parameters are given
+    :param pressure: Pressure of the gas (in bar), scalar or array
+    :param temperature: Temperature of the gas (in °C)
+    :return: Density of the gas (in kg/m³)
+    """
+    return redlich_kwong_density(
+        pressure, temperature, gas.molar_mass, gas.rk_a, gas.rk_b
+    )
+
+
+@dataclass(frozen=True, eq=False)
+class DensityTable:
+    """
+    Tabulated density of a gas, interpolated linearly.
+
+    Pressures above the table are calculated directly.
+
+    :param gas: Tabulated gas
+    :param temperature: Temperature of the gas (in °C)
+    :param pressures: Tabulated pressures (in bar), starting at 0
+    :param densities: Densities at the pressures (in kg/m³)
+    """
+
+    gas: Gas
+    temperature: float
+    pressures: np.ndarray
+    densities: np.ndarray
+
+    def __call__(self, pressure):
+        """Density (in kg/m³) at the pressure (in bar)."""
+        pressure = np.asarray(pressure, dtype=float)
+        density = np.interp(pressure, self.pressures, self.densities)
+
+        beyond = pressure > self.pressures[-1]
+        if np.any(beyond):
+            # Clipped pressures only avoid dividing by zero, see np.where
+            density = np.where(
+                beyond,
+                calc_gas_density(
+                    self.gas, np.maximum(pressure, 1), self.temperature
+                ),
+                density,
+            )
+
+        return density[()]
+
+
+#: Number of density tables kept by `gas_density_table`
+DENSITY_TABLE_CACHE_SIZE = 32
+
+
+@lru_cache(maxsize=DENSITY_TABLE_CACHE_SIZE)
+def gas_density_table(
+    gas: Gas,
+    temperature: float = 25,
+    max_pressure: float = 1000,
+    step: float = 1,
+) -> DensityTable:
+    """
+    Tabulate the density of a gas, see `calc_gas_density`.
+
+    Tables are cached, so e.g. storages of the same gas share the table
+    instead of solving the equation of state again.
+
+    :param gas: Gas to tabulate
+    :param temperature: Temperature of the gas (in °C)
+    :param max_pressure: Highest tabulated pressure (in bar)
+    :param step: Distance of the tabulated pressures (in bar)
+    """
+    pressures = np.arange(0, max_pressure + step, step, dtype=float)
+    densities = np.zeros_like(pressures)
+    densities[1:] = calc_gas_density(gas, pressures[1:], temperature)
+    pressures.setflags(write=False)
+    densities.setflags(write=False)
+
+    return DensityTable(
+        gas=gas,
+        temperature=temperature,
+        pressures=pressures,
+        densities=densities,
+    )
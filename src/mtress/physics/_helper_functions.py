@@ -72,18 +72,37 @@ def bar_to_pascal(arg):
     return arg * 100000
 
 
+def _check_kelvin(*temperatures):
+    """Raise ValueError if any of the temperatures (in K) is negative."""
+    for temperature in temperatures:
+        if np.any(temperature < 0):
+            raise ValueError("Temperatures in Kelvin cannot be negative.")
+
+
 def logarithmic_mean_temperature(temp_high, temp_low):
     """
     Logarithmic mean temperature difference as used by the
     Lorenz CIO Model
 
+    Temperatures can be scalars or arrays, which are broadcast against
+    each other. For equal temperatures, the mean is the temperature.
+
     :param t_high: High Temperature (in K)
     :param t_low: Low Temperature (in K)
     :return: Logarithmic Mean Temperature Difference (in K)
     """
-    if temp_high < 0 or temp_low < 0:
-        raise ValueError("Temperatures in Kelvin cannot be negative.")
-    return (temp_low - temp_high) / np.log(temp_low / temp_high)
+    temp_high = np.asarray(temp_high, dtype=float)
+    temp_low = np.asarray(temp_low, dtype=float)
+    _check_kelvin(temp_high, temp_low)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_ratio = np.log(temp_low / temp_high)
+        mean = np.where(
+            log_ratio == 0,
+            temp_high,
+            (temp_low - temp_high) / log_ratio,
+        )
+    return mean[()]
 
 
 def lorenz_cop(temp_low, temp_high):
@@ -94,13 +113,18 @@ def lorenz_cop(temp_low, temp_high):
     (Lorenz, H, 1895. Die Ermittlung der Grenzwerte der
     thermodynamischen Energieumwandlung. Zeitschrift für
     die gesammte Kälte-Industrie, 2(1-3, 6-12).)
+
+    Temperatures can be scalars or arrays, which are broadcast against
+    each other.
+
     :param temp_low: Inlet Temperature (in K)
     :param temp_high: Outlet Temperature (in K)
     :return: Ideal COP
     """
-    if temp_high < 0 or temp_low < 0:
-        raise ValueError("Temperatures in Kelvin cannot be negative.")
-    return temp_high / np.maximum(temp_high - temp_low, 1e-3)
+    temp_low = np.asarray(temp_low, dtype=float)
+    temp_high = np.asarray(temp_high, dtype=float)
+    _check_kelvin(temp_high, temp_low)
+    return (temp_high / np.maximum(temp_high - temp_low, 1e-3))[()]
 
 
 def calc_cop(
@@ -111,6 +135,9 @@ def calc_cop(
     temp_secondary_in: float = None,
 ):
     """
+    Temperatures can be scalars or arrays, e.g. time series or all pairs
+    of temperature levels, which are broadcast against each other.
+
     :param ref_cop: Data class representing the reference COP
     :param temp_primary_in: Inlet temperature in the primary side (in °C)
     :param temp_secondary_out: Outlet temperature in the secondary side (in °C)
@@ -119,23 +146,23 @@ def calc_cop(
     :return: Scaled COP for the given temperatures
     """
 
-    temp_primary_in = celsius_to_kelvin(temp_primary_in)
-    temp_secondary_out = celsius_to_kelvin(temp_secondary_out)
+    temp_primary_in = celsius_to_kelvin(np.asarray(temp_primary_in))
+    temp_secondary_out = celsius_to_kelvin(np.asarray(temp_secondary_out))
 
-    if temp_primary_out is None or temp_primary_out == temp_primary_in:
+    if temp_primary_out is None:
         temp_low = temp_primary_in
     else:
-        temp_primary_out = celsius_to_kelvin(temp_primary_out)
         temp_low = logarithmic_mean_temperature(
-            temp_high=temp_primary_in, temp_low=temp_primary_out
+            temp_high=temp_primary_in,
+            temp_low=celsius_to_kelvin(np.asarray(temp_primary_out)),
         )
 
-    if temp_secondary_in is None or temp_secondary_out == temp_secondary_in:
+    if temp_secondary_in is None:
         temp_high = temp_secondary_out
     else:
-        temp_secondary_in = celsius_to_kelvin(temp_secondary_in)
         temp_high = logarithmic_mean_temperature(
-            temp_high=temp_secondary_out, temp_low=temp_secondary_in
+            temp_high=temp_secondary_out,
+            temp_low=celsius_to_kelvin(np.asarray(temp_secondary_in)),
         )
 
     # intermediate step: cop_design/lorenz_design
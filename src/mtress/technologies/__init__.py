@@ -26,8 +26,12 @@ from ._electrolyser import (
 )
 from ._fuel_cell import AEMFC, AFC, PEMFC, FuelCell, OffsetFuelCell
 from ._heat_exchanger import HeatExchanger, HeatSink, HeatSource
-from ._heat_pump import HeatPump, COPReference
-from ._heat_storage import FullyMixedHeatStorage, LayeredHeatStorage
+from ._heat_pump import HeatPump, COPReference, HeatPumpFormulation
+from ._heat_storage import (
+    FullyMixedHeatStorage,
+    LayeredHeatStorage,
+    LayeredHeatStorageFormulation,
+)
 from ._heater import GasBoiler, ResistiveHeater
 from ._photovoltaics import Photovoltaics
 from ._pressure_storage import H2Storage
@@ -54,6 +58,7 @@ __all__ = [
     "BatteryStorage",
     "HeatPump",
     "COPReference",
+    "HeatPumpFormulation",
     "CHP",
     "ResistiveHeater",
     "GasBoiler",
@@ -66,6 +71,7 @@ __all__ = [
     "H2Storage",
     "FuelCell",
     "LayeredHeatStorage",
+    "LayeredHeatStorageFormulation",
     "Photovoltaics",
     "RenewableElectricitySource",
     "GasBoiler",
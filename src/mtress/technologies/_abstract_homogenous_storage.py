@@ -27,10 +27,24 @@ class Implementation(Enum):
     STRICT: Allow flows to be active only if storage content permits until the
         end of the time step.
     FLEXIBLE: Allow flows to be active if storage content permits at any time.
+    FLEXIBLE_SOS2: Like FLEXIBLE, using an SOS2 set instead of binary
+        variables. Needs a solver supporting SOS constraints.
+    FLEXIBLE_LOGARITHMIC: Like FLEXIBLE, using a logarithmic number of
+        binary variables per time step.
     """
 
     STRICT = "strict"
     FLEXIBLE = "flexible"
+    FLEXIBLE_SOS2 = "flexible_sos2"
+    FLEXIBLE_LOGARITHMIC = "flexible_logarithmic"
+
+
+# Interval selection of the flexible multiplexer per implementation
+_INTERVAL_SELECTION = {
+    Implementation.FLEXIBLE: "binary",
+    Implementation.FLEXIBLE_SOS2: "sos2",
+    Implementation.FLEXIBLE_LOGARITHMIC: "logarithmic",
+}
 
 
 class AbstractHomogenousStorage(AbstractSolphRepresentation):
@@ -143,8 +157,11 @@ class AbstractHomogenousStorage(AbstractSolphRepresentation):
             "output_levels": self.storage_multiplexer_outputs,
         }
 
-        if self.implementation == Implementation.FLEXIBLE:
-            storage_multiplexer_constraint(**contraint_args)
+        if self.implementation in _INTERVAL_SELECTION:
+            storage_multiplexer_constraint(
+                **contraint_args,
+                interval_selection=_INTERVAL_SELECTION[self.implementation],
+            )
 
             return
 
@@ -57,8 +57,11 @@ class AbstactHeatExchanger(AbstractTechnology, AbstractSolphRepresentation):
         self.nominal_power = nominal_power
         self.minimum_delta = minimum_delta
 
+        # Reservoir temperature resolved for the current solph model
+        self._reservoir_temperature = None
+
     def _build_core(self):
-        self.reservoir_temperature = self._solph_model.data.get_timeseries(
+        self._reservoir_temperature = self._solph_model.data.get_timeseries(
             self.reservoir_temperature,
             kind=TimeseriesType.INTERVAL,
         )
@@ -70,7 +73,7 @@ class AbstactHeatExchanger(AbstractTechnology, AbstractSolphRepresentation):
 
         highest_warm_level, _ = self.heat_carrier.get_surrounding_levels(
             min(
-                max(self.reservoir_temperature),
+                max(self._reservoir_temperature),
                 self.maximum_working_temperature,
             )
         )
@@ -81,7 +84,7 @@ class AbstactHeatExchanger(AbstractTechnology, AbstractSolphRepresentation):
         _, lowest_warm_level = self.heat_carrier.get_surrounding_levels(
             max(
                 min(
-                    min(self.reservoir_temperature),
+                    min(self._reservoir_temperature),
                     self.minimum_working_temperature,
                 ),
                 (cold_level + self.minimum_delta),
@@ -126,7 +129,7 @@ class AbstactHeatExchanger(AbstractTechnology, AbstractSolphRepresentation):
 
             internal_sequence = [
                 1 if temp >= warm_temperature else 0
-                for temp in self.reservoir_temperature
+                for temp in self._reservoir_temperature
             ]
 
             self.create_solph_node(
@@ -155,7 +158,7 @@ class AbstactHeatExchanger(AbstractTechnology, AbstractSolphRepresentation):
 
         _, lowest_warm_level = self.heat_carrier.get_surrounding_levels(
             max(
-                min(self.reservoir_temperature),
+                min(self._reservoir_temperature),
                 self.minimum_working_temperature,
             )
         )
@@ -194,7 +197,7 @@ class AbstactHeatExchanger(AbstractTechnology, AbstractSolphRepresentation):
 
             internal_sequence = [
                 1 if temp <= cold_level else 0
-                for temp in self.reservoir_temperature
+                for temp in self._reservoir_temperature
             ]
 
             self.create_solph_node(
@@ -9,16 +9,41 @@ SPDX-FileCopyrightText: Lucas Schmeling
 SPDX-License-Identifier: MIT
 """
 
-from dataclasses import dataclass
+import logging
+from dataclasses import astuple, dataclass
+from enum import Enum
+from functools import lru_cache
 
+import numpy as np
 from oemof.solph import Bus, Flow
-from oemof.solph.components import Converter, Source
+from oemof.solph.components import Converter, Sink, Source
+from pyomo import environ as po
 
 from .._abstract_component import AbstractSolphRepresentation
+from .._data_handler import TimeseriesSpecifier, TimeseriesType
 from ..carriers import ElectricityCarrier, HeatCarrier
+from ..carriers._abstract_carrier import AbstractLayeredCarrier
 from ..physics import calc_cop
 from ._abstract_technology import AbstractTechnology
 
+LOGGER = logging.getLogger(__file__)
+
+
+class HeatPumpFormulation(Enum):
+    """
+    Possible formulations of the heat pump.
+
+    NODES: One oemof.solph Converter per pair of primary and secondary
+        levels, sharing an electricity and a heat budget bus.
+    COMPACT: One heat variable per pair of levels and one flow per level
+        and direction, coupled by constraints weighted by the COPs. This
+        gives the same feasible set with far fewer variables and
+        constraints.
+    """
+
+    NODES = "nodes"
+    COMPACT = "compact"
+
 
 @dataclass
 class COPReference:
@@ -40,6 +65,117 @@ class COPReference:
     warm_side_in: float = 30.0
 
 
+#: Maximum number of COP tables kept by `cop_table`
+COP_TABLE_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True, eq=False)
+class COPTable:
+    """
+    COPs of all pairs of primary and secondary levels of a heat pump.
+
+    :param primary_pairs: (outlet, inlet) temperatures (°C) of the pairs
+        of levels at the cold side
+    :param secondary_pairs: (inlet, outlet) temperatures (°C) of the pairs
+        of levels at the warm side
+    :param cops: Read-only array of COPs (primary x secondary pairs)
+    """
+
+    primary_pairs: tuple
+    secondary_pairs: tuple
+    cops: np.ndarray
+
+
+def _level_pairs(levels, minimum, maximum, delta) -> tuple:
+    """Pair (lower, upper) levels within the limits, delta or more apart."""
+    lower_levels = AbstractLayeredCarrier._get_levels_between(
+        minimum, maximum - delta, levels
+    )
+    if not lower_levels:
+        return ()
+
+    upper_levels = AbstractLayeredCarrier._get_levels_between(
+        lower_levels[0] + delta, maximum, levels
+    )
+    return tuple(zip(lower_levels, upper_levels))
+
+
+def _cop_matrix(
+    ref_cop: COPReference,
+    primary_pairs,
+    secondary_pairs,
+    source_temperature: np.ndarray = None,
+) -> np.ndarray:
+    """
+    Calculate the COPs of all pairs of primary and secondary levels.
+
+    :param source_temperature: Time series of the temperature (°C) entering
+        the cold side, replacing the temperatures of the primary levels
+    :return: Array of COPs (primary pairs x secondary pairs), with time
+        as a third dimension if a source temperature is given
+    """
+    primary = np.asarray(primary_pairs, dtype=float).reshape(-1, 2)
+    secondary = np.asarray(secondary_pairs, dtype=float).reshape(-1, 2)
+
+    # Primary pairs along the first, secondary along the second axis
+    temp_primary_out = primary[:, 0, None]
+    temp_primary_in = primary[:, 1, None]
+    temp_secondary_in = secondary[None, :, 0]
+    temp_secondary_out = secondary[None, :, 1]
+    shape = (len(primary), len(secondary))
+
+    if source_temperature is not None:
+        # Time along the third axis
+        source = np.asarray(source_temperature, dtype=float)[None, None, :]
+        spread = (temp_primary_in - temp_primary_out)[..., None]
+        temp_primary_in = source
+        temp_primary_out = source - spread
+        temp_secondary_in = temp_secondary_in[..., None]
+        temp_secondary_out = temp_secondary_out[..., None]
+        shape += (len(source_temperature),)
+
+    cops = calc_cop(
+        ref_cop=ref_cop,
+        temp_primary_in=temp_primary_in,
+        temp_primary_out=temp_primary_out,
+        temp_secondary_in=temp_secondary_in,
+        temp_secondary_out=temp_secondary_out,
+    )
+    return np.broadcast_to(cops, shape)
+
+
+@lru_cache(maxsize=COP_TABLE_CACHE_SIZE)
+def cop_table(
+    ref_cop: tuple, levels: tuple, primary: tuple, secondary: tuple
+) -> COPTable:
+    """
+    Pair the levels of a heat pump and calculate their COPs.
+
+    Tables are cached, so heat pumps sharing the reference COP, the
+    temperature levels and the temperature limits share their table,
+    regardless of their location.
+
+    :param ref_cop: Values of the COPReference, see `dataclasses.astuple`
+    :param levels: Temperature levels (°C) of the heat carrier
+    :param primary: Minimum temperature, maximum temperature and minimum
+        delta (°C) at the cold side
+    :param secondary: Same for the warm side
+    """
+    primary_pairs = _level_pairs(levels, *primary)
+    secondary_pairs = _level_pairs(levels, *secondary)
+
+    cops = np.array(
+        _cop_matrix(COPReference(*ref_cop), primary_pairs, secondary_pairs)
+    )
+    cops.setflags(write=False)
+
+    return COPTable(
+        primary_pairs=primary_pairs,
+        secondary_pairs=secondary_pairs,
+        cops=cops,
+    )
+
+
 class HeatPump(AbstractTechnology, AbstractSolphRepresentation):
     """
     Clustered heat pump for modeling power flows with variable
@@ -57,6 +193,15 @@ class HeatPump(AbstractTechnology, AbstractSolphRepresentation):
     The heat pump also connects to every available anergy source at
     the location. The COPs are automatically calculated based on the
     information given by the heat carrier and the anergy sources.
+
+    If a source temperature is given, e.g. the ambient air temperature
+    used as reservoir temperature of a heat exchanger, the COPs are
+    evaluated for the actual source temperature in every time step.
+    Heat is still drawn from the primary levels of the heat carrier,
+    which then only carry the energy: Their temperatures do not enter
+    the COPs, and it is not checked that the source can supply them.
+    Primary limits should hence only include levels which are fed by
+    the source, e.g. by a heat exchanger using the same temperature.
     """
 
     def __init__(
@@ -71,6 +216,8 @@ class HeatPump(AbstractTechnology, AbstractSolphRepresentation):
         max_temp_secondary: float = None,
         min_temp_secondary: float = None,
         min_delta_temp_secondary: float = 5.0,
+        source_temperature: TimeseriesSpecifier = None,
+        formulation: HeatPumpFormulation | str = HeatPumpFormulation.NODES,
     ):
         """
         Initialize heat pump component.
@@ -88,6 +235,14 @@ class HeatPump(AbstractTechnology, AbstractSolphRepresentation):
         :param min_temp_secondary: Minimum inlet temperature (°C)
             at the warm side.
         :param min_delta_temp_secondary: Minumum delta (°C) at the warm side.
+        :param source_temperature: Temperature (°C) of the heat source
+            entering the cold side, e.g. ambient air. If given, COPs are
+            time series, evaluated with this inlet temperature and the
+            outlet temperature lying the difference of the primary levels
+            below it, instead of the primary level temperatures. The
+            primary levels still supply the heat, see above.
+        :param formulation: Formulation of the heat pump, see
+            `HeatPumpFormulation`
         """
         super().__init__(name=name)
 
@@ -104,13 +259,33 @@ class HeatPump(AbstractTechnology, AbstractSolphRepresentation):
         self.max_temp_secondary = max_temp_secondary
         self.min_temp_secondary = min_temp_secondary
         self.min_delta_temp_secondary = min_delta_temp_secondary
+        self.source_temperature = source_temperature
+        self.formulation = HeatPumpFormulation(formulation)
 
         # Solph specific parameters
         self.electricity_bus = None
         self.heat_budget_bus = None
+        self._source_temperature = None
+
+        # Compact formulation: heat pump nodes and per level factors of
+        # the heat of every pair of levels
+        self.heat_input = None
+        self.heat_output = None
+        self._cops = None
+        self._input_factors = {}
+        self._output_factors = {}
 
     def build_core(self):
         """Build core structure of oemof.solph representation."""
+        if self.source_temperature is not None:
+            self._source_temperature = self._solph_model.data.get_timeseries(
+                self.source_temperature, kind=TimeseriesType.INTERVAL
+            ).to_numpy(dtype=float)
+
+        if self.formulation == HeatPumpFormulation.COMPACT:
+            # Nodes are created with the connections to the levels
+            return
+
         # Add electrical connection
         electricity_carrier = self.location.get_carrier(ElectricityCarrier)
 
@@ -141,48 +316,55 @@ class HeatPump(AbstractTechnology, AbstractSolphRepresentation):
         """Add connections to anergy sources."""
         heat_carrier = self.location.get_carrier(HeatCarrier)
 
-        primary_out_levels = heat_carrier.get_levels_between(
-            self.min_temp_primary,
-            self.max_temp_primary - self.min_delta_temp_primary,
-        )
-        primary_in_levels = heat_carrier.get_levels_between(
-            primary_out_levels[0] + self.min_delta_temp_primary,
-            self.max_temp_primary,
+        table = cop_table(
+            astuple(self.ref_cop),
+            tuple(heat_carrier.levels),
+            (
+                self.min_temp_primary,
+                self.max_temp_primary,
+                self.min_delta_temp_primary,
+            ),
+            (
+                self.min_temp_secondary,
+                self.max_temp_secondary,
+                self.min_delta_temp_secondary,
+            ),
         )
 
-        secondary_in_levels = heat_carrier.get_levels_between(
-            self.min_temp_secondary,
-            self.max_temp_secondary - self.min_delta_temp_secondary,
-        )
-        secondary_out_levels = heat_carrier.get_levels_between(
-            secondary_in_levels[0] + self.min_delta_temp_secondary,
-            self.max_temp_secondary,
-        )
+        if not table.primary_pairs or not table.secondary_pairs:
+            LOGGER.warning(
+                "Heat pump %s has no pair of temperature levels within "
+                + "its limits and is not connected.",
+                self.name,
+            )
+            return
+
+        cops = table.cops
+        if self._source_temperature is not None:
+            cops = _cop_matrix(
+                self.ref_cop,
+                table.primary_pairs,
+                table.secondary_pairs,
+                self._source_temperature,
+            )
 
-        temp_primary_out = primary_out_levels[0]
-        temp_primary_in = primary_in_levels[0]
-        temp_secondary_in = secondary_in_levels[0]
-        temp_secondary_out = secondary_out_levels[0]
-
-        for (
-            temp_primary_out,
-            temp_primary_in,
-        ) in zip(
-            primary_out_levels,
-            primary_in_levels,
+        if self.formulation == HeatPumpFormulation.COMPACT:
+            self._create_compact_nodes(table, cops)
+            return
+
+        for primary, (temp_primary_out, temp_primary_in) in enumerate(
+            table.primary_pairs
         ):
-            for (
+            for secondary, (
                 temp_secondary_in,
                 temp_secondary_out,
-            ) in zip(
-                secondary_in_levels,
-                secondary_out_levels,
-            ):
+            ) in enumerate(table.secondary_pairs):
                 self._create_converter_node(
                     temp_primary_out,
                     temp_primary_in,
                     temp_secondary_in,
                     temp_secondary_out,
+                    cops[primary, secondary],
                 )
 
     def _create_converter_node(
@@ -191,7 +373,13 @@ class HeatPump(AbstractTechnology, AbstractSolphRepresentation):
         temp_primary_in,
         temp_secondary_in,
         temp_secondary_out,
+        cop,
     ):
+        """
+        Create a virtual heat pump between two pairs of levels.
+
+        :param cop: COP, either constant or a time series
+        """
         heat_carrier = self.location.get_carrier(HeatCarrier)
         (
             heat_bus_warm_primary,
@@ -208,14 +396,6 @@ class HeatPump(AbstractTechnology, AbstractSolphRepresentation):
         ) = heat_carrier.get_connection_heat_transfer(
             temp_secondary_out, temp_secondary_in
         )
-        cop = calc_cop(
-            ref_cop=self.ref_cop,
-            temp_primary_in=temp_primary_in,
-            temp_primary_out=temp_primary_out,
-            temp_secondary_in=temp_secondary_in,
-            temp_secondary_out=temp_secondary_out,
-        )
-
         self.create_solph_node(
             label=f"cop_{temp_primary_in:.0f}_{temp_secondary_out:.0f}",
             node_type=Converter,
@@ -242,3 +422,166 @@ class HeatPump(AbstractTechnology, AbstractSolphRepresentation):
                 heat_bus_warm_secondary: 1 / (1 - ratio_secondary),
             },
         )
+
+    def _create_compact_nodes(self, table: COPTable, cops: np.ndarray):
+        """
+        Create the nodes of the compact formulation.
+
+        Every pair of levels gets a factor per level it draws heat from
+        or feeds heat to, relative to the heat it delivers, like the
+        conversion factors of the virtual heat pumps.
+        """
+        heat_carrier = self.location.get_carrier(HeatCarrier)
+        electricity_carrier = self.location.get_carrier(ElectricityCarrier)
+
+        # One row of COPs per pair of levels
+        self._cops = cops.reshape(
+            len(table.primary_pairs) * len(table.secondary_pairs), -1
+        )
+        self._input_factors = {}
+        self._output_factors = {}
+
+        def add_factor(factors, bus, pair, factor):
+            factors.setdefault(bus, {})
+            factors[bus][pair] = factors[bus].get(pair, 0) + factor
+
+        pairs = (
+            (primary_pair, secondary_pair)
+            for primary_pair in table.primary_pairs
+            for secondary_pair in table.secondary_pairs
+        )
+        for pair, (
+            (temp_primary_out, temp_primary_in),
+            (temp_secondary_in, temp_secondary_out),
+        ) in enumerate(pairs):
+            # Time series only if COPs depend on time
+            cop = self._cops[pair]
+            if len(cop) == 1:
+                cop = cop[0]
+            (
+                heat_bus_warm_primary,
+                heat_bus_cold_primary,
+                ratio_primary,
+            ) = heat_carrier.get_connection_heat_transfer(
+                temp_primary_in, temp_primary_out
+            )
+            (
+                heat_bus_warm_secondary,
+                heat_bus_cold_secondary,
+                ratio_secondary,
+            ) = heat_carrier.get_connection_heat_transfer(
+                temp_secondary_out, temp_secondary_in
+            )
+
+            add_factor(
+                self._input_factors,
+                heat_bus_warm_primary,
+                pair,
+                (cop - 1) / cop / (1 - ratio_primary),
+            )
+            add_factor(
+                self._input_factors,
+                heat_bus_cold_secondary,
+                pair,
+                ratio_secondary / (1 - ratio_secondary),
+            )
+            add_factor(
+                self._output_factors,
+                heat_bus_cold_primary,
+                pair,
+                (cop - 1) / cop * ratio_primary / (1 - ratio_primary),
+            )
+            add_factor(
+                self._output_factors,
+                heat_bus_warm_secondary,
+                pair,
+                1 / (1 - ratio_secondary),
+            )
+
+        self.electricity_bus = electricity_carrier.distribution
+        self.heat_input = self.create_solph_node(
+            label="heat_input",
+            node_type=Sink,
+            inputs={
+                self.electricity_bus: Flow(
+                    nominal_value=self.electrical_power_limit
+                ),
+                **{bus: Flow() for bus in self._input_factors},
+            },
+        )
+        self.heat_output = self.create_solph_node(
+            label="heat_output",
+            node_type=Source,
+            outputs={bus: Flow() for bus in self._output_factors},
+        )
+
+    def add_constraints(self):
+        """Add constraints of the compact formulation."""
+        if (
+            self.formulation != HeatPumpFormulation.COMPACT
+            or self._cops is None
+        ):
+            # Nodes formulation or no pairs of levels
+            return
+
+        model = self._solph_model.model
+        pairs = range(len(self._cops))
+        cops = np.broadcast_to(self._cops, (len(pairs), len(model.TIMESTEPS)))
+
+        def factor(values, t):
+            values = np.asarray(values)
+            return float(values[t] if values.ndim else values)
+
+        heat = po.Var(pairs, model.TIMESTEPS, within=po.NonNegativeReals)
+        setattr(model, str(self.create_label("heat")), heat)
+
+        def electricity_rule(_, t):
+            return model.flow[self.electricity_bus, self.heat_input, t] == sum(
+                heat[pair, t] / float(cops[pair, t]) for pair in pairs
+            )
+
+        setattr(
+            model,
+            str(self.create_label("electricity")),
+            po.Constraint(model.TIMESTEPS, rule=electricity_rule),
+        )
+
+        for name, factors, flow in (
+            (
+                "heat_input",
+                self._input_factors,
+                lambda bus, t: model.flow[bus, self.heat_input, t],
+            ),
+            (
+                "heat_output",
+                self._output_factors,
+                lambda bus, t: model.flow[self.heat_output, bus, t],
+            ),
+        ):
+            for bus, pair_factors in factors.items():
+
+                def heat_rule(_, t, bus=bus, pair_factors=pair_factors):
+                    return flow(bus, t) == sum(
+                        factor(value, t) * heat[pair, t]
+                        for pair, value in pair_factors.items()
+                    )
+
+                setattr(
+                    model,
+                    str(self.create_label(f"{name}_{bus.label.solph_node}")),
+                    po.Constraint(model.TIMESTEPS, rule=heat_rule),
+                )
+
+        if self.thermal_power_limit is not None:
+
+            def thermal_power_rule(_, t):
+                return (
+                    sum(heat[pair, t] for pair in pairs)
+                    <= self.thermal_power_limit
+                )
+
+            setattr(
+                model,
+                str(self.create_label("thermal_power_limit")),
+                po.Constraint(model.TIMESTEPS, rule=thermal_power_rule),
+            )
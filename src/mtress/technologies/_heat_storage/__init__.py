@@ -8,9 +8,13 @@ SPDX-License-Identifier: MIT
 """
 
 from ._fully_mixed_storage import FullyMixedHeatStorage
-from ._multi_layer_storage import LayeredHeatStorage
+from ._multi_layer_storage import (
+    LayeredHeatStorage,
+    LayeredHeatStorageFormulation,
+)
 
 __all__ = [
     "FullyMixedHeatStorage",
     "LayeredHeatStorage",
+    "LayeredHeatStorageFormulation",
 ]
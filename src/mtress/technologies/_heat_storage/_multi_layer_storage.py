@@ -8,13 +8,17 @@ SPDX-FileCopyrightText: Deutsches Zentrum für Luft und Raumfahrt
 SPDX-License-Identifier: MIT
 """
 
+from enum import Enum
+
+import numpy as np
 from oemof.solph import Bus, Flow
-from oemof.solph.components import GenericStorage
+from oemof.solph.components import GenericStorage, Sink, Source
 from oemof.solph.constraints import shared_limit
 from oemof.thermal import stratified_thermal_storage
 from pyomo import environ as po
 
 from mtress._data_handler import TimeseriesSpecifier, TimeseriesType
+from mtress._helpers._results import STORAGE_CONTENTS
 from mtress.carriers import HeatCarrier
 from mtress.physics import (
     H2O_DENSITY,
@@ -26,6 +30,22 @@ from mtress.physics import (
 from ._abstract_heat_storage import AbstractHeatStorage
 
 
+class LayeredHeatStorageFormulation(Enum):
+    """
+    Possible formulations of the layered heat storage.
+
+    NODES: One oemof.solph Bus and GenericStorage per temperature level,
+        with bidirectional flows between the buses of adjacent levels.
+    COMPACT: One Sink charging and one Source discharging all levels.
+        Contents of the layers and heat shifted between them are indexed
+        variables, coupled by one constraint set each. This gives the same
+        feasible set with fewer variables and constraints.
+    """
+
+    NODES = "nodes"
+    COMPACT = "compact"
+
+
 class LayeredHeatStorage(AbstractHeatStorage):
     """
     Layered heat storage.
@@ -47,6 +67,9 @@ class LayeredHeatStorage(AbstractHeatStorage):
         min_temperature: float | None = None,
         balanced: bool = True,
         initial_storage_levels: dict | None = None,
+        formulation: (
+            LayeredHeatStorageFormulation | str
+        ) = LayeredHeatStorageFormulation.NODES,
     ):
         """
         Create layered heat storage component.
@@ -56,6 +79,13 @@ class LayeredHeatStorage(AbstractHeatStorage):
         :param power_limit: power in W
         :param ambient_temperature: Ambient temperature in °C
         :param u_value: Thermal transmittance in W/m²/K
+        :param formulation: Formulation of the storage, see
+            `LayeredHeatStorageFormulation`. The compact formulation keeps
+            the contents of the layers in the model variable "content"
+            instead of storage components, and does not support typical
+            periods nor rolling horizons. Contents of the layers are
+            reported as storage contents labelled like the storages of the
+            nodes formulation.
         """
         super().__init__(
             name=name,
@@ -78,23 +108,23 @@ class LayeredHeatStorage(AbstractHeatStorage):
             initial_storage_levels = {}
 
         self.initial_storage_levels = initial_storage_levels
+        self.formulation = LayeredHeatStorageFormulation(formulation)
 
-    def build_core(self):
-        """Build core structure of oemof.solph representation."""
-        # Create storage components according to the temperature levels defined
-        # by the heat carrier object
+        # Parameters of the layers of the compact formulation
+        self._layers = {}
+        self.heat_input = None
+        self.heat_output = None
 
+    def _layer_parameters(self) -> dict:
+        """Storage parameters of the layers by temperature."""
         heat_carrier = self.location.get_carrier(HeatCarrier)
         reference_temperature = heat_carrier.reference
 
         temperature_levels = heat_carrier.levels
 
-        loss_flow = {}
-
+        layers = {}
         for temperature in temperature_levels:
             if self.min_temperature <= temperature <= self.max_temperature:
-                level_node = heat_carrier.level_nodes[temperature]
-
                 if temperature in self.initial_storage_levels:
                     initial_storage_level = self.initial_storage_levels[
                         temperature
@@ -139,35 +169,82 @@ class LayeredHeatStorage(AbstractHeatStorage):
                 if temperature != max(temperature_levels):
                     fixed_losses_relative = fixed_losses_absolute = 0
 
-                bus = self.create_solph_node(
-                    label=f"b_{temperature:.0f}",
-                    node_type=Bus,
-                    inputs={level_node: Flow(nominal_value=self.power_limit)},
-                    outputs={level_node: Flow(nominal_value=self.power_limit)}
-                    | loss_flow,
-                )
+                layers[temperature] = {
+                    "nominal_storage_capacity": capacity,
+                    "loss_rate": loss_rate,
+                    "initial_storage_level": initial_storage_level,
+                    "fixed_losses_absolute": fixed_losses_absolute,
+                    "fixed_losses_relative": fixed_losses_relative,
+                }
 
-                self.buses[temperature] = bus
-
-                storage = self.create_solph_node(
-                    label=f"{temperature:.0f}",
-                    node_type=GenericStorage,
-                    inputs={bus: Flow()},
-                    outputs={bus: Flow()},
-                    nominal_storage_capacity=capacity,
-                    loss_rate=loss_rate,
-                    balanced=self.balanced,
-                    initial_storage_level=initial_storage_level,
-                    fixed_losses_absolute=fixed_losses_absolute,
-                    fixed_losses_relative=fixed_losses_relative,
-                )
+        return layers
+
+    def build_core(self):
+        """Build core structure of oemof.solph representation."""
+        # Create storage components according to the temperature levels defined
+        # by the heat carrier object
+
+        heat_carrier = self.location.get_carrier(HeatCarrier)
+        layers = self._layer_parameters()
+
+        if self.formulation == LayeredHeatStorageFormulation.COMPACT:
+            self._layers = layers
+            self.heat_input = self.create_solph_node(
+                label="heat_input",
+                node_type=Sink,
+                inputs={
+                    heat_carrier.level_nodes[temperature]: Flow(
+                        nominal_value=self.power_limit
+                    )
+                    for temperature in layers
+                },
+            )
+            self.heat_output = self.create_solph_node(
+                label="heat_output",
+                node_type=Source,
+                outputs={
+                    heat_carrier.level_nodes[temperature]: Flow(
+                        nominal_value=self.power_limit
+                    )
+                    for temperature in layers
+                },
+            )
+            return
 
-                self.storage_components[temperature] = storage
+        loss_flow = {}
 
-                loss_flow = {bus: Flow(bidirectional=True)}
+        for temperature, layer in layers.items():
+            level_node = heat_carrier.level_nodes[temperature]
+
+            bus = self.create_solph_node(
+                label=f"b_{temperature:.0f}",
+                node_type=Bus,
+                inputs={level_node: Flow(nominal_value=self.power_limit)},
+                outputs={level_node: Flow(nominal_value=self.power_limit)}
+                | loss_flow,
+            )
+
+            self.buses[temperature] = bus
+
+            storage = self.create_solph_node(
+                label=f"{temperature:.0f}",
+                node_type=GenericStorage,
+                inputs={bus: Flow()},
+                outputs={bus: Flow()},
+                balanced=self.balanced,
+                **layer,
+            )
+
+            self.storage_components[temperature] = storage
+
+            loss_flow = {bus: Flow(bidirectional=True)}
 
     def add_constraints(self):
         """Add constraints to the model."""
+        if self.formulation == LayeredHeatStorageFormulation.COMPACT:
+            self._add_compact_constraints()
+            return
+
         reference_temperature = self.location.get_carrier(
             HeatCarrier
         ).reference
@@ -231,3 +308,168 @@ class LayeredHeatStorage(AbstractHeatStorage):
                 str(self.create_label(f"losses_{upper_temperature}")),
                 po.Constraint(model.TIMESTEPS, rule=equate_variables_rule),
             )
+
+    def _add_compact_constraints(self):
+        """Add the constraints of the compact formulation."""
+        if self._solph_model.aggregation is not None:
+            raise NotImplementedError(
+                "The compact layered heat storage does not support typical "
+                + "periods."
+            )
+
+        heat_carrier = self.location.get_carrier(HeatCarrier)
+        reference_temperature = heat_carrier.reference
+        model = self._solph_model.model
+
+        temperatures = list(self._layers)
+        layers = range(len(temperatures))
+        timesteps = list(model.TIMESTEPS)
+        increments = np.array(
+            [float(model.timeincrement[t]) for t in timesteps]
+        )
+
+        def parameter(name):
+            """Parameter of all layers as array of shape (layers, time)."""
+            return np.array(
+                [
+                    np.broadcast_to(
+                        np.asarray(layer[name], dtype=float), len(timesteps)
+                    )
+                    for layer in self._layers.values()
+                ]
+            )
+
+        capacities = np.array(
+            [
+                layer["nominal_storage_capacity"]
+                for layer in self._layers.values()
+            ]
+        )
+        retained = (1 - parameter("loss_rate")) ** increments
+        fixed_losses = (
+            parameter("fixed_losses_relative") * capacities[:, np.newaxis]
+            + parameter("fixed_losses_absolute")
+        ) * increments
+
+        content = po.Var(
+            layers,
+            model.TIMEPOINTS,
+            bounds=lambda _, layer, t: (0, float(capacities[layer])),
+        )
+        setattr(model, str(self.create_label("content")), content)
+
+        # Report the layers like the storages of the nodes formulation
+        if not hasattr(model, STORAGE_CONTENTS):
+            setattr(model, STORAGE_CONTENTS, {})
+        getattr(model, STORAGE_CONTENTS).update(
+            {
+                tuple(self.create_label(f"{temperature:.0f}")): (
+                    content,
+                    (layer,),
+                )
+                for layer, temperature in enumerate(temperatures)
+            }
+        )
+
+        # Heat shifted from a layer to the one below
+        shift = po.Var(range(len(temperatures) - 1), model.TIMESTEPS)
+        setattr(model, str(self.create_label("shift")), shift)
+
+        for layer, temperature in enumerate(temperatures):
+            initial_storage_level = self._layers[temperature][
+                "initial_storage_level"
+            ]
+            if initial_storage_level is not None:
+                content[layer, 0].fix(
+                    initial_storage_level * float(capacities[layer])
+                )
+
+        level_nodes = [
+            heat_carrier.level_nodes[temperature]
+            for temperature in temperatures
+        ]
+
+        def losses(layer, t):
+            return (1 - float(retained[layer, t])) * content[layer, t] + float(
+                fixed_losses[layer, t]
+            )
+
+        def balance_rule(_, layer, t):
+            net_inflow = (
+                model.flow[level_nodes[layer], self.heat_input, t]
+                - model.flow[self.heat_output, level_nodes[layer], t]
+            )
+            if layer + 1 < len(temperatures):
+                net_inflow += shift[layer, t]
+            if layer > 0:
+                net_inflow -= shift[layer - 1, t]
+
+            return (
+                content[layer, t + 1]
+                == content[layer, t]
+                - losses(layer, t)
+                + float(increments[t]) * net_inflow
+            )
+
+        setattr(
+            model,
+            str(self.create_label("balance")),
+            po.Constraint(layers, model.TIMESTEPS, rule=balance_rule),
+        )
+
+        if self.balanced:
+
+            def balanced_rule(_, layer):
+                return (
+                    content[layer, model.TIMEPOINTS.at(-1)]
+                    == content[layer, model.TIMEPOINTS.at(1)]
+                )
+
+            setattr(
+                model,
+                str(self.create_label("balanced")),
+                po.Constraint(layers, rule=balanced_rule),
+            )
+
+        # Volume used by the layers, see the nodes formulation
+        weights = [
+            SECONDS_PER_HOUR
+            / (
+                H2O_HEAT_CAPACITY
+                * H2O_DENSITY
+                * (temperature - reference_temperature)
+            )
+            for temperature in temperatures
+        ]
+
+        def volume_rule(_, t):
+            return (
+                sum(weights[layer] * content[layer, t] for layer in layers)
+                == self.volume
+            )
+
+        setattr(
+            model,
+            str(self.create_label("storage_limit")),
+            po.Constraint(model.TIMESTEPS, rule=volume_rule),
+        )
+
+        # Downshifting of the heat lost by the upper layer
+        ratios = [
+            (lower - reference_temperature) / (upper - reference_temperature)
+            for lower, upper in zip(temperatures, temperatures[1:])
+        ]
+
+        def losses_rule(_, layer, t):
+            ratio = ratios[layer]
+            return (ratio / (1 - ratio)) * losses(layer + 1, t) <= shift[
+                layer, t
+            ]
+
+        setattr(
+            model,
+            str(self.create_label("losses")),
+            po.Constraint(
+                range(len(ratios)), model.TIMESTEPS, rule=losses_rule
+            ),
+        )
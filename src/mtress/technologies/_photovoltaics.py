@@ -138,7 +138,7 @@ class Photovoltaics(RenewableElectricitySource):
         if self.weather is None:
             _LOGGER.warning("No weather data provided, taking clearsky data")
             return self.geo_location.get_clearsky(
-                self._solph_model.data.timeindex
+                self._solph_model.data.physical_timeindex
             )
 
         weather = pd.DataFrame()
@@ -146,7 +146,7 @@ class Photovoltaics(RenewableElectricitySource):
             if col not in self.weather:
                 raise KeyError(f"{col} data missing")
 
-            weather[col] = self._solph_model.data.get_timeseries(
+            weather[col] = self._solph_model.data.get_physical_timeseries(
                 self.weather[col], kind=TimeseriesType.INTERVAL
             )
 
@@ -157,13 +157,13 @@ class Photovoltaics(RenewableElectricitySource):
                         f"{col} required if dni is not provided missing"
                     )
 
-                weather[col] = self._solph_model.data.get_timeseries(
+                weather[col] = self._solph_model.data.get_physical_timeseries(
                     self.weather[col], kind=TimeseriesType.INTERVAL
                 )
 
             weather["dni"] = calculate_dni(weather, self.geo_location)
         else:
-            weather["dni"] = self._solph_model.data.get_timeseries(
+            weather["dni"] = self._solph_model.data.get_physical_timeseries(
                 self.weather["dni"], kind=TimeseriesType.INTERVAL
             )
 
@@ -171,7 +171,7 @@ class Photovoltaics(RenewableElectricitySource):
             if col not in self.weather:
                 _LOGGER.warning("{col} not provided, using pvlib defaults")
             else:
-                weather[col] = self._solph_model.data.get_timeseries(
+                weather[col] = self._solph_model.data.get_physical_timeseries(
                     self.weather[col], kind=TimeseriesType.INTERVAL
                 )
 
@@ -10,9 +10,11 @@ SPDX-License-Identifier: MIT
 
 from typing import Callable
 
+import numpy as np
+
 from mtress.carriers import GasCarrier
 
-from ...physics import Gas
+from ...physics import DensityTable, Gas, gas_density_table
 from .._abstract_homogenous_storage import (
     AbstractHomogenousStorage,
     Implementation,
@@ -29,7 +31,7 @@ class GasStorage(AbstractHomogenousStorage, AbstractTechnology):
         gas_type: Gas,
         volume: float,
         power_limit: float,
-        calc_density: Callable,
+        calc_density: Callable = None,
         implementation: Implementation | str = Implementation.STRICT,
     ):
         """
@@ -41,7 +43,11 @@ class GasStorage(AbstractHomogenousStorage, AbstractTechnology):
         :param volume: Volume of the storage in m³
         :param power_limit: power limit in kg
         :param calc_density: Function to calculate the density of the gas
-                             at a certain pressure level
+                             (kg/m³) at one pressure (bar). It is called
+                             once per pressure level. Defaults to the
+                             tabulated density of the gas type (see
+                             `gas_density_table`), which is evaluated for
+                             arrays of all levels at once.
 
         """
         if not isinstance(implementation, Implementation):
@@ -52,33 +58,45 @@ class GasStorage(AbstractHomogenousStorage, AbstractTechnology):
         self.gas_type = gas_type
         self.volume = volume
         self.power_limit = power_limit
+        if calc_density is None:
+            calc_density = gas_density_table(gas_type)
         self.calc_density = calc_density
 
     def _storage_content(self, pressure: float):
         """
         Calculate the storage content at a given pressure.
 
-        :param pressure: Pressure inside the storage tank given in bar
+        :param pressure: Pressure inside the storage tank given in bar,
+            scalar or (for density tables only) array
         """
         return self.calc_density(pressure) * self.volume
 
+    def _storage_contents(self, levels: list) -> list:
+        """Calculate the storage contents at all pressure levels."""
+        if isinstance(self.calc_density, DensityTable):
+            return list(self._storage_content(np.array(levels)))
+
+        return [self._storage_content(pressure) for pressure in levels]
+
     def build_core(self) -> None:
         """Build the core structure of mtress representation."""
         gas_carrier = self.location.get_carrier(GasCarrier)
+        levels = gas_carrier.pressure_levels[self.gas_type]
+
+        # Calculate the content once per level
+        contents = dict(zip(levels, self._storage_contents(levels)))
         solph_storage_arguments = {
-            "nominal_storage_capacity": self._storage_content(
-                max(gas_carrier.pressure_levels[self.gas_type])
-            ),
+            "nominal_storage_capacity": contents[max(levels)],
             "loss_rate": 0,
             "fixed_losses_relative": 0,
             "fixed_losses_absolute": 0,
         }
 
         self.build_multiplexer_structure(
-            levels=gas_carrier.pressure_levels[self.gas_type],
+            levels=levels,
             inputs=gas_carrier.inputs[self.gas_type],
             outputs=gas_carrier.outputs[self.gas_type],
             power_limit=self.power_limit,
-            capacity_at_level=self._storage_content,
+            capacity_at_level=contents.__getitem__,
             solph_storage_arguments=solph_storage_arguments,
         )
@@ -6,8 +6,17 @@ Tests for the MTRESS heat carrier.
 import math
 
 import pytest
+from oemof.solph.processing import meta_results
 
-from mtress.carriers import HeatCarrier
+from mtress import (
+    Location,
+    MetaModel,
+    SolphModel,
+    carriers,
+    demands,
+    technologies,
+)
+from mtress.carriers import HeatCarrier, HeatSlack
 
 
 def test_heat_carrier_with_reference():
@@ -111,3 +120,161 @@ def test_heat_carrier_without_high_temperatures():
     )
     assert heat_carrier.levels_above_reference == []
     assert heat_carrier.levels_below_reference == temperatures
+
+
+def test_heat_carrier_prune_levels():
+    def solve(prune_levels):
+        house_1 = Location(name="house_1")
+        house_1.add(carriers.ElectricityCarrier())
+        house_1.add(technologies.ElectricityGridConnection(working_rate=1))
+        heat_carrier = HeatCarrier(
+            temperature_levels=[10, 20, 30, 40, 55, 70],
+            reference_temperature=0,
+            prune_levels=prune_levels,
+        )
+        house_1.add(heat_carrier)
+        house_1.add(
+            technologies.ResistiveHeater(
+                name="heater",
+                heating_power=100,
+                maximum_temperature=40,
+                minimum_temperature=30,
+            )
+        )
+        house_1.add(
+            demands.FixedTemperatureHeating(
+                name="heating",
+                min_flow_temperature=40,
+                return_temperature=30,
+                time_series=[1, 2, 3],
+            )
+        )
+        solph_model = SolphModel(
+            MetaModel(locations=[house_1]),
+            timeindex={
+                "start": "2021-07-10 00:00:00",
+                "end": "2021-07-10 03:00:00",
+                "freq": "60T",
+            },
+        )
+        solph_model.build_solph_model()
+        solph_model.solve()
+        return solph_model, heat_carrier
+
+    full, heat_carrier = solve(prune_levels=False)
+    assert len(heat_carrier.level_nodes) == 6
+
+    pruned, heat_carrier = solve(prune_levels=True)
+    assert sorted(heat_carrier.level_nodes) == [30, 40]
+    assert pruned.model.nvariables() < full.model.nvariables()
+    assert math.isclose(
+        meta_results(pruned.model)["objective"],
+        meta_results(full.model)["objective"],
+    )
+
+
+def test_heat_carrier_slack():
+    def build(**kwargs):
+        house_1 = Location(name="house_1")
+        house_1.add(carriers.ElectricityCarrier())
+        house_1.add(technologies.ElectricityGridConnection(working_rate=2))
+        heat_carrier = HeatCarrier(
+            temperature_levels=[10, 20, 30, 40],
+            reference_temperature=0,
+            **kwargs,
+        )
+        house_1.add(heat_carrier)
+        house_1.add(
+            technologies.ResistiveHeater(
+                name="heater",
+                heating_power=2,
+                maximum_temperature=40,
+                minimum_temperature=10,
+            )
+        )
+        house_1.add(
+            demands.FixedTemperatureHeating(
+                name="heating",
+                min_flow_temperature=40,
+                return_temperature=30,
+                time_series=[1, 2, 3],
+            )
+        )
+        solph_model = SolphModel(
+            MetaModel(locations=[house_1]),
+            timeindex={
+                "start": "2021-07-10 00:00:00",
+                "end": "2021-07-10 03:00:00",
+                "freq": "60T",
+            },
+        )
+        nodes = {
+            node.label.solph_node: node
+            for node in solph_model.energy_system.nodes
+            if node.mtress_component is heat_carrier
+        }
+        return solph_model, nodes
+
+    _, nodes = build()
+    assert len(nodes["missing_heat"].outputs) == 4
+
+    _, nodes = build(slack="demand_levels")
+    assert {bus.label.solph_node for bus in nodes["missing_heat"].outputs} == {
+        "T_30",
+        "T_40",
+    }
+
+    _, nodes = build(slack=HeatSlack.NONE)
+    assert "missing_heat" not in nodes
+    assert "excess_heat" not in nodes
+
+    # Penalties scaled to the highest cost, heater too small for demand
+    solph_model, nodes = build(
+        missing_heat_penalty=None, excess_heat_penalty=None
+    )
+    for flow in nodes["missing_heat"].outputs.values():
+        assert flow.variable_costs.max() == 2e3
+    solph_model.solve()
+
+    # Missing heat at the flow, excess heat at the return temperature
+    assert math.isclose(
+        meta_results(solph_model.model)["objective"], 2 * 5 + 2e3 * (4 + 3)
+    )
+
+
+def test_heat_carrier_automatic_penalty_locations():
+    locations = []
+    heat_carriers = []
+    for name, penalty in [
+        ("house_1", 1e9),
+        ("house_2", None),
+        ("house_3", None),
+    ]:
+        location = Location(name=name)
+        location.add(carriers.ElectricityCarrier())
+        location.add(technologies.ElectricityGridConnection(working_rate=2))
+        heat_carrier = HeatCarrier(
+            temperature_levels=[10, 20],
+            reference_temperature=0,
+            missing_heat_penalty=penalty,
+            excess_heat_penalty=penalty,
+        )
+        location.add(heat_carrier)
+        locations.append(location)
+        heat_carriers.append(heat_carrier)
+
+    solph_model = SolphModel(
+        MetaModel(locations=locations),
+        timeindex={
+            "start": "2021-07-10 00:00:00",
+            "end": "2021-07-10 03:00:00",
+            "freq": "60T",
+        },
+    )
+
+    # Neither the fixed penalty nor earlier slack scales the penalties
+    for heat_carrier in heat_carriers[1:]:
+        for node in solph_model.energy_system.nodes:
+            if node.mtress_component is heat_carrier:
+                for flow in [*node.inputs.values(), *node.outputs.values()]:
+                    assert flow.variable_costs.max() == 2e3
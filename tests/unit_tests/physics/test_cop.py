@@ -4,6 +4,8 @@ Tests for coefficient of performance calculations.
 """
 import math
 
+import numpy as np
+
 import pytest
 
 from mtress.physics import (
@@ -227,3 +229,35 @@ class TestCOP:
         )
         true_cop = 5.315
         assert math.isclose(new_cop, true_cop, abs_tol=1e-3)
+
+    def test_vectorised_cop(self):
+        cop_ref = COPReference()
+        temp_primary_in = np.array([0.0, 5.0, 10.0, 10.0])
+        temp_primary_out = np.array([-5.0, 0.0, 5.0, 10.0])
+        temp_secondary_out = np.array([[35.0], [55.0]])
+
+        cops = calc_cop(
+            ref_cop=cop_ref,
+            temp_primary_in=temp_primary_in,
+            temp_primary_out=temp_primary_out,
+            temp_secondary_in=30,
+            temp_secondary_out=temp_secondary_out,
+        )
+
+        assert cops.shape == (2, 4)
+        for row, secondary_out in enumerate([35, 55]):
+            for column in range(4):
+                assert math.isclose(
+                    cops[row, column],
+                    calc_cop(
+                        ref_cop=cop_ref,
+                        temp_primary_in=temp_primary_in[column],
+                        temp_primary_out=temp_primary_out[column],
+                        temp_secondary_in=30,
+                        temp_secondary_out=secondary_out,
+                    ),
+                )
+        assert math.isclose(cops[0, 0], cop_ref.cop)
+
+        with pytest.raises(ValueError):
+            _ = lorenz_cop(np.array([250, -1]), 300)
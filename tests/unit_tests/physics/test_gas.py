@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for gas densities.
+"""
+
+import math
+
+import numpy as np
+
+from mtress.physics import (
+    HYDROGEN,
+    IDEAL_GAS_CONSTANT,
+    Gas,
+    calc_gas_density,
+    calc_hydrogen_density,
+    gas_density_table,
+)
+
+
+def test_hydrogen_density():
+    pressures = np.array([1, 30, 350, 700])
+    densities = calc_hydrogen_density(pressures)
+
+    # Values of the former fixed-point iteration
+    reference = [0.0812754, 2.3960255, 23.1023938, 38.3769233]
+    assert np.allclose(densities, reference, rtol=1e-6)
+    for pressure, density in zip(pressures, densities):
+        assert math.isclose(calc_hydrogen_density(pressure), density)
+
+    assert np.allclose(calc_gas_density(HYDROGEN, pressures), densities)
+
+
+def test_ideal_gas_density():
+    gas = Gas(name="Ideal", LHV=0, HHV=0, molar_mass=0.016)
+    density = calc_gas_density(gas, pressure=10, temperature=25)
+    assert math.isclose(density, 0.016 * 10e5 / (IDEAL_GAS_CONSTANT * 298.15))
+
+
+def test_gas_density_table():
+    gas_density_table.cache_clear()
+    table = gas_density_table(HYDROGEN)
+    assert gas_density_table(HYDROGEN) is table
+
+    pressures = np.array([0, 30, 42.5, 700, 1200])
+    densities = table(pressures)
+    assert densities[0] == 0
+    assert np.allclose(
+        densities[1:], calc_hydrogen_density(pressures[1:]), rtol=1e-4
+    )
+    assert math.isclose(table(30), calc_hydrogen_density(30))
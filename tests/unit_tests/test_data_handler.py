@@ -6,6 +6,7 @@ Tests for the MTRESS data handler.
 import pandas as pd
 import pytest
 
+from mtress import _data_handler
 from mtress._data_handler import DataHandler, TimeseriesType
 
 
@@ -111,3 +112,186 @@ class TestDataHandler:
         data_series = pd.Series(data=data_list[1:], index=shorter_date_range)
         with pytest.raises(KeyError, match="2021-07-10 00:00:00"):
             data_handler.get_timeseries(data_series, kind=TimeseriesType.POINT)
+
+    def test_csv_file(self, date_range, data_handler, tmp_path, monkeypatch):
+        cache_dir = tmp_path / "cache"
+        monkeypatch.setenv("MTRESS_CACHE_DIR", str(cache_dir))
+
+        file = tmp_path / "data.csv"
+        pd.DataFrame(
+            {"a": [1.0, 2, 3, 4, 5], "b": [5.0, 4, 3, 2, 1]},
+            index=date_range,
+        ).to_csv(file)
+
+        interval_data = data_handler.get_timeseries(
+            f"FILE:{file}:a", kind=TimeseriesType.INTERVAL
+        )
+        assert list(interval_data) == [1, 2, 3, 4]
+        assert (interval_data.index == date_range[:-1]).all()
+
+        # CSV was converted to a columnar store
+        (store,) = cache_dir.iterdir()
+        assert (store / "columns.json").exists()
+
+        # Aligned series are cached for all data handlers, changes of a
+        # returned series do not alter the cache
+        interval_data *= 10
+        other_handler = DataHandler(date_range)
+        other_data = other_handler.get_timeseries(
+            f"FILE:{file}:a", kind=TimeseriesType.INTERVAL
+        )
+        assert list(other_data) == [1, 2, 3, 4]
+        assert other_data is not interval_data
+
+        # Columnar store is used after in-memory caches were dropped
+        DataHandler.clear_cache()
+        point_data = data_handler.get_timeseries(
+            f"FILE:{file}:b", kind=TimeseriesType.POINT
+        )
+        assert list(point_data) == [5, 4, 3, 2, 1]
+
+        # Changed files are read again
+        pd.DataFrame({"a": [0.0] * 5}, index=date_range).to_csv(file)
+        interval_data = data_handler.get_timeseries(
+            f"FILE:{file}:a", kind=TimeseriesType.INTERVAL
+        )
+        assert list(interval_data) == [0, 0, 0, 0]
+
+    def test_csv_file_non_numeric_column(
+        self, date_range, data_handler, tmp_path, monkeypatch
+    ):
+        monkeypatch.setenv("MTRESS_CACHE_DIR", str(tmp_path / "cache"))
+
+        file = tmp_path / "data.csv"
+        pd.DataFrame(
+            {"a": [1.0, 2, 3, 4, 5], "b": ["1", "2", "x", "4", "5"]},
+            index=date_range,
+        ).to_csv(file)
+
+        # Numeric column converts the file to the columnar store
+        assert list(
+            data_handler.get_timeseries(
+                f"FILE:{file}:a", kind=TimeseriesType.POINT
+            )
+        ) == [1, 2, 3, 4, 5]
+
+        point_data = data_handler.get_timeseries(
+            f"FILE:{file}:b", kind=TimeseriesType.POINT
+        )
+        assert list(point_data) == ["1", "2", "x", "4", "5"]
+
+        with pytest.raises(KeyError):
+            data_handler.get_timeseries(
+                f"FILE:{file}:c", kind=TimeseriesType.POINT
+            )
+
+    def test_csv_file_positional(self, date_range, tmp_path, monkeypatch):
+        monkeypatch.setenv("MTRESS_CACHE_DIR", str(tmp_path / "cache"))
+
+        file = tmp_path / "data.csv"
+        pd.DataFrame({"a": [1.0, 2, 3, 4, 5]}).to_csv(file)
+
+        # Positional data is placed on the reference index of the handler
+        window = date_range[2:]
+        handler = DataHandler(window, reference_index=date_range)
+        shifted_handler = DataHandler(
+            window,
+            reference_index=pd.date_range(
+                date_range[1], periods=5, freq=date_range.freq
+            ),
+        )
+        for data_handler, expected in [
+            (handler, [3, 4, 5]),
+            (shifted_handler, [2, 3, 4]),
+        ]:
+            point_data = data_handler.get_timeseries(
+                f"FILE:{file}:a", kind=TimeseriesType.POINT
+            )
+            assert list(point_data) == expected
+
+    def test_cache_size(self, date_range, tmp_path, monkeypatch):
+        monkeypatch.setenv("MTRESS_CACHE_DIR", str(tmp_path / "cache"))
+        monkeypatch.setattr(_data_handler._ALIGNED, "maxsize", 2)
+        DataHandler.clear_cache()
+
+        file = tmp_path / "data.csv"
+        pd.DataFrame(
+            {column: [1.0, 2, 3, 4, 5] for column in "abc"},
+            index=date_range,
+        ).to_csv(file)
+
+        data_handler = DataHandler(date_range)
+        for column in "abc":
+            data_handler.get_timeseries(
+                f"FILE:{file}:{column}", kind=TimeseriesType.POINT
+            )
+
+        # Least recently used series was dropped
+        assert sorted(
+            series.name for series in _data_handler._ALIGNED.values()
+        ) == ["b", "c"]
+
+    def test_hdf_file(self, date_range, data_handler, tmp_path):
+        pytest.importorskip("tables")
+
+        longer_date_range = pd.date_range(
+            start=date_range[0] - 2 * date_range.freq,
+            periods=len(date_range) + 4,
+            freq=date_range.freq,
+        )
+        data = pd.DataFrame(
+            {"a": range(len(longer_date_range))},
+            index=longer_date_range,
+            dtype=float,
+        )
+        file = tmp_path / "data.h5"
+        data.to_hdf(file, key="measurements/table", format="table")
+        data.to_hdf(file, key="fixed")
+
+        for specifier in [
+            f"FILE:{file}:measurements/table/a",
+            f"FILE:{file}:fixed/a",
+        ]:
+            point_data = data_handler.get_timeseries(
+                specifier, kind=TimeseriesType.POINT
+            )
+            assert list(point_data) == [2, 3, 4, 5, 6]
+
+        # Only rows covering the time index are read
+        series = data_handler._read_from_file(
+            str(file), "measurements/table/a", date_range
+        )
+        assert (series.index == date_range).all()
+
+    @pytest.mark.parametrize("file_format", ["parquet", "feather"])
+    def test_arrow_file(self, date_range, data_handler, tmp_path, file_format):
+        pytest.importorskip("pyarrow")
+
+        longer_date_range = pd.date_range(
+            start=date_range[0] - 2 * date_range.freq,
+            periods=len(date_range) + 4,
+            freq=date_range.freq,
+        )
+        data = pd.DataFrame(
+            {
+                "time": longer_date_range,
+                "a": range(len(longer_date_range)),
+                "b": 0.0,
+            },
+        )
+        file = tmp_path / f"data.{file_format}"
+        if file_format == "parquet":
+            data.set_index("time").to_parquet(file, row_group_size=2)
+        else:
+            data.to_feather(file)
+
+        interval_data = data_handler.get_timeseries(
+            f"FILE:{file}:a", kind=TimeseriesType.INTERVAL
+        )
+        assert list(interval_data) == [2, 3, 4, 5]
+
+        series = data_handler._read_from_file(str(file), "a", date_range)
+        assert (series.index == date_range).all()
+
+        with pytest.raises(KeyError):
+            data_handler._read_from_file(str(file), "c", date_range)
@@ -5,6 +5,7 @@ Tests for the bare MTRESS meta model.
 
 from typing import Iterable
 
+import pandas as pd
 import pytest
 
 from mtress import Connection, Location, MetaModel
@@ -69,3 +70,68 @@ def test_adding_connections():
         in meta_model.connections
     )
     assert Connection(house_2, house_3, HeatCarrier) in meta_model.connections
+
+
+def _config(demand_file):
+    return {
+        "locations": {
+            "house_1": {
+                "carriers": {"Electricity": None},
+                "demands": {
+                    "Electricity": {
+                        "time_series": f"FILE:{demand_file}:demand"
+                    }
+                },
+                "components": {
+                    "grid": {
+                        "technology": "ElectricityGridConnection",
+                        "parameters": {"working_rate": 2},
+                    },
+                },
+            },
+        },
+    }
+
+
+def test_from_config(tmp_path):
+    from mtress import SolphModel
+    from mtress._config import _COMPILED_MODELS
+    from oemof.solph.processing import meta_results
+
+    timeindex = pd.date_range("2021-07-10", periods=4, freq="60T")
+    for number, demand in enumerate([[1, 2, 3], [3, 3, 3]]):
+        pd.DataFrame({"demand": demand}, index=timeindex[:-1]).to_csv(
+            tmp_path / f"demand_{number}.csv"
+        )
+
+    MetaModel.clear_config_cache()
+    meta_model = MetaModel.from_config(_config("demand_0.csv"), tmp_path)
+    assert {type(c).__name__ for c in meta_model.components} == {
+        "ElectricityCarrier",
+        "ElectricityGridConnection",
+        "Electricity",
+    }
+
+    # Only time series differ, so the compiled meta model is reused
+    other_model = MetaModel.from_config(_config("demand_1.csv"), tmp_path)
+    assert len(_COMPILED_MODELS) == 1
+    assert other_model is not meta_model
+
+    for model, objective in ((meta_model, 12), (other_model, 18)):
+        solved_model = SolphModel(model, timeindex=timeindex).solve()
+        assert meta_results(solved_model)["objective"] == pytest.approx(
+            objective
+        )
+
+
+def test_from_config_invalid():
+    config = _config("demand.csv")
+    config["locations"]["house_1"]["components"]["grid"]["parameters"] = {
+        "price": 2
+    }
+    with pytest.raises(ValueError, match="Invalid parameters"):
+        MetaModel.from_config(config)
+
+    config["locations"]["house_1"]["components"]["grid"]["technology"] = "X"
+    with pytest.raises(ValueError, match="Unknown class"):
+        MetaModel.from_config(config)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the batch runner of YAML configurations.
+"""
+
+import pandas as pd
+import pytest
+import yaml
+
+from mtress import SolphModel
+from mtress._run_mtress import SUMMARY_FILE, main
+
+
+def _write_config(path, working_rate):
+    config = {
+        "general": {
+            "timeindex": {
+                "start": "2021-07-10 00:00:00",
+                "periods": 4,
+                "freq": "60T",
+            },
+        },
+        "locations": {
+            "house_1": {
+                "carriers": {"Electricity": None},
+                "demands": {
+                    "Electricity": {"time_series": "FILE:demand.csv:demand"}
+                },
+                "components": {
+                    "grid": {
+                        "technology": "ElectricityGridConnection",
+                        "parameters": {"working_rate": working_rate},
+                    },
+                },
+            },
+        },
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        yaml.safe_dump(config, file)
+
+
+def test_batch(tmp_path, monkeypatch):
+    monkeypatch.setenv("MTRESS_CACHE_DIR", str(tmp_path / "cache"))
+    pd.DataFrame(
+        {"demand": [1, 2, 3]},
+        index=pd.date_range("2021-07-10", periods=3, freq="60T"),
+    ).to_csv(tmp_path / "demand.csv")
+    for working_rate in [1, 2]:
+        _write_config(tmp_path / f"building_{working_rate}.yaml", working_rate)
+
+    output_dir = tmp_path / "results"
+    exit_code = main(
+        [str(tmp_path / "*.yaml"), "-o", str(output_dir), "-j", "2"]
+    )
+    assert exit_code == 0
+
+    summary = pd.read_csv(output_dir / SUMMARY_FILE, index_col=0)
+    assert list(summary.index) == ["building_1", "building_2"]
+    assert list(summary["objective"]) == pytest.approx([6, 12])
+
+    # The CSV file was parsed once for both configurations
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+    results = SolphModel.load_results(output_dir / "building_2")
+    demand = results.flows[
+        ("house_1", "Electricity", "input"),
+        ("house_1", "Electricity", "sink"),
+    ]
+    assert list(demand) == [1, 2, 3]
+
+    exit_code = main(
+        [
+            str(tmp_path / "building_1.yaml"),
+            "-o",
+            str(output_dir),
+            "--timeout",
+            "0.001",
+        ]
+    )
+    assert exit_code == 1
+    summary = pd.read_csv(output_dir / SUMMARY_FILE, index_col=0)
+    assert summary.loc["building_1", "status"] == "timeout"
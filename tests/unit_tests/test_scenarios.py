@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the parallel scenario runner.
+"""
+
+import time
+
+import pytest
+
+from mtress import (
+    Location,
+    MetaModel,
+    carriers,
+    demands,
+    iterate_scenarios,
+    run_scenarios,
+    technologies,
+)
+
+TIMEINDEX = {
+    "start": "2021-07-10 00:00:00",
+    "end": "2021-07-10 03:00:00",
+    "freq": "60T",
+}
+
+IMPORT_FLOW = (
+    ("house_1", "ElectricityGridConnection", "source_import"),
+    ("house_1", "ElectricityGridConnection", "grid_import"),
+)
+
+
+def create_meta_model(working_rate, demand):
+    house_1 = Location(name="house_1")
+    house_1.add(carriers.ElectricityCarrier())
+    house_1.add(
+        technologies.ElectricityGridConnection(working_rate=working_rate)
+    )
+    house_1.add(demands.Electricity(name="demand", time_series=demand))
+
+    return MetaModel(locations=[house_1])
+
+
+def create_failing_meta_model(working_rate, demand):
+    if demand < 0:
+        raise ValueError("Negative demand")
+
+    return create_meta_model(working_rate, demand)
+
+
+def create_slow_meta_model(working_rate, demand):
+    time.sleep(0.5)
+    return create_meta_model(working_rate, demand)
+
+
+def test_run_scenarios():
+    table = run_scenarios(
+        create_meta_model,
+        parameter_grid={"working_rate": [1, 2], "demand": [1, 3]},
+        timeindex=TIMEINDEX,
+        workers=2,
+        key_flows={"grid_import": IMPORT_FLOW},
+    )
+
+    assert list(table.index) == [0, 1, 2, 3]
+    assert list(table["termination_condition"]) == ["optimal"] * 4
+    assert list(table["objective"]) == pytest.approx([3, 9, 6, 18])
+    assert list(table["grid_import"]) == pytest.approx([3, 9, 3, 9])
+
+
+def test_iterate_scenarios():
+    parameters = [
+        {"working_rate": 1, "demand": 2},
+        {"working_rate": 2, "demand": 2},
+    ]
+    results = {
+        result["scenario"]: result
+        for result in iterate_scenarios(
+            create_meta_model,
+            parameter_grid=parameters,
+            timeindex=TIMEINDEX,
+            workers=2,
+        )
+    }
+
+    assert results[0]["objective"] == pytest.approx(6)
+    assert results[1]["working_rate"] == 2
+    assert results[1]["objective"] == pytest.approx(12)
+
+
+def test_iterate_scenarios_error():
+    results = {
+        result["scenario"]: result
+        for result in iterate_scenarios(
+            create_failing_meta_model,
+            parameter_grid={"working_rate": [1], "demand": [1, -1]},
+            timeindex=TIMEINDEX,
+            workers=2,
+        )
+    }
+
+    assert results[0]["objective"] == pytest.approx(3)
+    assert results[1]["status"] == "error"
+    assert "Negative demand" in results[1]["error"]
+
+
+def test_iterate_scenarios_close():
+    results = iterate_scenarios(
+        create_slow_meta_model,
+        parameter_grid={"working_rate": [1], "demand": list(range(20))},
+        timeindex=TIMEINDEX,
+        workers=1,
+    )
+
+    start = time.perf_counter()
+    assert next(results)["status"] == "ok"
+    results.close()
+
+    # Pending scenarios are cancelled instead of being solved
+    assert time.perf_counter() - start < 5
+
+
+def test_run_scenarios_empty():
+    table = run_scenarios(
+        create_meta_model,
+        parameter_grid={"working_rate": [], "demand": [1, 3]},
+        timeindex=TIMEINDEX,
+        workers=1,
+        key_flows={"grid_import": IMPORT_FLOW},
+    )
+
+    assert table.empty
+    assert table.index.name == "scenario"
+    assert list(table.columns) == [
+        "working_rate",
+        "demand",
+        "status",
+        "termination_condition",
+        "objective",
+        "grid_import",
+    ]
+
+    table = run_scenarios(
+        create_meta_model, parameter_grid=[], timeindex=TIMEINDEX, workers=1
+    )
+    assert table.empty
+    assert table.index.name == "scenario"
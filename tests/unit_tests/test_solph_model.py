@@ -6,11 +6,13 @@ Tests for the MTRESS solph model.
 import datetime
 
 import json
+import sys
 
 import pandas as pd
 import pytest
 
-from oemof.solph.processing import results
+from oemof.solph import Bus
+from oemof.solph.processing import meta_results, results
 
 from mtress import (
     Connection,
@@ -22,7 +24,10 @@ from mtress import (
     technologies,
 )
 from mtress.technologies.grid_connection import ElectricityGridConnection
-from mtress._helpers import get_flows
+from mtress._helpers import FlowResults, get_flows
+from mtress.physics import HYDROGEN
+from mtress._warm_start import apply_solution
+from mtress._helpers._results import results_from_model
 
 
 def test_minimal_initialisation_with_date_range():
@@ -383,3 +388,555 @@ def test_graph_series():
                 + f" solph_node='{n[2]}')"
                 in obj_names
             )
+
+
+def test_solve_rolling_horizon():
+    house_1 = Location(name="house_1")
+    house_1.add(carriers.ElectricityCarrier())
+    house_1.add(
+        technologies.ElectricityGridConnection(
+            working_rate=[1, 1, 5, 5, 1, 1, 5, 5]
+        )
+    )
+    demand_series = [1, 2, 3, 4, 4, 3, 2, 1]
+    house_1.add(demands.Electricity(name="demand", time_series=demand_series))
+    house_1.add(
+        technologies.BatteryStorage(name="battery", nominal_capacity=10)
+    )
+
+    solph_model = SolphModel(
+        MetaModel(locations=[house_1]),
+        timeindex={
+            "start": "2021-07-10 00:00:00",
+            "end": "2021-07-10 08:00:00",
+            "freq": "60T",
+        },
+    )
+    horizon_results = solph_model.solve_rolling_horizon(window=4, overlap=1)
+
+    flows = get_flows(horizon_results)
+    demand_flow = flows[
+        (
+            ("house_1", "demand", "input"),
+            ("house_1", "demand", "sink"),
+        )
+    ]
+    assert list(demand_flow.index) == list(solph_model.timeindex)
+    assert list(demand_flow[:-1]) == pytest.approx(demand_series)
+
+    (battery,) = (
+        node
+        for node in solph_model.energy_system.nodes
+        if node.label == ("house_1", "battery", "Battery_Storage")
+    )
+    content = horizon_results[(battery, None)]["sequences"]["storage_content"]
+    assert not content.isna().any()
+    # Initial state of charge and balanced storage over the full horizon
+    assert content.iloc[0] == pytest.approx(5)
+    assert content.iloc[-1] == pytest.approx(5)
+
+
+def _rolling_horizon_model(location):
+    return SolphModel(
+        MetaModel(locations=[location]),
+        timeindex={
+            "start": "2021-07-10 00:00:00",
+            "end": "2021-07-10 08:00:00",
+            "freq": "60T",
+        },
+    )
+
+
+def test_solve_rolling_horizon_without_storage():
+    house_1 = Location(name="house_1")
+    house_1.add(carriers.ElectricityCarrier())
+    house_1.add(technologies.ElectricityGridConnection(working_rate=1))
+    house_1.add(demands.Electricity(name="demand", time_series=[1] * 8))
+
+    horizon_results = _rolling_horizon_model(house_1).solve_rolling_horizon(
+        window=4
+    )
+
+    demand_flow = get_flows(horizon_results)[
+        (("house_1", "demand", "input"), ("house_1", "demand", "sink"))
+    ]
+    assert list(demand_flow[:-1]) == pytest.approx([1] * 8)
+
+
+@pytest.mark.parametrize("overlap", [0, 1])
+def test_solve_rolling_horizon_layered_heat_storage(overlap):
+    house_1 = Location(name="house_1")
+    house_1.add(carriers.ElectricityCarrier())
+    house_1.add(
+        carriers.HeatCarrier(
+            temperature_levels=[10, 20, 30], reference_temperature=0
+        )
+    )
+    house_1.add(
+        technologies.ElectricityGridConnection(
+            working_rate=[1, 10, 10, 10] * 2
+        )
+    )
+    house_1.add(
+        technologies.ResistiveHeater(
+            name="heater", maximum_temperature=30, minimum_temperature=20
+        )
+    )
+    heat_demand = [0, 1e3, 2e3, 1e3] * 2
+    house_1.add(
+        demands.FixedTemperatureHeating(
+            name="heating",
+            min_flow_temperature=30,
+            return_temperature=20,
+            time_series=heat_demand,
+        )
+    )
+    house_1.add(
+        technologies.LayeredHeatStorage(
+            name="storage",
+            diameter=1,
+            volume=1,
+            power_limit=None,
+            ambient_temperature=0,
+            u_value=0.5,
+            max_temperature=30,
+            min_temperature=10,
+        )
+    )
+
+    horizon_results = _rolling_horizon_model(house_1).solve_rolling_horizon(
+        window=4, overlap=overlap
+    )
+
+    heat_flow = get_flows(horizon_results)[
+        (
+            ("house_1", "heating", "heat_exchanger"),
+            ("house_1", "heating", "output"),
+        )
+    ]
+    assert list(heat_flow[:-1]) == pytest.approx(heat_demand)
+
+
+def test_solve_rolling_horizon_flexible_h2_storage():
+    house_1 = Location(name="house_1")
+    house_1.add(carriers.GasCarrier(gases={HYDROGEN: [10, 30, 70]}))
+    house_1.add(
+        technologies.GasGridConnection(
+            gas_type=HYDROGEN,
+            grid_pressure=70,
+            working_rate=[1, 10, 10, 10] * 2,
+        )
+    )
+    gas_demand = [0, 1, 1, 1] * 2
+    house_1.add(
+        demands.GasDemand(
+            name="demand",
+            gas_type=HYDROGEN,
+            time_series=gas_demand,
+            pressure=10,
+        )
+    )
+    house_1.add(
+        technologies.H2Storage(
+            name="storage",
+            volume=1,
+            power_limit=10,
+            multiplexer_implementation="flexible",
+        )
+    )
+
+    horizon_results = _rolling_horizon_model(house_1).solve_rolling_horizon(
+        window=4, overlap=1
+    )
+
+    demand_flow = get_flows(horizon_results)[
+        (("house_1", "demand", "input"), ("house_1", "demand", "sink"))
+    ]
+    assert list(demand_flow[:-1]) == pytest.approx(gas_demand)
+
+
+def test_update_timeseries():
+    house_1 = Location(name="house_1")
+    house_1.add(carriers.ElectricityCarrier())
+    house_1.add(technologies.ElectricityGridConnection(working_rate=1))
+    house_1.add(demands.Electricity(name="demand", time_series=[1, 2, 3]))
+
+    solph_model = SolphModel(
+        MetaModel(locations=[house_1]),
+        timeindex={
+            "start": "2021-07-10 00:00:00",
+            "end": "2021-07-10 03:00:00",
+            "freq": "60T",
+        },
+    )
+    solved_model = solph_model.solve()
+    assert meta_results(solved_model)["objective"] == pytest.approx(6)
+
+    import_flow = (
+        ("house_1", "ElectricityGridConnection", "source_import"),
+        ("house_1", "ElectricityGridConnection", "grid_import"),
+    )
+    demand_flow = (
+        ("house_1", "demand", "input"),
+        ("house_1", "demand", "sink"),
+    )
+
+    solph_model.update_timeseries(
+        {
+            import_flow: {"variable_costs": [2, 2, 4]},
+            demand_flow: {"fix": [3, 2, 1]},
+        }
+    )
+    assert solph_model.solve() is solved_model
+    assert meta_results(solved_model)["objective"] == pytest.approx(14)
+
+    # Costs are mutable parameters now, so only values are swapped
+    solph_model.update_timeseries({import_flow: {"variable_costs": 1}})
+    solph_model.solve()
+    assert meta_results(solved_model)["objective"] == pytest.approx(6)
+
+    with pytest.raises(KeyError):
+        solph_model.update_timeseries({(demand_flow[1], demand_flow[0]): {}})
+
+    with pytest.raises(ValueError):
+        solph_model.update_timeseries({demand_flow: {"nominal_value": 1}})
+
+    # Failing updates change neither flows nor the model
+    flows = {
+        (source.label, target.label): flow
+        for (source, target), flow in solph_model.energy_system.flows().items()
+    }
+    demand_max = flows[demand_flow].max
+    import_costs = flows[import_flow].variable_costs
+    with pytest.raises(ValueError, match="is fixed"):
+        solph_model.update_timeseries(
+            {
+                import_flow: {"variable_costs": 5},
+                demand_flow: {"max": [1, 1, 1]},
+            }
+        )
+    assert flows[demand_flow].max is demand_max
+    assert flows[import_flow].variable_costs is import_costs
+    solph_model.solve()
+    assert meta_results(solved_model)["objective"] == pytest.approx(6)
+
+
+def test_flow_results():
+    house_1 = Location(name="house_1")
+    house_1.add(carriers.ElectricityCarrier())
+    house_1.add(technologies.ElectricityGridConnection(working_rate=1))
+    house_1.add(demands.Electricity(name="demand", time_series=[1, 2, 3]))
+
+    solph_model = SolphModel(
+        MetaModel(locations=[house_1]),
+        timeindex={
+            "start": "2021-07-10 00:00:00",
+            "end": "2021-07-10 03:00:00",
+            "freq": "60T",
+        },
+    )
+    solved_model = solph_model.solve()
+
+    flows = get_flows(results(solved_model))
+    flow_results = FlowResults.from_model(solved_model)
+
+    assert len(flow_results) == len(flows)
+    for key, flow in flows.items():
+        assert list(flow_results[key]) == pytest.approx(list(flow[:-1]))
+
+    demand = flow_results.component("house_1", "demand")
+    assert list(demand.columns.get_level_values("target_node")) == ["sink"]
+    assert list(demand.data[:, 0]) == pytest.approx([1, 2, 3])
+    # Selections share memory with the full results
+    assert demand.data.base is flow_results.data
+    assert len(flow_results.location("house_1")) == len(flows)
+
+    second_step = flow_results.between(
+        "2021-07-10 01:00:00", "2021-07-10 01:00:00"
+    )
+    assert list(second_step.component("house_1", "demand").data[:, 0]) == [2]
+
+
+def test_save_and_load_results(tmp_path):
+    house_1 = Location(name="house_1")
+    house_1.add(carriers.ElectricityCarrier())
+    house_1.add(
+        technologies.ElectricityGridConnection(working_rate=[1, 5, 1, 5])
+    )
+    house_1.add(demands.Electricity(name="demand", time_series=[1, 2, 3, 4]))
+    house_1.add(
+        technologies.BatteryStorage(name="battery", nominal_capacity=10)
+    )
+
+    solph_model = SolphModel(
+        MetaModel(locations=[house_1]),
+        timeindex={
+            "start": "2021-07-10 00:00:00",
+            "end": "2021-07-10 04:00:00",
+            "freq": "60T",
+        },
+    )
+    with pytest.raises(ValueError):
+        solph_model.save_results(tmp_path)
+
+    solved_model = solph_model.solve()
+    solph_model.save_results(tmp_path)
+    stored_results = SolphModel.load_results(tmp_path)
+
+    flows = FlowResults.from_model(solved_model)
+    assert (stored_results.flows.columns == flows.columns).all()
+    assert (stored_results.flows.index == flows.index).all()
+    assert (stored_results.flows.data == flows.data).all()
+
+    demand = stored_results.flows.component("house_1", "demand").between(
+        "2021-07-10 01:00:00", "2021-07-10 02:00:00"
+    )
+    assert list(demand.data[:, 0]) == pytest.approx([2, 3])
+
+    storage_content = stored_results.storage_content[
+        ("house_1", "battery", "Battery_Storage")
+    ]
+    assert len(storage_content) == 5
+    assert storage_content.iloc[-1] == pytest.approx(5)
+    assert len(stored_results.status) == 0
+
+
+def test_report():
+    house_1 = Location(name="house_1")
+    house_1.add(carriers.ElectricityCarrier())
+    house_1.add(technologies.ElectricityGridConnection(working_rate=1))
+    house_1.add(demands.Electricity(name="demand", time_series=[1, 2, 3]))
+
+    records = []
+    solph_model = SolphModel(
+        MetaModel(locations=[house_1]),
+        timeindex={
+            "start": "2021-07-10 00:00:00",
+            "end": "2021-07-10 03:00:00",
+            "freq": "60T",
+        },
+        instrumentation_hooks=[records.append],
+    )
+    assert solph_model.report().statistics is None
+
+    solph_model.solve()
+    report = solph_model.report()
+
+    assert list(report.phases.index) == [
+        "build_core",
+        "establish_interconnections",
+        "connections",
+        "complete_structure",
+        "solph_model",
+        "add_constraints",
+        "solve",
+    ]
+    assert (report.phases["wall_time"] >= 0).all()
+    assert "house_1/demand" in report.component_times.index
+    assert len(records) == len(solph_model.instrumentation.records)
+
+    statistics = report.statistics
+    assert statistics.loc["house_1/demand", "variables"] == 3
+    assert statistics["variables"].sum() == solph_model.model.nvariables()
+    assert report.shares()["constraints"].sum() == pytest.approx(1)
+
+
+def test_solve_persistent(caplog):
+    pytest.importorskip("highspy")
+
+    def create_model():
+        house_1 = Location(name="house_1")
+        house_1.add(carriers.ElectricityCarrier())
+        house_1.add(technologies.ElectricityGridConnection(working_rate=2))
+        house_1.add(demands.Electricity(name="demand", time_series=[1, 2, 3]))
+        return SolphModel(
+            MetaModel(locations=[house_1]),
+            timeindex={
+                "start": "2021-07-10 00:00:00",
+                "end": "2021-07-10 03:00:00",
+                "freq": "60T",
+            },
+        )
+
+    solph_model = create_model()
+    solved_model = solph_model.solve(solver="highs", backend="persistent")
+    assert meta_results(solved_model)["objective"] == pytest.approx(12)
+
+    # Re-solve updated model using the same solver instance
+    grid_source = (
+        ("house_1", "ElectricityGridConnection", "source_import"),
+        ("house_1", "ElectricityGridConnection", "grid_import"),
+    )
+    solph_model.update_timeseries({grid_source: {"variable_costs": [1, 1, 1]}})
+    solved_model = solph_model.solve(solver="highs", backend="persistent")
+    assert meta_results(solved_model)["objective"] == pytest.approx(6)
+    assert len(solph_model._persistent_solvers) == 1
+
+    # Solvers without in-memory interface use files
+    solved_model = create_model().solve(solver="cbc", backend="persistent")
+    assert meta_results(solved_model)["objective"] == pytest.approx(12)
+    assert "using files instead" in caplog.text
+
+
+def test_warm_start():
+    def create_model(start, demand):
+        house_1 = Location(name="house_1")
+        house_1.add(carriers.ElectricityCarrier())
+        house_1.add(technologies.ElectricityGridConnection(working_rate=2))
+        house_1.add(demands.Electricity(name="demand", time_series=demand))
+        return SolphModel(
+            MetaModel(locations=[house_1]),
+            timeindex={"start": start, "periods": 4, "freq": "60T"},
+        )
+
+    solph_model = create_model("2021-07-10 00:00:00", [1, 2, 3])
+    assert solph_model.last_solution is None
+    solph_model.solve(solver="cbc")
+    solution = solph_model.last_solution
+    grid_source = (
+        ("house_1", "ElectricityGridConnection", "source_import"),
+        ("house_1", "ElectricityGridConnection", "grid_import"),
+    )
+    assert list(solution.flows[grid_source]) == [1, 2, 3]
+
+    # Solution of a horizon shifted by one hour
+    shifted_model = create_model("2021-07-10 01:00:00", [2, 3, 4])
+    shifted_model.build_solph_model()
+    model = shifted_model.model
+    assert apply_solution(model, solution) > 0
+    flow = [
+        model.flow[source, target, t].value
+        for (source, target) in model.FLOWS
+        if (source.label, target.label) == grid_source
+        for t in model.TIMESTEPS
+    ]
+    assert flow == [2, 3, 3]
+
+    solved_model = shifted_model.solve(solver="cbc", warm_start=solution)
+    assert meta_results(solved_model)["objective"] == pytest.approx(18)
+    assert list(shifted_model.last_solution.flows[grid_source]) == [2, 3, 4]
+
+
+def test_last_solution_is_read_when_needed(monkeypatch):
+    reads = []
+
+    def read_results(model):
+        reads.append(model)
+        return results_from_model(model)
+
+    house_1 = Location(name="house_1")
+    house_1.add(carriers.ElectricityCarrier())
+    house_1.add(technologies.ElectricityGridConnection(working_rate=2))
+    house_1.add(demands.Electricity(name="demand", time_series=[1, 2, 3]))
+    solph_model = SolphModel(
+        MetaModel(locations=[house_1]),
+        timeindex={"start": "2021-07-10", "periods": 4, "freq": "60T"},
+    )
+
+    monkeypatch.setattr("mtress._solph_model.results_from_model", read_results)
+    solph_model.solve(solver="cbc", warm_start=False)
+    solph_model.solve(solver="cbc", warm_start=False)
+    assert not reads
+
+    # Read once, from the model of the last solve
+    solution = solph_model.last_solution
+    assert solph_model.last_solution is solution
+    assert reads == [solph_model.model]
+    assert solution.flows.data.sum() > 0
+
+
+def test_node_registry():
+    house_1 = Location(name="house_1")
+    house_1.add(carriers.ElectricityCarrier())
+    grid_connection = ElectricityGridConnection()
+    house_1.add(grid_connection)
+    house_2 = Location(name="house_2")
+    house_2.add(carriers.ElectricityCarrier())
+    house_2.add(ElectricityGridConnection())
+
+    solph_model = SolphModel(
+        meta_model=MetaModel(locations=[house_1, house_2]),
+        timeindex={
+            "start": "2021-07-10 00:00:00",
+            "periods": 3,
+            "freq": "60T",
+        },
+    )
+
+    assert len(solph_model.node_registry) == len(
+        solph_model.energy_system.nodes
+    )
+    assert (
+        solph_model.node("house_1", "ElectricityGridConnection", "grid_import")
+        is grid_connection.grid_import
+    )
+    with pytest.raises(KeyError):
+        solph_model.node("house_3", "ElectricityGridConnection", "grid_import")
+
+    assert set(solph_model.nodes_by_location("house_1")) == set(
+        grid_connection.solph_nodes
+        + house_1.get_carrier(carriers.ElectricityCarrier).solph_nodes
+    )
+    assert len(solph_model.nodes_by_component(ElectricityGridConnection)) == (
+        2 * len(grid_connection.solph_nodes)
+    )
+    assert {
+        node.label.location
+        for node in solph_model.nodes_by_carrier(carriers.ElectricityCarrier)
+    } == {"house_1", "house_2"}
+    with pytest.raises(ValueError):
+        solph_model.nodes_by_carrier(ElectricityGridConnection)
+
+    # Labels are unique
+    with pytest.raises(KeyError, match="already exists"):
+        grid_connection.create_solph_node(label="grid_import", node_type=Bus)
+
+
+def test_flow_colors():
+    # Locations connected in a chain, so that colours spread far
+    meta_model = MetaModel()
+    locations = []
+    for number in range(100):
+        location = Location(name=f"house_{number}")
+        location.add(carriers.ElectricityCarrier())
+        location.add(ElectricityGridConnection())
+        meta_model.add_location(location)
+        locations.append(location)
+    for source, destination in zip(locations, locations[1:]):
+        meta_model.add(
+            Connection(source, destination, ElectricityGridConnection)
+        )
+    solph_model = SolphModel(
+        meta_model,
+        timeindex={
+            "start": "2021-07-10 00:00:00",
+            "periods": 3,
+            "freq": "60T",
+        },
+    )
+
+    recursion_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(100)
+    try:
+        flow_color = solph_model.flow_colors()
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+
+    assert {
+        color for colors in flow_color.values() for color in colors.values()
+    } == {"orange"}
+    assert all(
+        target.label in flow_color[node.label]
+        for node in solph_model.node_registry
+        for target in node.outputs
+    )
+
+    # Colours are cached, given colours are kept
+    assert solph_model.flow_colors() is flow_color
+    grid_import = ("house_0", "ElectricityGridConnection", "grid_import")
+    distribution = ("house_0", "ElectricityCarrier", "distribution")
+    given = solph_model._resolve_flow_colors(
+        {grid_import: {distribution: "blue"}}, None
+    )
+    assert given[grid_import][distribution] == "blue"
+    assert flow_color[grid_import][distribution] == "orange"
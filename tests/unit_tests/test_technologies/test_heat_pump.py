@@ -1,8 +1,12 @@
 from mtress.technologies import HeatPump, COPReference
+from mtress.technologies._heat_pump import cop_table
 
 from oemof.solph.processing import meta_results
+import logging
 import math
 
+import pytest
+
 from mtress import (
     Location,
     MetaModel,
@@ -45,8 +49,7 @@ def test_heat_pump_init_custom_design_conditions():
     assert hp.ref_cop == hp_ref_cop
 
 
-def test_heat_pump_example():
-
+def _heat_pump_model(source_temperature=None, formulation="nodes"):
     energy_system = MetaModel()
 
     house_1 = Location(name="house_1")
@@ -82,6 +85,8 @@ def test_heat_pump_example():
             min_temp_primary=5,
             max_temp_secondary=40,
             min_temp_secondary=30,
+            source_temperature=source_temperature,
+            formulation=formulation,
         )
     )
 
@@ -104,7 +109,7 @@ def test_heat_pump_example():
         )
     )
 
-    solph_representation = SolphModel(
+    return SolphModel(
         energy_system,
         timeindex={
             "start": "2021-07-10 00:00:00",
@@ -113,6 +118,9 @@ def test_heat_pump_example():
         },
     )
 
+
+def test_heat_pump_example():
+    solph_representation = _heat_pump_model()
     solph_representation.build_solph_model()
 
     solved_model = solph_representation.solve(solve_kwargs={"tee": True})
@@ -121,3 +129,140 @@ def test_heat_pump_example():
     pyomo_objective = 1235.7246755
 
     assert math.isclose(pyomo_objective, mr["objective"], abs_tol=3e-3)
+
+
+def test_heat_pump_source_temperature():
+    # Source at the primary levels gives the same result
+    solph_representation = _heat_pump_model(source_temperature=10)
+    solved_model = solph_representation.solve()
+    assert math.isclose(
+        1235.7246755, meta_results(solved_model)["objective"], abs_tol=3e-3
+    )
+
+    # Colder sources need more electricity
+    solph_representation = _heat_pump_model(source_temperature=[10, 0, 5, 10])
+    solph_representation.build_solph_model()
+    converter = next(
+        node
+        for node in solph_representation.energy_system.nodes
+        if node.label.solph_node == "cop_10_40"
+    )
+    electricity = [
+        factor
+        for bus, factor in converter.conversion_factors.items()
+        if bus.label.solph_node == "electricity"
+    ][0]
+    assert electricity[1] > electricity[2] > electricity[0]
+    assert electricity[0] == electricity[3]
+
+
+def test_heat_pump_compact_formulation():
+    for source_temperature in [None, [10, 0, 5, 10]]:
+        nodes = _heat_pump_model(source_temperature)
+        nodes.build_solph_model()
+        compact = _heat_pump_model(source_temperature, formulation="compact")
+        compact.build_solph_model()
+
+        assert compact.model.nvariables() < nodes.model.nvariables()
+        assert compact.model.nconstraints() < nodes.model.nconstraints()
+        assert math.isclose(
+            meta_results(nodes.solve())["objective"],
+            meta_results(compact.solve())["objective"],
+            rel_tol=1e-6,
+        )
+
+
+@pytest.mark.parametrize("formulation", ["nodes", "compact"])
+def test_heat_pump_without_level_pairs(formulation, caplog):
+    house_1 = Location(name="house_1")
+    house_1.add(carriers.ElectricityCarrier())
+    house_1.add(technologies.ElectricityGridConnection(working_rate=35))
+    house_1.add(
+        carriers.HeatCarrier(
+            temperature_levels=[5, 10, 20, 30, 40],
+            reference_temperature=0,
+        )
+    )
+    # No levels between the primary limits
+    house_1.add(
+        technologies.HeatPump(
+            name="HeatPump",
+            thermal_power_limit=None,
+            max_temp_primary=-5,
+            min_temp_primary=-10,
+            max_temp_secondary=40,
+            min_temp_secondary=30,
+            formulation=formulation,
+        )
+    )
+    solph_model = SolphModel(
+        MetaModel(locations=[house_1]),
+        timeindex={
+            "start": "2021-07-10 00:00:00",
+            "end": "2021-07-10 04:00:00",
+            "freq": "60T",
+        },
+    )
+
+    with caplog.at_level(logging.WARNING):
+        solph_model.build_solph_model()
+    assert "no pair of temperature levels" in caplog.text
+
+    heat_pump_nodes = {
+        node.label.solph_node
+        for node in solph_model.nodes_by_component(technologies.HeatPump)
+    }
+    assert not {
+        name
+        for name in heat_pump_nodes
+        if name.startswith("cop_") or name in ("heat_input", "heat_output")
+    }
+    assert meta_results(solph_model.solve())["objective"] == 0
+
+
+def test_heat_pump_cop_table_shared():
+    cop_table.cache_clear()
+    energy_system = MetaModel()
+    for name in ["house_1", "house_2"]:
+        house = Location(name=name)
+        energy_system.add_location(house)
+        house.add(carriers.ElectricityCarrier())
+        house.add(
+            carriers.HeatCarrier(
+                temperature_levels=[5, 10, 20, 30, 40],
+                reference_temperature=0,
+            )
+        )
+        house.add(
+            technologies.HeatPump(
+                name="HeatPump",
+                thermal_power_limit=None,
+                max_temp_primary=10,
+                min_temp_primary=5,
+                max_temp_secondary=40,
+                min_temp_secondary=30,
+            )
+        )
+
+    SolphModel(
+        energy_system,
+        timeindex={
+            "start": "2021-07-10 00:00:00",
+            "end": "2021-07-10 04:00:00",
+            "freq": "60T",
+        },
+    )
+
+    cache_info = cop_table.cache_info()
+    assert cache_info.misses == 1
+    assert cache_info.hits == 1
+
+    table = cop_table(
+        (4.6, 0.0, -5.0, 35.0, 30.0),
+        (5, 10, 20, 30, 40),
+        (5, 10, 5),
+        (30, 40, 5),
+    )
+    assert table.primary_pairs == ((5, 10),)
+    assert table.secondary_pairs == ((30, 40),)
+    assert not table.cops.flags.writeable
@@ -1,5 +1,21 @@
+import math
+
+import pytest
+
+from oemof.solph.processing import meta_results
+from pyomo import environ as po
+
+from mtress import (
+    Location,
+    MetaModel,
+    SolphModel,
+    carriers,
+    demands,
+    technologies,
+)
 from mtress.physics import HYDROGEN, calc_hydrogen_density
 from mtress.technologies import H2Storage
+from mtress.technologies._pressure_storage._gas_storage import GasStorage
 from mtress.technologies._abstract_homogenous_storage import Implementation
 
 
@@ -28,3 +44,117 @@ def test_h2_storage():
     assert storage.calc_density(pressure=pressure) == calc_hydrogen_density(
         pressure=pressure
     )
+
+
+def _solve_h2_storage(implementation):
+    house_1 = Location(name="house_1")
+    house_1.add(carriers.GasCarrier(gases={HYDROGEN: [10, 30, 70]}))
+    house_1.add(
+        technologies.GasGridConnection(
+            gas_type=HYDROGEN, grid_pressure=70, working_rate=[1, 10, 10]
+        )
+    )
+    house_1.add(
+        demands.GasDemand(
+            name="demand",
+            gas_type=HYDROGEN,
+            time_series=[0, 1, 1],
+            pressure=10,
+        )
+    )
+    house_1.add(
+        H2Storage(
+            name="storage",
+            volume=1,
+            power_limit=10,
+            multiplexer_implementation=implementation,
+        )
+    )
+    solph_model = SolphModel(
+        MetaModel(locations=[house_1]),
+        timeindex={
+            "start": "2021-07-10 00:00:00",
+            "end": "2021-07-10 03:00:00",
+            "freq": "60T",
+        },
+    )
+    solph_model.build_solph_model()
+    solph_model.solve()
+    return solph_model.model
+
+
+def test_h2_storage_flexible():
+    strict = _solve_h2_storage(Implementation.STRICT)
+    flexible = _solve_h2_storage(Implementation.FLEXIBLE)
+
+    # Hydrogen is bought when cheap and stored
+    assert math.isclose(meta_results(flexible)["objective"], 2)
+    assert math.isclose(
+        meta_results(flexible)["objective"], meta_results(strict)["objective"]
+    )
+
+    # Per time step: one constraint per level (0, 10, 30 and 70 bar), per
+    # input (10, 30, 70 bar) and output (10, 30 bar) and three more
+    name = str(["house_1", "storage", "level_constraint"])
+    constraints = sum(
+        len(constraint)
+        for constraint_name, constraint in flexible.component_map(
+            po.Constraint
+        ).items()
+        if constraint_name.startswith(name)
+    )
+    assert constraints == 3 * (4 + 3 + 2 + 3)
+
+
+@pytest.mark.parametrize(
+    "implementation, binaries",
+    [
+        (Implementation.FLEXIBLE, 3),
+        (Implementation.FLEXIBLE_SOS2, 0),
+        (Implementation.FLEXIBLE_LOGARITHMIC, 2),
+    ],
+)
+def test_h2_storage_flexible_formulations(implementation, binaries):
+    model = _solve_h2_storage(implementation)
+
+    assert math.isclose(meta_results(model)["objective"], 2)
+
+    # Binary variables per time step, the storage has four levels
+    assert (
+        sum(
+            1
+            for variable in model.component_data_objects(po.Var)
+            if variable.is_binary()
+        )
+        == 3 * binaries
+    )
+
+
+def test_gas_storage_scalar_density():
+    def calc_density(pressure):
+        # Written for one pressure, fails for arrays
+        if pressure > 50:
+            return 2.0
+        return 1.0
+
+    house_1 = Location(name="house_1")
+    house_1.add(carriers.GasCarrier(gases={HYDROGEN: [10, 30, 70]}))
+    storage = GasStorage(
+        name="storage",
+        gas_type=HYDROGEN,
+        volume=2,
+        power_limit=1,
+        calc_density=calc_density,
+    )
+    house_1.add(storage)
+    solph_model = SolphModel(
+        MetaModel(locations=[house_1]),
+        timeindex={"start": "2021-07-10", "periods": 3, "freq": "60T"},
+    )
+
+    (solph_storage,) = [
+        node
+        for node in solph_model.nodes_by_component(GasStorage)
+        if node.label.solph_node == "storage"
+    ]
+    assert solph_storage.nominal_storage_capacity == 4
@@ -0,0 +1,119 @@
+import math
+
+import numpy as np
+
+import pytest
+from oemof.solph.processing import meta_results
+
+from mtress import (
+    Location,
+    MetaModel,
+    SolphModel,
+    carriers,
+    demands,
+    technologies,
+)
+from mtress._helpers._results import results_from_model
+from mtress.technologies import LayeredHeatStorageFormulation
+
+
+def _layered_storage_model(formulation, balanced=True):
+    house_1 = Location(name="house_1")
+    house_1.add(carriers.ElectricityCarrier())
+    house_1.add(
+        carriers.HeatCarrier(
+            temperature_levels=[10, 20, 30],
+            reference_temperature=0,
+        )
+    )
+    house_1.add(
+        technologies.ElectricityGridConnection(working_rate=[1, 10, 10, 10])
+    )
+    house_1.add(
+        technologies.ResistiveHeater(
+            name="heater",
+            maximum_temperature=30,
+            minimum_temperature=20,
+        )
+    )
+    house_1.add(
+        demands.FixedTemperatureHeating(
+            name="heating",
+            min_flow_temperature=30,
+            return_temperature=20,
+            time_series=[0, 1e3, 2e3, 1e3],
+        )
+    )
+    house_1.add(
+        technologies.LayeredHeatStorage(
+            name="storage",
+            diameter=1,
+            volume=1,
+            power_limit=None,
+            ambient_temperature=0,
+            u_value=0.5,
+            max_temperature=30,
+            min_temperature=10,
+            balanced=balanced,
+            initial_storage_levels={30: 0.2},
+            formulation=formulation,
+        )
+    )
+
+    solph_model = SolphModel(
+        MetaModel(locations=[house_1]),
+        timeindex={
+            "start": "2021-07-10 00:00:00",
+            "end": "2021-07-10 04:00:00",
+            "freq": "60T",
+        },
+    )
+    solph_model.build_solph_model()
+    solph_model.solve()
+    return solph_model
+
+
+@pytest.mark.parametrize("balanced", [True, False])
+def test_layered_heat_storage_compact_formulation(balanced):
+    nodes = _layered_storage_model(
+        LayeredHeatStorageFormulation.NODES, balanced=balanced
+    ).model
+    compact = _layered_storage_model("compact", balanced=balanced).model
+
+    assert math.isclose(
+        meta_results(compact)["objective"],
+        meta_results(nodes)["objective"],
+        rel_tol=1e-6,
+    )
+    assert compact.nvariables() < nodes.nvariables()
+    assert compact.nconstraints() < nodes.nconstraints()
+
+
+def test_layered_heat_storage_compact_storage_content(tmp_path):
+    nodes = _layered_storage_model(LayeredHeatStorageFormulation.NODES)
+    compact = _layered_storage_model("compact")
+
+    nodes_content = results_from_model(nodes.model).storage_content
+    compact_content = results_from_model(compact.model).storage_content
+
+    assert sorted(compact_content.columns) == sorted(nodes_content.columns)
+    assert compact_content.index.equals(nodes_content.index)
+    assert not compact_content.isna().to_numpy().any()
+    # Initial level of the upper layer
+    capacity = nodes.node("house_1", "storage", "30").nominal_storage_capacity
+    assert compact_content[("house_1", "storage", "30")].iloc[
+        0
+    ] == pytest.approx(0.2 * capacity)
+
+    compact.save_results(tmp_path)
+    stored = compact.load_results(tmp_path)
+    np.testing.assert_allclose(
+        stored.storage_content.to_numpy(), compact_content.to_numpy()
+    )
+
+
+def test_layered_heat_storage_compact_rolling_horizon():
+    compact = _layered_storage_model("compact")
+
+    with pytest.raises(NotImplementedError):
+        compact.solve_rolling_horizon(window=2)
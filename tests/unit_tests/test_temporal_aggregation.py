@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the temporal aggregation using typical periods.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from oemof.solph.processing import meta_results, results
+
+from mtress import (
+    ClusterMethod,
+    Location,
+    MetaModel,
+    SolphModel,
+    TypicalPeriods,
+    carriers,
+    demands,
+    technologies,
+)
+from mtress._data_handler import TimeseriesType
+from mtress._helpers import get_flows
+from mtress._temporal_aggregation import TimeseriesAggregation
+
+DAY_A = [1] * 12 + [3] * 12
+DAY_B = [2] * 12 + [5] * 12
+WORKING_RATE = DAY_A + DAY_B + DAY_A + DAY_B + DAY_A[:5]
+DEMAND = [1] * 6 + [2] * 18
+DEMAND = DEMAND * 4 + [1] * 5
+TIMEINDEX = {
+    "start": "2021-07-10 00:00:00",
+    "periods": len(WORKING_RATE) + 1,
+    "freq": "60T",
+}
+
+
+def create_meta_model():
+    house_1 = Location(name="house_1")
+    house_1.add(carriers.ElectricityCarrier())
+    house_1.add(
+        technologies.ElectricityGridConnection(working_rate=WORKING_RATE)
+    )
+    house_1.add(demands.Electricity(name="demand", time_series=DEMAND))
+    house_1.add(
+        technologies.BatteryStorage(
+            name="battery", nominal_capacity=10, initial_soc=None
+        )
+    )
+
+    return MetaModel(locations=[house_1])
+
+
+def test_aggregation_periods():
+    timeindex = pd.date_range(**TIMEINDEX)
+    aggregation = TimeseriesAggregation(
+        TypicalPeriods(n_periods=2, period_length=24),
+        [np.array(WORKING_RATE, dtype=float)],
+        timeindex,
+    )
+
+    # Two typical days and the incomplete last day
+    assert aggregation.periods == [(0, 24), (24, 24), (48, 5)]
+    assert list(aggregation.occurrences) == [2, 2, 1]
+    assert aggregation.period_sequence == [0, 1, 0, 1, 2]
+    assert len(aggregation.timeindex) == 54
+    assert list(aggregation.interval_positions[24:48]) == list(range(24, 48))
+    assert aggregation.interval_positions[-1] == len(WORKING_RATE) - 1
+
+
+def test_aggregation_too_short():
+    with pytest.raises(ValueError):
+        TimeseriesAggregation(
+            TypicalPeriods(n_periods=2, period_length=24),
+            [],
+            pd.date_range(**TIMEINDEX)[:10],
+        )
+
+
+@pytest.mark.parametrize("method", list(ClusterMethod))
+def test_aggregated_model(method):
+    full_model = SolphModel(create_meta_model(), timeindex=TIMEINDEX)
+    full_objective = meta_results(full_model.solve())["objective"]
+
+    aggregated_model = SolphModel(
+        create_meta_model(),
+        timeindex=TIMEINDEX,
+        aggregation=TypicalPeriods(
+            n_periods=2, period_length=24, method=method
+        ),
+    )
+    price = aggregated_model.data.get_timeseries(
+        WORKING_RATE, kind=TimeseriesType.INTERVAL
+    )
+    assert list(price) == DAY_A + DAY_B + DAY_A[:5]
+
+    solved_model = aggregated_model.solve()
+    # Typical periods represent the time series exactly
+    assert meta_results(solved_model)["objective"] == pytest.approx(
+        full_objective
+    )
+
+    full_results = aggregated_model.disaggregate_results(results(solved_model))
+    demand_flow = get_flows(full_results)[
+        (
+            ("house_1", "demand", "input"),
+            ("house_1", "demand", "sink"),
+        )
+    ]
+    assert list(demand_flow.index) == list(full_model.timeindex)
+    assert list(demand_flow[:-1]) == pytest.approx(DEMAND)
+
+    (content,) = (
+        values["sequences"]["storage_content"]
+        for (node, other), values in full_results.items()
+        if other is None
+    )
+    assert len(content) == len(full_model.timeindex)
+    assert content.min() >= 1 - 1e-6
+    assert content.max() <= 10 + 1e-6
+    assert content.iloc[-1] == pytest.approx(content.iloc[0])
+
+    with pytest.raises(NotImplementedError):
+        aggregated_model.solve_rolling_horizon(window=24)
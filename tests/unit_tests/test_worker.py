@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the settings of worker processes.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from mtress._worker import initialise_worker, worker_settings
+
+
+def read_setting(name):
+    return worker_settings()[name]
+
+
+def test_worker_settings():
+    with pytest.raises(RuntimeError):
+        worker_settings()
+
+    with ProcessPoolExecutor(
+        max_workers=1,
+        initializer=initialise_worker,
+        initargs=({"solver": "cbc"},),
+    ) as executor:
+        assert executor.submit(read_setting, "solver").result() == "cbc"